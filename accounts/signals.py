@@ -2,6 +2,7 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils import timezone
 from .models import CustomUser, Profile, SellerProfile
+from store import cache as store_cache
 
 @receiver(post_save, sender=CustomUser)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -28,4 +29,7 @@ def create_user_profile(sender, instance, created, **kwargs):
 def save_user_profile(sender, instance, **kwargs):
     """Sauvegarder le profil quand l'utilisateur est sauvegardé"""
     if hasattr(instance, 'profile'):
-        instance.profile.save()
\ No newline at end of file
+        instance.profile.save()
+
+# Invalidation du cache (store.cache) à chaque modification de boutique
+store_cache.watch(SellerProfile)
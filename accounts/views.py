@@ -153,7 +153,7 @@ def vendor_public_profile(request, username):
         is_sold=False,
         sold_out=False,
         stock__gt=0
-    ).order_by('-created_at')[:12]
+    ).order_by('-created_at').cards()[:12]
     
     # Évaluations du vendeur
     from store.models import SellerRating
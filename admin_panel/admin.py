@@ -2,7 +2,8 @@ from django.contrib import admin
 from django.urls import reverse
 from django.utils.html import format_html
 from .models import UserModeration, ProductModeration, Report
-from store.models import Notification, Product
+from store import notifications
+from store.models import Product
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -63,55 +64,63 @@ class ReportAdmin(admin.ModelAdmin):
     get_detail_link.short_description = 'Détails'
 
     def mark_as_resolved(self, request, queryset):
+        pending = []
         for report in queryset:
             report.status = 'resolved'
             report.save()
-            Notification.objects.create(
-                user=report.reporter,
-                message=f"Votre signalement concernant {report.reason} a été résolu.",
+            pending.append(notifications.build(
+                report.reporter_id,
+                f"Votre signalement concernant {report.reason} a été résolu.",
                 notification_type='report_resolved',
                 related_object_id=report.id
-            )
+            ))
+        notifications.dispatch(pending)
         self.message_user(request, f"{queryset.count()} signalement(s) marqué(s) comme résolu(s).")
     mark_as_resolved.short_description = "Marquer les signalements sélectionnés comme résolus"
 
     def notify_seller(self, request, queryset):
-        for report in queryset:
-            if report.product and report.product.seller:
-                Notification.objects.create(
-                    user=report.product.seller,
-                    message=f"Votre produit '{report.product.name}' a été signalé pour : {report.reason}",
+        pending = []
+        for report in queryset.select_related('product'):
+            if report.product and report.product.seller_id:
+                pending.append(notifications.build(
+                    report.product.seller_id,
+                    f"Votre produit '{report.product.name}' a été signalé pour : {report.reason}",
                     notification_type='report_received',
                     related_object_id=report.id
-                )
-            elif report.user:
-                Notification.objects.create(
-                    user=report.user,
-                    message=f"Votre compte a été signalé pour : {report.reason}",
+                ))
+            elif report.user_id:
+                pending.append(notifications.build(
+                    report.user_id,
+                    f"Votre compte a été signalé pour : {report.reason}",
                     notification_type='report_received',
                     related_object_id=report.id
-                )
+                ))
+        notifications.dispatch(pending)
         self.message_user(request, f"{queryset.count()} vendeur(s) notifié(s).")
     notify_seller.short_description = "Notifier le vendeur"
 
     def delete_product(self, request, queryset):
         deleted_count = 0
+        pending = []
         for report in queryset:
             if report.product:
                 product_name = report.product.name
+                seller_id = report.product.seller_id
                 report.product.delete()
                 deleted_count += 1
-                Notification.objects.create(
-                    user=report.product.seller,
-                    message=f"Votre produit '{product_name}' a été supprimé suite à un signalement.",
+                pending.append(notifications.build(
+                    seller_id,
+                    f"Votre produit '{product_name}' a été supprimé suite à un signalement.",
                     notification_type='product_deleted',
                     related_object_id=report.id
-                )
+                ))
+        notifications.dispatch(pending)
         self.message_user(request, f"{deleted_count} produit(s) supprimé(s).")
     delete_product.short_description = "Supprimer le produit signalé"
 
     def deactivate_seller(self, request, queryset):
         deactivated_count = 0
+        pending = []
         for report in queryset:
             seller = None
             if report.product and report.product.seller:
@@ -122,18 +131,19 @@ class ReportAdmin(admin.ModelAdmin):
                 seller.is_active = False
                 seller.save()
                 deactivated_count += 1
-                Notification.objects.create(
-                    user=seller,
-                    message="Votre compte a été désactivé par un administrateur suite à un signalement.",
+                pending.append(notifications.build(
+                    seller,
+                    "Votre compte a été désactivé par un administrateur suite à un signalement.",
                     notification_type='account_deactivation_manual',
                     related_object_id=report.id
-                )
+                ))
                 UserModeration.objects.create(
                     user=seller,
                     moderator=request.user,
                     action='ban',
                     reason=f"Désactivation manuelle via signalement {report.id} pour : {report.reason}"
                 )
+        notifications.dispatch(pending)
         self.message_user(request, f"{deactivated_count} vendeur(s) désactivé(s).")
     deactivate_seller.short_description = "Désactiver le vendeur"
     
\ No newline at end of file
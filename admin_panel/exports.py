@@ -0,0 +1,52 @@
+# admin_panel/exports.py - Jeux de données exportables : (queryset, colonnes, nom de fichier)
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+
+from .models import ProductModeration, Report
+
+# Exports proposés en tâche de fond : nom -> chemin d'import (ExportJob.source)
+SOURCES = {
+    'users': 'admin_panel.exports.users',
+    'moderations': 'admin_panel.exports.moderations',
+    'reports': 'admin_panel.exports.reports',
+}
+
+
+def users():
+    return get_user_model().objects.order_by('pk'), [
+        ('id', 'ID'),
+        ('username', 'Username'),
+        ('email', 'Email'),
+        ('is_active', 'Is Active'),
+        ('is_staff', 'Is Staff'),
+        ('date_joined', 'Date Joined'),
+    ], 'users_export'
+
+
+def moderations():
+    queryset = ProductModeration.objects.annotate(
+        product_name=F('product__name'), moderator_name=F('moderator__username'),
+    ).order_by('pk')
+    return queryset, [
+        ('id', 'ID'),
+        ('product_name', 'Product Name'),
+        ('status', 'Status'),
+        ('reason', 'Reason'),
+        ('moderator_name', 'Moderator'),
+        ('created_at', 'Created At'),
+    ], 'moderations_export'
+
+
+def reports():
+    queryset = Report.objects.annotate(
+        product_name=F('product__name'), reporter_name=F('reporter__username'),
+    ).order_by('pk')
+    return queryset, [
+        ('id', 'ID'),
+        ('product_name', 'Product Name'),
+        ('reporter_name', 'Reporter'),
+        ('status', 'Status'),
+        ('description', 'Description'),
+        ('created_at', 'Created At'),
+    ], 'reports_export'
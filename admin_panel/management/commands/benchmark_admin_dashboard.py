@@ -0,0 +1,110 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from admin_panel import metrics
+from admin_panel.models import ProductModeration, Report
+from store.benchmarks import make_products, make_seller, percentiles, temporary_database, timed
+from store.models import Order, Product
+
+User = get_user_model()
+
+
+def legacy_context():
+    """Requêtes de l'ancien AdminDashboardView : agrégations sur tout l'historique à chaque affichage."""
+    context = {
+        'total_users': User.objects.count(),
+        'pending_products': ProductModeration.objects.filter(status='pending').count(),
+        'approved_products': ProductModeration.objects.filter(status='approved').count(),
+        'open_reports': Report.objects.filter(status='open').count(),
+        'total_revenue': Order.objects.aggregate(total=Sum('total'))['total'] or 0,
+        'recent_orders': list(Order.objects.order_by('-created_at')[:5]),
+    }
+    series = (
+        ('monthly_approvals', ProductModeration.objects.filter(status='approved'), Count('id')),
+        ('monthly_revenue', Order.objects.all(), Sum('total')),
+        ('monthly_reports', Report.objects.all(), Count('id')),
+    )
+    for key, queryset, aggregate in series:
+        rows = queryset.annotate(month=TruncMonth('created_at')).values('month').annotate(value=aggregate).order_by('month')
+        context[key] = {
+            'labels': [row['month'].strftime('%Y-%m') for row in rows] if rows.exists() else ['Pas de données'],
+            'data': [float(row['value'] or 0) for row in rows] if rows.exists() else [0],
+        }
+    return context
+
+
+def metrics_context():
+    """Lectures du nouvel AdminDashboardView."""
+    stats = metrics.overview()
+    return {
+        'totals': stats['totals'],
+        'recent_orders': list(Order.objects.order_by('-pk')[:5]),
+        'monthly_approvals': metrics.chart(stats['months'], 'approved_moderations'),
+        'monthly_revenue': metrics.chart(stats['months'], 'revenue', present='orders'),
+        'monthly_reports': metrics.chart(stats['months'], 'reports', cast=int),
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare la latence du tableau de bord admin : agrégations sur l'historique et indicateurs mensuels"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=1000000, help='Nombre de commandes')
+        parser.add_argument('--months', type=int, default=36, help="Mois d'historique")
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with temporary_database():
+            self.stdout.write(f"{options['orders']} commandes sur {options['months']} mois...")
+            self.populate(options['orders'], options['months'])
+            elapsed, months = timed(metrics.rebuild)
+            self.stdout.write(f'  reconcile_metrics : {months} mois en {elapsed:.0f} ms')
+
+            for label, load in (('historique', legacy_context), ('indicateurs', metrics_context)):
+                samples = [timed(load)[0] for _ in range(options['repeat'])]
+                stats = percentiles(samples)
+                self.stdout.write(
+                    f"  {label:<12} p50={stats['p50']:9.2f} ms  p95={stats['p95']:9.2f} ms  max={stats['max']:9.2f} ms"
+                )
+
+        self.stdout.write(self.style.SUCCESS('Terminé.'))
+
+    def populate(self, count, months, batch_size=10000):
+        # bulk_create : ni signaux ni numéros alloués, les indicateurs sont calculés par rebuild()
+        rng = random.Random(42)
+        buyer = make_seller('bench_buyer')
+        created = 0
+        while created < count:
+            size = min(batch_size, count - created)
+            Order.objects.bulk_create([
+                Order(user=buyer, order_number=f'BENCH{created + i:012d}', status=rng.choice(Order.STATUS_CHOICES)[0],
+                      total=Decimal(rng.randint(1000, 500000)))
+                for i in range(size)
+            ])
+            created += size
+        # created_at est auto_now_add : étalement sur la période par tranches de clés
+        now, first = timezone.now(), Order.objects.order_by('pk').values_list('pk', flat=True).first()
+        step = max(1, count // months)
+        for month in range(months):
+            Order.objects.filter(pk__gte=first + month * step, pk__lt=first + (month + 1) * step).update(
+                created_at=now - timedelta(days=30 * (months - month))
+            )
+
+        make_products(count // 50)
+        products = list(Product.objects.values_list('pk', flat=True))
+        ProductModeration.objects.bulk_create([
+            ProductModeration(product_id=pk, status=rng.choice(['pending', 'approved', 'rejected']),
+                              created_at=now - timedelta(days=rng.randint(0, 30 * months)))
+            for pk in products
+        ], batch_size=batch_size)
+        Report.objects.bulk_create([
+            Report(reporter=buyer, product_id=rng.choice(products), reason='bench',
+                   status=rng.choice(['open', 'resolved', 'dismissed']))
+            for _ in range(len(products))
+        ], batch_size=batch_size)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from admin_panel import metrics
+
+class Command(BaseCommand):
+    help = "Recalcule les indicateurs mensuels du site depuis l'historique (à planifier chaque nuit)"
+
+    def handle(self, *args, **options):
+        self.stdout.write('Recalcul des indicateurs mensuels...')
+        months = metrics.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{months} mois recalculé(s).'))
@@ -0,0 +1,105 @@
+# admin_panel/metrics.py - Indicateurs mensuels du site (MonthlyMetrics) pour AdminDashboardView
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, DateField, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import MonthlyMetrics, ProductModeration, Report
+
+FIELDS = (
+    'users', 'orders', 'revenue', 'approved_moderations', 'pending_moderations', 'reports', 'open_reports',
+)
+# Statut -> colonne comptant les objets dans ce statut
+MODERATION_STATUSES = {'approved': 'approved_moderations', 'pending': 'pending_moderations'}
+REPORT_STATUSES = {'open': 'open_reports'}
+
+
+def month_of(moment):
+    return (timezone.localdate(moment) if moment else timezone.localdate()).replace(day=1)
+
+
+def add(changes):
+    """changes : {mois: {champ: delta}} -> lignes créées à zéro si besoin, puis un UPDATE par mois."""
+    changes = {month: {f: d for f, d in fields.items() if d} for month, fields in changes.items()}
+    changes = {month: fields for month, fields in changes.items() if fields}
+    if not changes:
+        return
+    with transaction.atomic():
+        MonthlyMetrics.objects.bulk_create([MonthlyMetrics(month=month) for month in changes], ignore_conflicts=True)
+        for month, fields in changes.items():
+            MonthlyMetrics.objects.filter(pk=month).update(**{f: F(f) + d for f, d in fields.items()})
+
+
+def record(moment, **deltas):
+    add({month_of(moment): deltas})
+
+
+def status_deltas(columns, old_status, new_status):
+    """Déplacement d'un objet entre deux statuts (None : création ou suppression)."""
+    deltas = defaultdict(int)
+    if old_status in columns:
+        deltas[columns[old_status]] -= 1
+    if new_status in columns:
+        deltas[columns[new_status]] += 1
+    return dict(deltas)
+
+
+# === Recalcul complet (commande reconcile_metrics) ===
+
+def rebuild():
+    """Recalcule la table depuis les utilisateurs, commandes, modérations et signalements ; renvoie le nombre de mois."""
+    from store.models import Order
+
+    rows = defaultdict(lambda: dict.fromkeys(FIELDS, 0))
+
+    def merge(queryset, date_field, **aggregates):
+        grouped = (
+            queryset.annotate(metrics_month=TruncMonth(date_field, output_field=DateField()))
+            .values('metrics_month')
+            .annotate(**{f'metrics_{field}': aggregate for field, aggregate in aggregates.items()})
+            .order_by()
+        )
+        for row in grouped:
+            for field in aggregates:
+                rows[row['metrics_month']][field] += row[f'metrics_{field}'] or 0
+
+    merge(get_user_model().objects.all(), 'date_joined', users=Count('pk'))
+    merge(Order.objects.all(), 'created_at', orders=Count('pk'), revenue=Sum('total'))
+    merge(
+        ProductModeration.objects.all(), 'created_at',
+        approved_moderations=Count('pk', filter=Q(status='approved')),
+        pending_moderations=Count('pk', filter=Q(status='pending')),
+    )
+    merge(Report.objects.all(), 'created_at', reports=Count('pk'), open_reports=Count('pk', filter=Q(status='open')))
+
+    with transaction.atomic():
+        MonthlyMetrics.objects.all().delete()
+        MonthlyMetrics.objects.bulk_create([MonthlyMetrics(month=month, **fields) for month, fields in rows.items()])
+    return len(rows)
+
+
+# === Lecture ===
+
+def overview():
+    """Mois (ordre chronologique) et totaux du site, en une requête sur une table d'une ligne par mois."""
+    months = list(MonthlyMetrics.objects.order_by('month'))
+    totals = {field: sum(getattr(month, field) for month in months) for field in FIELDS}
+    totals['revenue'] = Decimal(totals['revenue'])
+    return {'months': months, 'totals': totals}
+
+
+def chart(months, field, present=None, cast=float):
+    """{'labels', 'data'} des mois où `present` (par défaut `field`) est non nul."""
+    present = present or field
+    shown = [month for month in months if getattr(month, present)]
+    if not shown:
+        return {'labels': ['Pas de données'], 'data': [0]}
+    return {
+        'labels': [month.month.strftime('%Y-%m') for month in shown],
+        'data': [cast(getattr(month, field)) for month in shown],
+    }
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyMetrics',
+            fields=[
+                ('month', models.DateField(primary_key=True, serialize=False)),
+                ('users', models.IntegerField(default=0)),
+                ('orders', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('approved_moderations', models.IntegerField(default=0)),
+                ('pending_moderations', models.IntegerField(default=0)),
+                ('reports', models.IntegerField(default=0)),
+                ('open_reports', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Indicateurs du mois',
+                'verbose_name_plural': 'Indicateurs mensuels',
+            },
+        ),
+    ]
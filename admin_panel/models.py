@@ -63,4 +63,23 @@ class Report(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Report {self.id} - {self.product.name if self.product else 'No product'}"
\ No newline at end of file
+        return f"Report {self.id} - {self.product.name if self.product else 'No product'}"
+
+# === Indicateurs mensuels du site (voir admin_panel.metrics) ===
+class MonthlyMetrics(models.Model):
+    """Compteurs d'un mois, tenus à jour par signaux et réconciliés chaque nuit (reconcile_metrics)."""
+    month = models.DateField(primary_key=True)  # Premier jour du mois
+    users = models.IntegerField(default=0)
+    orders = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    approved_moderations = models.IntegerField(default=0)
+    pending_moderations = models.IntegerField(default=0)
+    reports = models.IntegerField(default=0)
+    open_reports = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Indicateurs du mois"
+        verbose_name_plural = "Indicateurs mensuels"
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}"
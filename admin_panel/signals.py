@@ -1,9 +1,15 @@
-from django.db.models.signals import post_save
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Report
-from store.models import Notification
+from . import metrics
+from .models import ProductModeration, Report
+from store import notifications
+from store.models import Order
 
+logger = logging.getLogger('admin_panel')
 User = get_user_model()
 
 @receiver(post_save, sender=Report)
@@ -15,12 +21,12 @@ def check_report_count(sender, instance, created, **kwargs):
     """
     if created and instance.user:  # Vérifie que le signalement est nouveau et concerne un utilisateur
         # Notification anonyme au vendeur signalé
-        Notification.objects.create(
-            user=instance.user,
-            message=f"Votre compte a été signalé pour : {instance.reason}",
+        pending = [notifications.build(
+            instance.user,
+            f"Votre compte a été signalé pour : {instance.reason}",
             notification_type='report_received',
             related_object_id=instance.id
-        )
+        )]
 
         # Vérification des signalements pour désactivation
         open_reports = Report.objects.filter(user=instance.user, status='open').count()
@@ -29,17 +35,94 @@ def check_report_count(sender, instance, created, **kwargs):
             user.is_active = False
             user.save()
             # Notification à l'utilisateur désactivé
-            Notification.objects.create(
-                user=user,
-                message="Votre compte a été désactivé en raison de 10 signalements ouverts.",
+            pending.append(notifications.build(
+                user,
+                "Votre compte a été désactivé en raison de 10 signalements ouverts.",
                 notification_type='account_deactivation',
                 related_object_id=instance.id
-            )
+            ))
             # Notification à tous les admins
-            for admin in User.objects.filter(is_staff=True):
-                Notification.objects.create(
-                    user=admin,
-                    message=f"Le compte de {user.username} a été désactivé pour 10 signalements ouverts.",
-                    notification_type='account_deactivation_alert',
-                    related_object_id=instance.id
-                )
\ No newline at end of file
+            message = f"Le compte de {user.username} a été désactivé pour 10 signalements ouverts."
+            pending.extend(
+                notifications.build(admin_id, message, notification_type='account_deactivation_alert',
+                                    related_object_id=instance.id)
+                for admin_id in User.objects.filter(is_staff=True).values_list('pk', flat=True)
+            )
+        # Une seule insertion et un seul lot d'événements WebSocket
+        notifications.dispatch(pending)
+
+
+# === Indicateurs mensuels (admin_panel.metrics) ===
+
+def _after_commit(moment, deltas):
+    # Appliqué après la transaction ; un écart éventuel est corrigé par reconcile_metrics
+    def run():
+        try:
+            metrics.record(moment, **deltas)
+        except Exception:
+            logger.exception("Indicateurs mensuels non mis à jour")
+    if any(deltas.values()):
+        transaction.on_commit(run)
+
+
+def _remember_status(sender, instance):
+    instance._metrics_status_before = None
+    if instance.pk:
+        instance._metrics_status_before = sender.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def count_user(sender, instance, created, **kwargs):
+    if created:
+        _after_commit(instance.date_joined, {'users': 1})
+
+
+@receiver(post_delete, sender=User)
+def uncount_user(sender, instance, **kwargs):
+    _after_commit(instance.date_joined, {'users': -1})
+
+
+@receiver(post_save, sender=Order)
+def count_order(sender, instance, created, **kwargs):
+    # Le total d'une commande n'est plus modifié après sa création
+    if created:
+        _after_commit(instance.created_at, {'orders': 1, 'revenue': instance.total or 0})
+
+
+@receiver(post_delete, sender=Order)
+def uncount_order(sender, instance, **kwargs):
+    _after_commit(instance.created_at, {'orders': -1, 'revenue': -(instance.total or 0)})
+
+
+@receiver(pre_save, sender=ProductModeration)
+@receiver(pre_save, sender=Report)
+def remember_metrics_status(sender, instance, **kwargs):
+    _remember_status(sender, instance)
+
+
+@receiver(post_save, sender=ProductModeration)
+def count_moderation(sender, instance, created, **kwargs):
+    before = None if created else getattr(instance, '_metrics_status_before', None)
+    if created or before != instance.status:
+        _after_commit(instance.created_at, metrics.status_deltas(metrics.MODERATION_STATUSES, before, instance.status))
+
+
+@receiver(post_delete, sender=ProductModeration)
+def uncount_moderation(sender, instance, **kwargs):
+    _after_commit(instance.created_at, metrics.status_deltas(metrics.MODERATION_STATUSES, instance.status, None))
+
+
+@receiver(post_save, sender=Report)
+def count_report(sender, instance, created, **kwargs):
+    before = None if created else getattr(instance, '_metrics_status_before', None)
+    deltas = metrics.status_deltas(metrics.REPORT_STATUSES, before, instance.status)
+    if created:
+        deltas['reports'] = 1
+    _after_commit(instance.created_at, deltas)
+
+
+@receiver(post_delete, sender=Report)
+def uncount_report(sender, instance, **kwargs):
+    deltas = metrics.status_deltas(metrics.REPORT_STATUSES, instance.status, None)
+    deltas['reports'] = -1
+    _after_commit(instance.created_at, deltas)
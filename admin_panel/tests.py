@@ -1,9 +1,11 @@
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-from .models import Report, UserModeration
-from store.models import Product, Notification
-from datetime import datetime
+from . import metrics
+from .models import MonthlyMetrics, ProductModeration, Report, UserModeration
+from store.models import Order, Product, Notification
+from datetime import date, datetime
+from decimal import Decimal
 
 User = get_user_model()
 
@@ -56,7 +58,7 @@ class ReportSignalTests(TestCase):
         self.assertEqual(report.product, self.product)
         notification = Notification.objects.filter(
             user=self.target_user,
-            notification_type='report_received'
+            type='report_received'
         ).first()
         self.assertIsNotNone(notification)
         self.assertEqual(
@@ -94,7 +96,7 @@ class ReportSignalTests(TestCase):
         self.assertEqual(response.status_code, 302)
         notification = Notification.objects.filter(
             user=self.target_user,
-            notification_type='report_received'
+            type='report_received'
         ).first()
         self.assertIsNotNone(notification)
         self.assertEqual(
@@ -117,7 +119,7 @@ class ReportSignalTests(TestCase):
         self.assertEqual(Product.objects.filter(id=self.product.id).count(), 0)
         notification = Notification.objects.filter(
             user=self.target_user,
-            notification_type='product_deleted'
+            type='product_deleted'
         ).first()
         self.assertIsNotNone(notification)
         self.assertEqual(
@@ -141,7 +143,7 @@ class ReportSignalTests(TestCase):
         self.assertFalse(self.target_user.is_active)
         notification = Notification.objects.filter(
             user=self.target_user,
-            notification_type='account_deactivation_manual'
+            type='account_deactivation_manual'
         ).first()
         self.assertIsNotNone(notification)
         self.assertEqual(
@@ -153,4 +155,66 @@ class ReportSignalTests(TestCase):
         self.assertEqual(
             moderation.reason,
             f"Désactivation manuelle via signalement {report.id} pour : inappropriate_content"
-        )
\ No newline at end of file
+        )
+
+class MonthlyMetricsTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.seller = User.objects.create_user(
+                username='metrics_seller',
+                email='metrics_seller@example.com',
+                password='testpass123'
+            )
+        self.product = Product.objects.create(
+            name='Produit indicateurs',
+            price=10,
+            stock=5,
+            description='Test',
+            seller=self.seller
+        )
+
+    def snapshot(self):
+        return {
+            row.month: {field: getattr(row, field) for field in metrics.FIELDS}
+            for row in MonthlyMetrics.objects.all()
+        }
+
+    def test_incremental_matches_rebuild(self):
+        """Les signaux tiennent la table au même état qu'un recalcul complet"""
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(user=self.seller, total=Decimal('120.50'))
+            Order.objects.create(user=self.seller, total=Decimal('30.00'))
+            moderation = ProductModeration.objects.create(product=self.product)
+            report = Report.objects.create(reporter=self.seller, product=self.product, reason='Test')
+        with self.captureOnCommitCallbacks(execute=True):
+            moderation.status = 'approved'
+            moderation.save()
+            report.status = 'resolved'
+            report.save()
+            order.delete()
+
+        month = metrics.month_of(None)
+        incremental = self.snapshot()
+        self.assertEqual(incremental[month], {
+            'users': 1, 'orders': 1, 'revenue': Decimal('30.00'), 'approved_moderations': 1,
+            'pending_moderations': 0, 'reports': 1, 'open_reports': 0,
+        })
+        self.assertEqual(metrics.rebuild(), 1)
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_overview(self):
+        MonthlyMetrics.objects.all().delete()
+        metrics.add({
+            date(2026, 1, 1): {'orders': 2, 'revenue': Decimal('50'), 'reports': 1},
+            date(2026, 3, 1): {'users': 4, 'open_reports': 1, 'reports': 1},
+        })
+        with self.assertNumQueries(1):
+            stats = metrics.overview()
+        self.assertEqual(stats['totals']['revenue'], Decimal('50'))
+        self.assertEqual((stats['totals']['users'], stats['totals']['open_reports']), (4, 1))
+        self.assertEqual(metrics.chart(stats['months'], 'revenue', present='orders'),
+                         {'labels': ['2026-01'], 'data': [50.0]})
+        self.assertEqual(metrics.chart(stats['months'], 'reports', cast=int),
+                         {'labels': ['2026-01', '2026-03'], 'data': [1, 1]})
+        self.assertEqual(metrics.chart(stats['months'], 'approved_moderations'),
+                         {'labels': ['Pas de données'], 'data': [0]})
@@ -16,6 +16,9 @@ urlpatterns = [
     path('export/users/', views.export_users_csv, name='export_users'),
     path('export/moderations/', views.export_moderations_csv, name='export_moderations'),
     path('export/reports/', views.export_reports_csv, name='export_reports'),
+    path('export/jobs/<str:name>/', views.export_job_create, name='export_job_create'),
+    path('export/jobs/status/<int:pk>/', views.export_job_status, name='export_job_status'),
+    path('export/jobs/download/<int:pk>/', views.export_job_download, name='export_job_download'),
     path('trigger_notification/', views.trigger_notification, name='trigger_notification'),
     path('reviews/', views.review_list, name='review_list'),
     path('reviews/<int:pk>/action/', views.review_action, name='review_action'),
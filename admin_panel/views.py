@@ -1,20 +1,20 @@
 import logging
-import csv
+import os
 from django.shortcuts import redirect, get_object_or_404, render
 from django.contrib import messages
 from django.views.generic import ListView, TemplateView, View, UpdateView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth import get_user_model
 from django.urls import reverse_lazy, reverse
-from django.http import HttpResponse
-from django.db.models import Sum, Count, Q
-from django.db.models.functions import TruncMonth
+from django.db.models import Q
+from . import exports as datasets, metrics
 from .models import ProductModeration, Report, UserModeration
-from store.models import Product, Notification, Order, Review
+from store.models import ExportJob, Product, Order, Review
 from django.core.mail import send_mail
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import FileResponse, Http404, JsonResponse
+from django.views.decorators.http import require_POST
+from store import exports, notifications
 
 logger = logging.getLogger('admin_panel')
 User = get_user_model()
@@ -33,40 +33,21 @@ class AdminDashboardView(LoginRequiredMixin, AdminAccessMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_users'] = User.objects.count()
-        context['pending_products'] = ProductModeration.objects.filter(status='pending').count()
-        context['approved_products'] = ProductModeration.objects.filter(status='approved').count()
-        context['open_reports'] = Report.objects.filter(status='open').count()
-        context['total_revenue'] = Order.objects.aggregate(total=Sum('total'))['total'] or 0
-        context['recent_orders'] = Order.objects.order_by('-created_at')[:5]
-        
-        monthly_approvals = ProductModeration.objects.filter(status='approved') \
-            .annotate(month=TruncMonth('created_at')) \
-            .values('month') \
-            .annotate(count=Count('id')) \
-            .order_by('month')
-        context['monthly_approvals'] = {
-            'labels': [item['month'].strftime('%Y-%m') for item in monthly_approvals] if monthly_approvals.exists() else ['Pas de données'],
-            'data': [float(item['count']) for item in monthly_approvals] if monthly_approvals.exists() else [0]
-        }
-
-        monthly_revenue = Order.objects.annotate(month=TruncMonth('created_at')) \
-            .values('month') \
-            .annotate(total=Sum('total')) \
-            .order_by('month')
-        context['monthly_revenue'] = {
-            'labels': [item['month'].strftime('%Y-%m') for item in monthly_revenue] if monthly_revenue.exists() else ['Pas de données'],
-            'data': [float(item['total'] or 0) for item in monthly_revenue] if monthly_revenue.exists() else [0]
-        }
-
-        monthly_reports = Report.objects.annotate(month=TruncMonth('created_at')) \
-            .values('month') \
-            .annotate(count=Count('id')) \
-            .order_by('month')
-        context['monthly_reports'] = {
-            'labels': [item['month'].strftime('%Y-%m') for item in monthly_reports] if monthly_reports.exists() else ['Pas de données'],
-            'data': [item['count'] for item in monthly_reports] if monthly_reports.exists() else [0]
-        }
+        # Indicateurs mensuels maintenus par admin_panel.metrics : aucune agrégation sur l'historique
+        stats = metrics.overview()
+        months, totals = stats['months'], stats['totals']
+        context['total_users'] = totals['users']
+        context['pending_products'] = totals['pending_moderations']
+        context['approved_products'] = totals['approved_moderations']
+        context['open_reports'] = totals['open_reports']
+        context['total_revenue'] = totals['revenue']
+        context['recent_orders'] = Order.objects.order_by('-pk')[:5]
+        context['monthly_approvals'] = metrics.chart(months, 'approved_moderations')
+        context['monthly_revenue'] = metrics.chart(months, 'revenue', present='orders')
+        context['monthly_reports'] = metrics.chart(months, 'reports', cast=int)
+        context['export_jobs'] = [
+            ('users', 'Utilisateurs'), ('moderations', 'Modérations'), ('reports', 'Signalements'),
+        ]
         return context
 
 class UserListView(LoginRequiredMixin, AdminAccessMixin, ListView):
@@ -165,9 +146,9 @@ class ApproveModerationView(LoginRequiredMixin, AdminAccessMixin, View):
             moderation.moderator = request.user
             moderation.save()
             messages.success(request, f'Le produit "{moderation.product.name}" a été approuvé.')
-            Notification.objects.create(
-                user=moderation.product.seller,
-                message=f'Votre produit "{moderation.product.name}" a été approuvé.',
+            notifications.notify(
+                [moderation.product.seller],
+                f'Votre produit "{moderation.product.name}" a été approuvé.',
                 notification_type='product_approved',
                 related_object_id=moderation.product.id
             )
@@ -194,9 +175,9 @@ class RejectModerationView(LoginRequiredMixin, AdminAccessMixin, View):
             moderation.reason = reason
             moderation.save()
             messages.success(request, f'Le produit "{moderation.product.name}" a été rejeté.')
-            Notification.objects.create(
-                user=moderation.product.seller,
-                message=f'Votre produit "{moderation.product.name}" a été rejeté. Raison : {reason}',
+            notifications.notify(
+                [moderation.product.seller],
+                f'Votre produit "{moderation.product.name}" a été rejeté. Raison : {reason}',
                 notification_type='product_rejected',
                 related_object_id=moderation.product.id
             )
@@ -259,9 +240,9 @@ class ReportListView(LoginRequiredMixin, AdminAccessMixin, ListView):
         if action == 'resolve':
             report.status = 'resolved'
             report.save()
-            Notification.objects.create(
-                user=report.reporter,
-                message=f"Votre signalement concernant '{report.product.name if report.product else report.user.username}' a été résolu.",
+            notifications.notify(
+                [report.reporter],
+                f"Votre signalement concernant '{report.product.name if report.product else report.user.username}' a été résolu.",
                 notification_type='report_resolved'
             )
             send_mail(
@@ -275,9 +256,9 @@ class ReportListView(LoginRequiredMixin, AdminAccessMixin, ListView):
         elif action == 'reject':
             report.status = 'rejected'
             report.save()
-            Notification.objects.create(
-                user=report.reporter,
-                message=f"Votre signalement concernant '{report.product.name if report.product else report.user.username}' a été rejeté.",
+            notifications.notify(
+                [report.reporter],
+                f"Votre signalement concernant '{report.product.name if report.product else report.user.username}' a été rejeté.",
                 notification_type='report_rejected'
             )
             send_mail(
@@ -291,9 +272,9 @@ class ReportListView(LoginRequiredMixin, AdminAccessMixin, ListView):
         elif action == 'notify_user':
             notification_message = request.POST.get('notification_message', '')
             if notification_message and report.user:
-                Notification.objects.create(
-                    user=report.user,
-                    message=notification_message,
+                notifications.notify(
+                    [report.user],
+                    notification_message,
                     notification_type='custom_notification'
                 )
                 send_mail(
@@ -322,17 +303,17 @@ class ReportDetailView(LoginRequiredMixin, AdminAccessMixin, DetailView):
         action = request.POST.get('action')
         if action == 'notify_seller':
             if report.product and report.product.seller:
-                Notification.objects.create(
-                    user=report.product.seller,
-                    message=f"Votre produit '{report.product.name}' a été signalé pour : {report.reason}",
+                notifications.notify(
+                    [report.product.seller],
+                    f"Votre produit '{report.product.name}' a été signalé pour : {report.reason}",
                     notification_type='report_received',
                     related_object_id=report.id
                 )
                 messages.success(request, f"Vendeur notifié pour le signalement {report.id}.")
             elif report.user:
-                Notification.objects.create(
-                    user=report.user,
-                    message=f"Votre compte a été signalé pour : {report.reason}",
+                notifications.notify(
+                    [report.user],
+                    f"Votre compte a été signalé pour : {report.reason}",
                     notification_type='report_received',
                     related_object_id=report.id
                 )
@@ -341,9 +322,9 @@ class ReportDetailView(LoginRequiredMixin, AdminAccessMixin, DetailView):
             if report.product:
                 product_name = report.product.name
                 report.product.delete()
-                Notification.objects.create(
-                    user=report.product.seller,
-                    message=f"Votre produit '{product_name}' a été supprimé suite à un signalement.",
+                notifications.notify(
+                    [report.product.seller],
+                    f"Votre produit '{product_name}' a été supprimé suite à un signalement.",
                     notification_type='product_deleted',
                     related_object_id=report.id
                 )
@@ -351,9 +332,9 @@ class ReportDetailView(LoginRequiredMixin, AdminAccessMixin, DetailView):
         elif action == 'mark_as_resolved':
             report.status = 'resolved'
             report.save()
-            Notification.objects.create(
-                user=report.reporter,
-                message=f"Votre signalement concernant '{report.product.name if report.product else report.user.username}' a été résolu.",
+            notifications.notify(
+                [report.reporter],
+                f"Votre signalement concernant '{report.product.name if report.product else report.user.username}' a été résolu.",
                 notification_type='report_resolved'
             )
             messages.success(request, f"Signalement {report.id} marqué comme résolu.")
@@ -362,9 +343,9 @@ class ReportDetailView(LoginRequiredMixin, AdminAccessMixin, DetailView):
             if seller and seller.is_active:
                 seller.is_active = False
                 seller.save()
-                Notification.objects.create(
-                    user=seller,
-                    message="Votre compte a été désactivé par un administrateur suite à un signalement.",
+                notifications.notify(
+                    [seller],
+                    "Votre compte a été désactivé par un administrateur suite à un signalement.",
                     notification_type='account_deactivation_manual',
                     related_object_id=report.id
                 )
@@ -383,52 +364,57 @@ def trigger_notification(request):
     user = User.objects.first()
     product = Product.objects.first()
     report = Report.objects.create(product=product, reporter=user, reason='Test', description='Test notification')
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        f'user_{user.id}',  # Utilise le group_name spécifique à l'utilisateur
-        {
-            'type': 'send_notification',
-            'message': f'Nouveau signalement #{report.id} par {user.username} pour {product.name}',
-            'notification_type': 'report_created',
-            'related_object_id': report.id,
-        }
+    notifications.notify(
+        [user],
+        f'Nouveau signalement #{report.id} par {user.username} pour {product.name}',
+        notification_type='report_created',
+        related_object_id=report.id,
     )
     messages.success(request, f"Notification test créée pour le signalement #{report.id}.")
     return redirect(reverse('admin_panel:report_list'))
 
+def staff_required(view):
+    return login_required(user_passes_test(lambda user: user.is_staff)(view))
+
+@staff_required
 def export_users_csv(request):
-    users = User.objects.all().values('id', 'username', 'email', 'is_active', 'is_staff', 'date_joined')
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="users_export.csv"'
-    writer = csv.writer(response)
-    writer.writerow(['ID', 'Username', 'Email', 'Is Active', 'Is Staff', 'Date Joined'])
-    for user in users:
-        writer.writerow([user['id'], user['username'], user['email'], user['is_active'], user['is_staff'], user['date_joined']])
-    return response
+    return exports.from_request(request, *datasets.users())
 
+@staff_required
 def export_moderations_csv(request):
-    moderations = ProductModeration.objects.select_related('product', 'moderator').all().values(
-        'id', 'product__name', 'status', 'reason', 'moderator__username', 'created_at'
-    )
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="moderations_export.csv"'
-    writer = csv.writer(response)
-    writer.writerow(['ID', 'Product Name', 'Status', 'Reason', 'Moderator', 'Created At'])
-    for mod in moderations:
-        writer.writerow([mod['id'], mod['product__name'], mod['status'], mod['reason'] or '', mod['moderator__username'] or '', mod['created_at']])
-    return response
+    return exports.from_request(request, *datasets.moderations())
 
+@staff_required
 def export_reports_csv(request):
-    reports = Report.objects.select_related('reporter', 'product').all().values(
-        'id', 'product__name', 'reporter__username', 'status', 'description', 'created_at'
-    )
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="reports_export.csv"'
-    writer = csv.writer(response)
-    writer.writerow(['ID', 'Product Name', 'Reporter', 'Status', 'Description', 'Created At'])
-    for report in reports:
-        writer.writerow([report['id'], report['product__name'], report['reporter__username'], report['status'], report['description'] or '', report['created_at']])
-    return response
+    return exports.from_request(request, *datasets.reports())
+
+@staff_required
+@require_POST
+def export_job_create(request, name):
+    """Export en tâche de fond (commande run_export_jobs) pour les tables trop grandes pour une requête."""
+    if name not in datasets.SOURCES:
+        raise Http404("Export inconnu")
+    columns = [column for column in request.POST.get('columns', '').split(',') if column]
+    job = exports.enqueue(datasets.SOURCES[name], user=request.user,
+                          format=request.POST.get('format', 'csv'), columns=columns)
+    return JsonResponse(_export_job_status(job), status=202)
+
+@staff_required
+def export_job_status(request, pk):
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user)
+    return JsonResponse(_export_job_status(job))
+
+@staff_required
+def export_job_download(request, pk):
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user, status='done')
+    return FileResponse(open(exports.path(job), 'rb'), as_attachment=True,
+                        filename=os.path.basename(job.file.name))
+
+def _export_job_status(job):
+    data = exports.as_dict(job)
+    data['status_url'] = reverse('admin_panel:export_job_status', args=[job.pk])
+    data['download_url'] = reverse('admin_panel:export_job_download', args=[job.pk]) if data['ready'] else None
+    return data
 
 @login_required
 def review_list(request):
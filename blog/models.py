@@ -35,6 +35,9 @@ class Post(models.Model):
         ordering = ['-published_at']
         verbose_name = "Article"
         verbose_name_plural = "Articles"
+        indexes = [
+            models.Index(fields=['is_published', 'published_at']),
+        ]
 
     def __str__(self):
         return self.title
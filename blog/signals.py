@@ -8,6 +8,8 @@ from django.db.models.signals import post_migrate
 from django.dispatch import receiver
 from django.apps import apps
 from django.contrib import admin
+from store import cache as store_cache
+from .models import Post
 
 @receiver(post_migrate)
 def handle_post_migrate(sender, **kwargs):
@@ -61,4 +63,7 @@ def send_comment_notification(sender, instance, created, **kwargs):
             from_email,
             recipient_list,
             fail_silently=True,
-        )
\ No newline at end of file
+        )
+
+# Invalidation du cache (store.cache) à chaque modification d'article
+store_cache.watch(Post)
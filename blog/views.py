@@ -1,17 +1,15 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.http import HttpResponseForbidden
 from .models import BlogCategory, Post, Comment
 from .forms import CommentForm, PostForm
 from store.models import Product
+from store.pagination import CursorPaginator
 
 def post_list(request):
     posts = Post.objects.filter(is_published=True).order_by('-published_at')
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = CursorPaginator(posts, 10).get_page(request.GET.get('cursor'))
     categories = BlogCategory.objects.all()
     return render(request, 'blog/post_list.html', {
         'page_obj': page_obj,
@@ -49,9 +47,7 @@ def post_detail(request, slug):
 def category_posts(request, category_slug):
     category = get_object_or_404(BlogCategory, slug=category_slug)
     posts = Post.objects.filter(category=category, is_published=True).order_by('-published_at')
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = CursorPaginator(posts, 10).get_page(request.GET.get('cursor'))
     categories = BlogCategory.objects.all()
     return render(request, 'blog/post_list.html', {
         'page_obj': page_obj,
@@ -0,0 +1,134 @@
+# dashboard/forecasting.py - Modèles de prévision interchangeables (NumPy par défaut, Prophet en option)
+
+import itertools
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DEFAULT_BACKEND = 'dashboard.forecasting.DampedTrendBackend'
+INTERVAL_Z = 1.2816  # Intervalle à 80 %, comme interval_width par défaut de Prophet
+
+
+def future_months(last_label, periods):
+    """'2026-11', 3 -> ['2026-12', '2027-01', '2027-02']"""
+    year, month = (int(part) for part in last_label.split('-'))
+    labels = []
+    for _ in range(periods):
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        labels.append(f'{year:04d}-{month:02d}')
+    return labels
+
+
+def result(labels, values, lower, upper):
+    """Forme commune des prévisions : listes de même longueur, ventes jamais négatives."""
+    return {
+        'labels': list(labels),
+        'values': [max(0.0, float(v)) for v in values],
+        'lower': [max(0.0, float(v)) for v in lower],
+        'upper': [max(0.0, float(v)) for v in upper],
+    }
+
+
+class Backend:
+    """Ajuste des séries mensuelles [(labels, valeurs)] et renvoie une prévision par série.
+
+    `batched` : fit_many() traite toutes les séries d'un coup (pas de pool de processus).
+    """
+    batched = False
+
+    def fit(self, labels, values, periods):
+        raise NotImplementedError
+
+    def fit_many(self, series, periods):
+        return [self.fit(labels, values, periods) for labels, values in series]
+
+
+class DampedTrendBackend(Backend):
+    """Lissage exponentiel à tendance amortie (Holt, ETS(A,Ad,N)), NumPy seul.
+
+    Toutes les séries sont alignées à droite dans un tableau (séries x mois) et une
+    grille de paramètres (alpha, beta, phi) est évaluée en une passe : la boucle ne
+    porte que sur les mois. Chaque série garde les paramètres de plus faible erreur
+    à un pas. Pas de saisonnalité : les séries font souvent moins de deux ans.
+    """
+    batched = True
+    ALPHAS = (0.1, 0.3, 0.5, 0.7, 0.9)
+    BETAS = (0.01, 0.1, 0.2, 0.4)
+    PHIS = (0.8, 0.9, 0.98)
+
+    def fit(self, labels, values, periods):
+        return self.fit_many([(labels, values)], periods)[0]
+
+    def fit_many(self, series, periods):
+        import numpy as np
+
+        if not series:
+            return []
+        lengths = np.array([len(values) for _, values in series])
+        width = int(lengths.max())
+        y = np.zeros((len(series), width))
+        for row, (_, values) in enumerate(series):
+            y[row, width - len(values):] = values
+        start = width - lengths  # Premier mois observé de chaque série
+
+        # Grille (P jeux de paramètres) x séries : tableaux (P, N)
+        grid = np.array(list(itertools.product(self.ALPHAS, self.BETAS, self.PHIS)))
+        alpha, beta, phi = grid[:, 0:1], grid[:, 1:2], grid[:, 2:3]
+        shape = (alpha.shape[0], len(series))
+        rows = np.arange(len(series))
+        # Initialisation classique de Holt : niveau = 1re valeur, tendance = 1re différence
+        second = y[rows, np.minimum(start + 1, width - 1)]
+        level = np.broadcast_to(y[rows, start], shape).copy()
+        trend = np.broadcast_to(np.where(lengths > 1, second - y[rows, start], 0.0), shape).copy()
+        sse = np.zeros(shape)
+        for t in range(1, width):
+            active = t > start  # (N,) : la série a déjà une observation avant t
+            predicted = level + phi * trend
+            error = y[:, t] - predicted
+            new_level = predicted + alpha * error
+            new_trend = phi * trend + alpha * beta * error
+            sse += np.where(active, error ** 2, 0.0)
+            level = np.where(active, new_level, level)
+            trend = np.where(active, new_trend, trend)
+
+        best = sse.argmin(axis=0)
+        level, trend, sse = level[best, rows], trend[best, rows], sse[best, rows]
+        alpha, beta, phi = alpha[best, 0], beta[best, 0], phi[best, 0]
+        sigma = np.sqrt(sse / np.maximum(lengths - 1, 1))
+
+        steps = np.arange(1, periods + 1)
+        powers = phi[:, None] ** steps  # (N, H) : phi^h
+        damped = np.cumsum(powers, axis=1)  # phi + ... + phi^h
+        forecast = level[:, None] + damped * trend[:, None]
+        # Variance à h pas : sigma^2 (1 + somme_{j<h} c_j^2), c_j = alpha (1 + beta (phi + ... + phi^j))
+        c = alpha[:, None] * (1 + beta[:, None] * damped)
+        spread = np.concatenate([np.zeros((len(series), 1)), np.cumsum(c ** 2, axis=1)[:, :-1]], axis=1)
+        margin = INTERVAL_Z * sigma[:, None] * np.sqrt(1 + spread)
+
+        return [
+            result(future_months(labels[-1], periods), forecast[row], forecast[row] - margin[row],
+                   forecast[row] + margin[row])
+            for row, (labels, _) in enumerate(series)
+        ]
+
+
+class ProphetBackend(Backend):
+    """Prophet (pandas + Stan) : précis sur de longues séries saisonnières, lent (secondes par série)."""
+
+    def fit(self, labels, values, periods):
+        import pandas as pd
+        from prophet import Prophet
+
+        df = pd.DataFrame({'ds': [pd.to_datetime(label) for label in labels], 'y': values})
+        model = Prophet(yearly_seasonality=True, weekly_seasonality=False, daily_seasonality=False)
+        model.fit(df)
+        forecast = model.predict(model.make_future_dataframe(periods=periods, freq='M')).tail(periods)
+        return result(
+            [d.strftime('%Y-%m') for d in forecast['ds']],
+            forecast['yhat'], forecast['yhat_lower'], forecast['yhat_upper'],
+        )
+
+
+def backend(path=None):
+    """Instance du modèle configuré (FORECAST_BACKEND, chemin d'import de la classe)."""
+    return import_string(path or getattr(settings, 'FORECAST_BACKEND', DEFAULT_BACKEND))()
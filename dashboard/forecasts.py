@@ -0,0 +1,108 @@
+# dashboard/forecasts.py - Prévisions de ventes calculées hors requête (commande forecast_sales)
+
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from . import forecasting
+from .models import SalesForecast, SellerDailyStats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HORIZON = 12
+MIN_POINTS = 2  # Minimum pour ajuster une tendance
+
+
+def horizon():
+    return getattr(settings, 'FORECAST_HORIZON', DEFAULT_HORIZON)
+
+
+def workers():
+    """Processus du pool ; None : un par cœur."""
+    return getattr(settings, 'FORECAST_WORKERS', None) or os.cpu_count() or 1
+
+
+def monthly_series(seller_ids=None):
+    """{seller_id: ([mois 'AAAA-MM'], [ventes])} depuis les agrégats quotidiens, en une requête."""
+    rows = SellerDailyStats.objects.all()
+    if seller_ids:
+        rows = rows.filter(seller_id__in=seller_ids)
+    series = defaultdict(lambda: ([], []))
+    for seller_id, month, revenue in (
+        rows.annotate(month=TruncMonth('date')).values_list('seller_id', 'month')
+        .annotate(revenue=Sum('revenue')).order_by('seller_id', 'month')
+    ):
+        labels, values = series[seller_id]
+        labels.append(month.strftime('%Y-%m'))
+        values.append(float(revenue or 0))
+    return dict(series)
+
+
+def _fit(job):
+    # Exécuté dans un processus du pool : aucun accès à la base
+    seller_id, labels, values, periods, path = job
+    try:
+        return seller_id, forecasting.backend(path).fit(labels, values, periods), ''
+    except Exception as exc:
+        return seller_id, None, str(exc) or exc.__class__.__name__
+
+
+def _fit_batch(model, jobs, periods):
+    """Toutes les séries en un appel (modèles vectorisés)."""
+    try:
+        fitted = model.fit_many([(labels, values) for _, labels, values, _, _ in jobs], periods)
+    except Exception as exc:
+        return [(job[0], None, str(exc) or exc.__class__.__name__) for job in jobs]
+    return [(job[0], forecast, '') for job, forecast in zip(jobs, fitted)]
+
+
+def run(seller_ids=None, periods=None, processes=None, backend=None):
+    """Ajuste et enregistre les prévisions de tous les vendeurs ; renvoie (ajustées, en échec).
+
+    Un modèle vectorisé (`batched`) traite toutes les séries dans ce processus ;
+    les autres (Prophet) sont répartis sur un pool de processus.
+    """
+    periods = periods or horizon()
+    processes = processes or workers()
+    model = forecasting.backend(backend)
+    series = monthly_series(seller_ids)
+    jobs = [
+        (seller_id, labels, values, periods, backend)
+        for seller_id, (labels, values) in series.items() if len(values) >= MIN_POINTS
+    ]
+    if model.batched:
+        results = _fit_batch(model, jobs, periods)
+    elif processes > 1 and len(jobs) > 1:
+        # Les processus forkés ne doivent pas hériter des connexions ouvertes
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=min(processes, len(jobs))) as pool:
+            results = list(pool.map(_fit, jobs, chunksize=max(1, len(jobs) // (processes * 4))))
+    else:
+        results = [_fit(job) for job in jobs]
+
+    fitted_at = timezone.now()
+    points = {seller_id: len(values) for seller_id, (_, values) in series.items()}
+    empty = forecasting.result([], [], [], [])
+    SalesForecast.objects.bulk_create(
+        [
+            SalesForecast(
+                seller_id=seller_id, horizon=periods, history_points=points[seller_id],
+                fitted_at=fitted_at, error=error, **(forecast or empty),
+            )
+            for seller_id, forecast, error in results
+        ],
+        update_conflicts=True,
+        unique_fields=['seller'],
+        update_fields=['horizon', 'labels', 'values', 'lower', 'upper', 'history_points', 'fitted_at', 'error'],
+    )
+    failed = [seller_id for seller_id, _, error in results if error]
+    for seller_id in failed:
+        logger.warning("Prévision impossible pour le vendeur %s", seller_id)
+    return len(results) - len(failed), len(failed)
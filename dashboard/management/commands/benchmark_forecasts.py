@@ -0,0 +1,72 @@
+import math
+import random
+
+from django.core.management.base import BaseCommand
+from dashboard import forecasting
+from store.benchmarks import timed
+
+
+def synthetic_histories(count, holdout, seed=0):
+    """Séries mensuelles de 6 à 24 mois : tendance + saisonnalité annuelle + bruit."""
+    rng = random.Random(seed)
+    histories = []
+    for _ in range(count):
+        months = rng.randint(6, 24) + holdout
+        base, slope = rng.uniform(200, 5000), rng.uniform(-0.02, 0.05)
+        season, noise = rng.uniform(0, 0.3), rng.uniform(0.02, 0.15)
+        values = [
+            max(0.0, base * (1 + slope * t) * (1 + season * math.sin(2 * math.pi * t / 12)) * (1 + rng.gauss(0, noise)))
+            for t in range(months)
+        ]
+        labels = forecasting.future_months('2023-12', months)
+        histories.append((labels, values))
+    return histories
+
+
+def smape(actual, predicted):
+    """Erreur absolue symétrique moyenne en % (0 : parfait)."""
+    terms = [
+        2 * abs(p - a) / (abs(a) + abs(p)) if abs(a) + abs(p) else 0.0
+        for a, p in zip(actual, predicted)
+    ]
+    return 100 * sum(terms) / len(terms)
+
+
+def coverage(actual, forecast):
+    inside = sum(lo <= a <= hi for a, lo, hi in zip(actual, forecast['lower'], forecast['upper']))
+    return 100 * inside / len(actual)
+
+
+class Command(BaseCommand):
+    help = "Compare les modèles de prévision (précision sur les derniers mois retenus et durée d'ajustement)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sellers', type=int, default=200, help='Nombre de séries synthétiques')
+        parser.add_argument('--holdout', type=int, default=3, help='Mois retenus pour mesurer l\'erreur')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        holdout = options['holdout']
+        histories = synthetic_histories(options['sellers'], holdout, options['seed'])
+        train = [(labels[:-holdout], values[:-holdout]) for labels, values in histories]
+        actual = [values[-holdout:] for _, values in histories]
+        self.stdout.write(f"{len(histories)} séries, {holdout} mois retenus...")
+
+        for label, path in (
+            ('numpy', 'dashboard.forecasting.DampedTrendBackend'),
+            ('prophet', 'dashboard.forecasting.ProphetBackend'),
+        ):
+            model = forecasting.backend(path)
+            try:
+                elapsed, fitted = timed(model.fit_many, train, holdout)
+            except ImportError as exc:
+                self.stdout.write(f"  {label:<8} ignoré ({exc})")
+                continue
+            errors = [smape(a, f['values']) for a, f in zip(actual, fitted)]
+            covered = [coverage(a, f) for a, f in zip(actual, fitted)]
+            self.stdout.write(
+                f"  {label:<8} total={elapsed:10.1f} ms  par série={elapsed / len(train):8.2f} ms  "
+                f"sMAPE={sum(errors) / len(errors):6.2f} %  couverture 80 %={sum(covered) / len(covered):6.1f} %"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Terminé.'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from dashboard import forecasts
+
+class Command(BaseCommand):
+    help = 'Calcule les prévisions de ventes de tous les vendeurs en parallèle (à planifier, ex. cron quotidien)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon', type=int, help='Nombre de mois prévus (défaut : FORECAST_HORIZON)')
+        parser.add_argument('--workers', type=int, help='Processus du pool (défaut : FORECAST_WORKERS ou un par cœur)')
+        parser.add_argument('--seller', type=int, action='append', help='Limiter à ce vendeur (répétable)')
+        parser.add_argument('--backend', help="Classe du modèle (défaut : FORECAST_BACKEND)")
+
+    def handle(self, *args, **options):
+        self.stdout.write('Calcul des prévisions de ventes...')
+        fitted, failed = forecasts.run(options['seller'], options['horizon'], options['workers'], options['backend'])
+        self.stdout.write(self.style.SUCCESS(f'{fitted} prévision(s) enregistrée(s), {failed} en échec.'))
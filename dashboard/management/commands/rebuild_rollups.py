@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from dashboard import rollups
+
+class Command(BaseCommand):
+    help = 'Recalcule les agrégats quotidiens du tableau de bord (ventes, commandes, avis, demandes) depuis l\'historique'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Recalcul des agrégats du tableau de bord...')
+        rows = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{rows} ligne(s) écrite(s).'))
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-18 20:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('horizon', models.PositiveSmallIntegerField()),
+                ('labels', models.JSONField(default=list)),
+                ('values', models.JSONField(default=list)),
+                ('history_points', models.PositiveIntegerField(default=0)),
+                ('fitted_at', models.DateTimeField()),
+                ('error', models.TextField(blank=True)),
+                ('seller', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sales_forecast', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Prévision des ventes',
+                'verbose_name_plural': 'Prévisions des ventes',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_salesforecast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salesforecast',
+            name='lower',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='salesforecast',
+            name='upper',
+            field=models.JSONField(default=list),
+        ),
+    ]
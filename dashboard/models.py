@@ -1,3 +1,80 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+# === Tables d'agrégats du tableau de bord (voir dashboard.rollups) ===
+class DailyStats(models.Model):
+    """Faits d'une journée, incrémentés à chaque événement (commande, vue, avis, demande)."""
+    date = models.DateField()
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    orders = models.PositiveIntegerField(default=0)
+    views = models.PositiveIntegerField(default=0)
+    requests = models.PositiveIntegerField(default=0)
+    reviews = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class SellerDailyStats(DailyStats):
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_stats')
+
+    class Meta:
+        verbose_name = "Statistiques vendeur du jour"
+        verbose_name_plural = "Statistiques vendeur par jour"
+        unique_together = ('seller', 'date')
+
+    def __str__(self):
+        return f"{self.seller_id} - {self.date}"
+
+
+class ProductDailyStats(DailyStats):
+    product = models.ForeignKey('store.Product', on_delete=models.CASCADE, related_name='daily_stats')
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='product_daily_stats')
+
+    class Meta:
+        verbose_name = "Statistiques produit du jour"
+        verbose_name_plural = "Statistiques produit par jour"
+        unique_together = ('product', 'date')
+        indexes = [models.Index(fields=['seller', 'date'])]
+
+    def __str__(self):
+        return f"{self.product_id} - {self.date}"
+
+
+class SellerStatusTotal(models.Model):
+    """Montant des commandes d'un vendeur par statut, déplacé à chaque changement de statut."""
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='status_totals')
+    status = models.CharField(max_length=20)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Total vendeur par statut"
+        verbose_name_plural = "Totaux vendeur par statut"
+        unique_together = ('seller', 'status')
+
+    def __str__(self):
+        return f"{self.seller_id} - {self.status}"
+
+
+class SalesForecast(models.Model):
+    """Prévision mensuelle des ventes d'un vendeur, calculée par la commande forecast_sales."""
+    seller = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sales_forecast')
+    horizon = models.PositiveSmallIntegerField()
+    labels = models.JSONField(default=list)
+    values = models.JSONField(default=list)
+    lower = models.JSONField(default=list)
+    upper = models.JSONField(default=list)
+    history_points = models.PositiveIntegerField(default=0)
+    fitted_at = models.DateTimeField()
+    error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Prévision des ventes"
+        verbose_name_plural = "Prévisions des ventes"
+
+    def __str__(self):
+        return f"{self.seller_id} - {self.horizon} mois ({self.fitted_at:%d/%m/%Y})"
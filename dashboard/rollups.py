@@ -0,0 +1,261 @@
+# dashboard/rollups.py - Agrégats quotidiens par vendeur et par produit pour StatisticsView
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .models import ProductDailyStats, SellerDailyStats, SellerStatusTotal
+
+FIELDS = ('units', 'revenue', 'orders', 'views', 'requests', 'reviews', 'rating_sum')
+
+
+def day_of(moment):
+    return timezone.localdate(moment) if moment else timezone.localdate()
+
+
+def _added(field, amount):
+    # Colonnes positives : un retrait ne descend pas sous zéro
+    if amount < 0:
+        return Greatest(F(field) + amount, 0)
+    return F(field) + amount
+
+
+def _increment(model, owner, rows, defaults=None):
+    """rows : {(owner_id, date): {champ: delta}} -> lignes créées à zéro si besoin, puis
+    un UPDATE par jour et par combinaison de deltas."""
+    rows = {key: {f: a for f, a in changes.items() if a} for key, changes in rows.items()}
+    rows = {key: changes for key, changes in rows.items() if changes}
+    if not rows:
+        return
+    defaults = defaults or {}
+    model.objects.bulk_create(
+        [model(**{f'{owner}_id': owner_id, 'date': day}, **defaults.get(owner_id, {})) for owner_id, day in rows],
+        ignore_conflicts=True,
+    )
+    groups = defaultdict(list)
+    for (owner_id, day), changes in rows.items():
+        groups[(day, tuple(sorted(changes.items())))].append(owner_id)
+    for (day, changes), owner_ids in groups.items():
+        model.objects.filter(**{f'{owner}_id__in': owner_ids}, date=day).update(
+            **{field: _added(field, amount) for field, amount in changes}
+        )
+
+
+def apply(products, sellers=None, product_sellers=None):
+    """Ajoute des faits : products {(product_id, date): {champ: delta}}, sellers idem par vendeur.
+
+    Sans `sellers`, les totaux vendeur sont la somme des produits (`product_sellers`
+    donne le vendeur de chaque produit).
+    """
+    if sellers is None:
+        sellers = defaultdict(lambda: defaultdict(int))
+        for (product_id, day), changes in products.items():
+            for field, amount in changes.items():
+                sellers[(product_sellers[product_id], day)][field] += amount
+    with transaction.atomic():
+        _increment(ProductDailyStats, 'product', products,
+                   {pid: {'seller_id': sid} for pid, sid in (product_sellers or {}).items()})
+        _increment(SellerDailyStats, 'seller', sellers)
+
+
+def move_status(seller_totals, old_status, new_status):
+    """Déplace {seller_id: (unités, montant)} d'un statut à l'autre (None : aucun)."""
+    if not seller_totals or old_status == new_status:
+        return
+    with transaction.atomic():
+        for status, sign in ((old_status, -1), (new_status, 1)):
+            if status is None:
+                continue
+            SellerStatusTotal.objects.bulk_create(
+                [SellerStatusTotal(seller_id=seller_id, status=status) for seller_id in seller_totals],
+                ignore_conflicts=True,
+            )
+            for seller_id, (units, revenue) in seller_totals.items():
+                SellerStatusTotal.objects.filter(seller_id=seller_id, status=status).update(
+                    units=F('units') + sign * units, revenue=F('revenue') + sign * revenue,
+                )
+
+
+# === Événements ===
+
+def record_order_lines(order, lines):
+    """Lignes de commande [(product_id, seller_id, quantité, montant)] d'une commande nouvelle."""
+    day = day_of(order.created_at)
+    products = defaultdict(lambda: defaultdict(int))
+    sellers = defaultdict(lambda: defaultdict(int))
+    product_sellers, totals = {}, defaultdict(lambda: [0, Decimal('0')])
+    for product_id, seller_id, quantity, amount in lines:
+        product_sellers[product_id] = seller_id
+        for rows, key in ((products, (product_id, day)), (sellers, (seller_id, day))):
+            rows[key]['units'] += quantity
+            rows[key]['revenue'] += amount
+        totals[seller_id][0] += quantity
+        totals[seller_id][1] += amount
+    for product_id in product_sellers:
+        products[(product_id, day)]['orders'] = 1
+    for seller_id in totals:
+        sellers[(seller_id, day)]['orders'] = 1
+    with transaction.atomic():
+        apply(products, sellers, product_sellers)
+        move_status({sid: tuple(t) for sid, t in totals.items()}, None, order.status)
+
+
+def record_line(item, first_for_seller):
+    """OrderItem créé hors de store.orders (ajout ligne par ligne)."""
+    from store.models import Order
+
+    order = Order.objects.only('created_at', 'status').get(pk=item.order_id)
+    seller_id = item.product.seller_id
+    day = day_of(order.created_at)
+    changes = {'units': item.quantity, 'revenue': item.total_price, 'orders': 1}
+    with transaction.atomic():
+        apply(
+            {(item.product_id, day): changes},
+            {(seller_id, day): dict(changes, orders=1 if first_for_seller else 0)},
+            {item.product_id: seller_id},
+        )
+        move_status({seller_id: (item.quantity, item.total_price)}, None, order.status)
+
+
+def record_status_change(order, old_status):
+    from store.models import OrderItem
+
+    totals = {
+        row['product__seller_id']: (row['units'] or 0, row['revenue'] or Decimal('0'))
+        for row in OrderItem.objects.filter(order=order).values('product__seller_id')
+        .annotate(units=Sum('quantity'), revenue=Sum('total_price')).order_by()
+    }
+    move_status(totals, old_status, order.status)
+
+
+def record_product_events(product_deltas, field, day=None):
+    """{product_id: n} pour `field` (vues, demandes, avis...) à la date du jour."""
+    from store.models import Product
+
+    product_deltas = {pid: n for pid, n in product_deltas.items() if n}
+    if not product_deltas:
+        return
+    day = day or timezone.localdate()
+    product_sellers = dict(Product.objects.filter(pk__in=product_deltas).values_list('pk', 'seller_id'))
+    apply(
+        {(pid, day): {field: n} for pid, n in product_deltas.items() if pid in product_sellers},
+        product_sellers=product_sellers,
+    )
+
+
+def record_review(product_id, day, count, rating):
+    from store.models import Product
+
+    seller_id = Product.objects.filter(pk=product_id).values_list('seller_id', flat=True).first()
+    if seller_id is None:
+        return
+    apply({(product_id, day): {'reviews': count, 'rating_sum': rating}}, product_sellers={product_id: seller_id})
+
+
+# === Recalcul complet ===
+
+def _merge(rows, key_fields, values, target):
+    for row in rows:
+        key = tuple(row[f] for f in key_fields)
+        for field, source in values.items():
+            target[key][field] += row[source] or 0
+
+
+def rebuild():
+    """Recalcule toutes les tables depuis les commandes, avis et demandes ; renvoie le nombre de lignes.
+
+    Les vues n'ont pas d'autre historique que ces tables : celles déjà comptées sont conservées.
+    """
+    from store.models import OrderItem, ProductRequest, Review
+
+    products = defaultdict(lambda: defaultdict(int))
+    sellers = defaultdict(lambda: defaultdict(int))
+    product_sellers = {}
+
+    lines = OrderItem.objects.annotate(day=TruncDate('order__created_at'))
+    rows = list(
+        lines.values('product_id', 'product__seller_id', 'day')
+        .annotate(u=Sum('quantity'), r=Sum('total_price'), o=Count('order', distinct=True)).order_by()
+    )
+    _merge(rows, ('product_id', 'day'), {'units': 'u', 'revenue': 'r', 'orders': 'o'}, products)
+    _merge(rows, ('product__seller_id', 'day'), {'units': 'u', 'revenue': 'r'}, sellers)
+    _merge(
+        lines.values('product__seller_id', 'day').annotate(o=Count('order', distinct=True)).order_by(),
+        ('product__seller_id', 'day'), {'orders': 'o'}, sellers,
+    )
+    product_sellers.update((row['product_id'], row['product__seller_id']) for row in rows)
+
+    sources = [
+        (Review.objects.all(), {'reviews': 'n', 'rating_sum': 'rating'}),
+        (ProductRequest.objects.all(), {'requests': 'n'}),
+    ]
+    for queryset, values in sources:
+        rows = list(
+            queryset.annotate(day=TruncDate('created_at')).values('product_id', 'product__seller_id', 'day')
+            .annotate(n=Count('pk'), **({'rating': Sum('rating')} if 'rating_sum' in values else {})).order_by()
+        )
+        _merge(rows, ('product_id', 'day'), values, products)
+        _merge(rows, ('product__seller_id', 'day'), values, sellers)
+        product_sellers.update((row['product_id'], row['product__seller_id']) for row in rows)
+
+    views = ProductDailyStats.objects.filter(views__gt=0).values_list('product_id', 'seller_id', 'date', 'views')
+    for product_id, seller_id, day, count in views:
+        products[(product_id, day)]['views'] += count
+        sellers[(seller_id, day)]['views'] += count
+        product_sellers.setdefault(product_id, seller_id)
+
+    status_rows = (
+        OrderItem.objects.values('product__seller_id', 'order__status')
+        .annotate(u=Sum('quantity'), r=Sum('total_price')).order_by()
+    )
+    with transaction.atomic():
+        ProductDailyStats.objects.all().delete()
+        SellerDailyStats.objects.all().delete()
+        SellerStatusTotal.objects.all().delete()
+        ProductDailyStats.objects.bulk_create([
+            ProductDailyStats(product_id=pid, seller_id=product_sellers[pid], date=day, **changes)
+            for (pid, day), changes in products.items()
+        ], batch_size=2000)
+        SellerDailyStats.objects.bulk_create([
+            SellerDailyStats(seller_id=sid, date=day, **changes) for (sid, day), changes in sellers.items()
+        ], batch_size=2000)
+        SellerStatusTotal.objects.bulk_create([
+            SellerStatusTotal(seller_id=row['product__seller_id'], status=row['order__status'],
+                              units=row['u'] or 0, revenue=row['r'] or 0)
+            for row in status_rows
+        ])
+    return len(products) + len(sellers)
+
+
+# === Lecture ===
+
+def summary(seller, start=None, end=None, category=None):
+    """Séries quotidiennes, totaux par produit sur la période et totaux par statut (trois requêtes).
+
+    Le coût dépend du nombre de jours et de produits, pas du nombre de commandes.
+    """
+    daily = ProductDailyStats.objects.filter(seller=seller) if category else SellerDailyStats.objects.filter(seller=seller)
+    per_product = ProductDailyStats.objects.filter(seller=seller)
+    if category:
+        daily = daily.filter(product__category=category)
+        per_product = per_product.filter(product__category=category)
+    if start:
+        daily, per_product = daily.filter(date__gte=start), per_product.filter(date__gte=start)
+    if end:
+        daily, per_product = daily.filter(date__lte=end), per_product.filter(date__lte=end)
+    sums = {field: Sum(field) for field in FIELDS}
+    return {
+        'days': list(daily.values('date').annotate(**sums).order_by('date')),
+        'products': list(
+            per_product.values('product_id', 'product__name', 'product__stock').annotate(**sums).order_by()
+        ),
+        'statuses': {
+            status: (units, revenue)
+            for status, units, revenue in SellerStatusTotal.objects.filter(seller=seller)
+            .values_list('status', 'units', 'revenue')
+        },
+    }
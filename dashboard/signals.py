@@ -0,0 +1,84 @@
+# dashboard/signals.py - Alimente les agrégats du tableau de bord (dashboard.rollups)
+
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from store import counters, orders
+from store.models import Order, OrderItem, ProductRequest, Review
+
+from . import rollups
+
+logger = logging.getLogger(__name__)
+
+
+def _after_commit(func, *args):
+    # Les agrégats suivent la transaction sans l'allonger ; un échec est rattrapé
+    # par la commande rebuild_rollups
+    def run():
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("Agrégats du tableau de bord non mis à jour (%s)", func.__name__)
+    transaction.on_commit(run)
+
+
+@receiver(orders.order_placed)
+def record_placed_order(sender, order, items, **kwargs):
+    lines = [(item.product_id, item.seller_id, item.quantity, item.total_price) for item in items]
+    _after_commit(rollups.record_order_lines, order, lines)
+
+
+@receiver(post_save, sender=OrderItem)
+def record_order_item(sender, instance, created, **kwargs):
+    if not created:
+        return
+    first_for_seller = not OrderItem.objects.filter(
+        order_id=instance.order_id, product__seller_id=instance.product.seller_id
+    ).exclude(pk=instance.pk).exists()
+    _after_commit(rollups.record_line, instance, first_for_seller)
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    instance._status_before = None
+    if instance.pk:
+        instance._status_before = Order.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Order)
+def record_order_status(sender, instance, created, **kwargs):
+    before = getattr(instance, '_status_before', None)
+    if not created and before is not None and before != instance.status:
+        _after_commit(rollups.record_status_change, instance, before)
+
+
+@receiver(counters.flushed)
+def record_views(sender, deltas, **kwargs):
+    views = {product_id: changes.get('views', 0) for product_id, changes in deltas.items()}
+    _after_commit(rollups.record_product_events, views, 'views')
+
+
+@receiver(post_save, sender=Review)
+def record_review(sender, instance, created, **kwargs):
+    day = rollups.day_of(instance.created_at)
+    if created:
+        _after_commit(rollups.record_review, instance.product_id, day, 1, instance.rating)
+        return
+    # Note modifiée : l'ancienne valeur est relue par store.signals.remember_review_rating
+    before = getattr(instance, '_rating_before', None)
+    if before and before['rating'] != instance.rating:
+        _after_commit(rollups.record_review, instance.product_id, day, 0, instance.rating - before['rating'])
+
+
+@receiver(post_delete, sender=Review)
+def remove_review(sender, instance, **kwargs):
+    _after_commit(rollups.record_review, instance.product_id, rollups.day_of(instance.created_at), -1, -instance.rating)
+
+
+@receiver(post_save, sender=ProductRequest)
+def record_product_request(sender, instance, created, **kwargs):
+    if created:
+        _after_commit(rollups.record_product_events, {instance.product_id: 1}, 'requests')
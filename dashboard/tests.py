@@ -1,3 +1,221 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from store import counters, orders
+from store.models import Cart, CartItem, Category, Order, OrderItem, Product, ProductRequest, Review
+
+from . import forecasting, forecasts, rollups
+from .models import ProductDailyStats, SalesForecast, SellerDailyStats, SellerStatusTotal
+
+User = get_user_model()
+
+
+class RollupsTest(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@example.com',
+            password='testpass123',
+            user_type='buyer'
+        )
+        self.category = Category.objects.create(name='Mode', slug='mode')
+        self.robe, self.jupe = [
+            Product.objects.create(
+                seller=self.seller, category=self.category, name=name, description='Description',
+                price=price, stock=20, status='active',
+            )
+            for name, price in (('Robe', Decimal('20.00')), ('Jupe', Decimal('15.00')))
+        ]
+
+    def place_order(self, *lines):
+        cart, _ = Cart.objects.get_or_create(user=self.buyer)
+        for product, quantity in lines:
+            CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+        with self.captureOnCommitCallbacks(execute=True):
+            order, _ = orders.place_order(self.buyer)
+        return order
+
+    def seller_day(self):
+        return SellerDailyStats.objects.get(seller=self.seller, date=timezone.localdate())
+
+    def test_order_events(self):
+        """Une commande alimente les faits du jour, produit et vendeur"""
+        self.place_order((self.robe, 2), (self.jupe, 1))
+        self.place_order((self.robe, 1))
+        day = self.seller_day()
+        self.assertEqual((day.units, day.revenue, day.orders), (4, Decimal('75.00'), 2))
+        robe = ProductDailyStats.objects.get(product=self.robe)
+        self.assertEqual((robe.units, robe.revenue, robe.orders, robe.seller_id), (3, Decimal('60.00'), 2, self.seller.pk))
+        self.assertEqual(SellerStatusTotal.objects.get(seller=self.seller, status='pending').revenue, Decimal('75.00'))
+
+    def test_status_change_moves_totals(self):
+        order = self.place_order((self.robe, 2))
+        order.status = 'shipped'
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+        totals = dict(SellerStatusTotal.objects.filter(seller=self.seller).values_list('status', 'revenue'))
+        self.assertEqual(totals, {'pending': Decimal('0.00'), 'shipped': Decimal('40.00')})
+
+    def test_views_and_reviews(self):
+        counters.increment(self.robe.pk, 'views', 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            counters.flush()
+        with self.captureOnCommitCallbacks(execute=True):
+            review = Review.objects.create(product=self.robe, user=self.buyer, rating=4, comment='Bien')
+        with self.captureOnCommitCallbacks(execute=True):
+            review.rating = 2
+            review.save()
+        day = self.seller_day()
+        self.assertEqual((day.views, day.reviews, day.rating_sum), (3, 1, 2))
+
+    def test_summary_reads_rollups_only(self):
+        """Le résumé ne dépend pas du nombre de commandes"""
+        for _ in range(3):
+            self.place_order((self.robe, 1), (self.jupe, 1))
+        with self.assertNumQueries(3):
+            stats = rollups.summary(self.seller)
+        self.assertEqual(len(stats['days']), 1)
+        self.assertEqual(stats['days'][0]['orders'], 3)
+        self.assertEqual({row['product__name']: row['units'] for row in stats['products']}, {'Robe': 3, 'Jupe': 3})
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        self.assertEqual(rollups.summary(self.seller, start=tomorrow)['days'], [])
+
+    def test_rebuild_matches_incremental(self):
+        """Le recalcul retrouve les agrégats incrémentaux et garde les vues"""
+        self.place_order((self.robe, 2), (self.jupe, 1))
+        order = Order.objects.create(user=self.buyer, total=Decimal('15.00'), status='delivered')
+        with self.captureOnCommitCallbacks(execute=True):
+            OrderItem.objects.create(
+                order=order, product=self.jupe, seller=self.seller,
+                quantity=1, unit_price=Decimal('15.00'), total_price=Decimal('15.00'),
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductRequest.objects.create(product=self.robe, user=self.buyer, message='Taille M ?')
+        counters.increment(self.jupe.pk, 'views', 5)
+        with self.captureOnCommitCallbacks(execute=True):
+            counters.flush()
+        fields = ('date', 'units', 'revenue', 'orders', 'views', 'requests', 'reviews', 'rating_sum')
+        incremental = list(SellerDailyStats.objects.values_list(*fields))
+        products = sorted(ProductDailyStats.objects.values_list('product_id', *fields))
+        statuses = sorted(SellerStatusTotal.objects.values_list('status', 'units', 'revenue'))
+        rollups.rebuild()
+        self.assertEqual(list(SellerDailyStats.objects.values_list(*fields)), incremental)
+        self.assertEqual(sorted(ProductDailyStats.objects.values_list('product_id', *fields)), products)
+        self.assertEqual(sorted(SellerStatusTotal.objects.values_list('status', 'units', 'revenue')), statuses)
+        # La demande compte aussi comme une vue (store.signals)
+        self.assertEqual(incremental[0][1:6], (4, Decimal('70.00'), 2, 6, 1))
+
+    def test_statistics_view(self):
+        """La page de statistiques se charge et lit les agrégats"""
+        self.place_order((self.robe, 2), (self.jupe, 1))
+        self.client.force_login(self.seller)
+        response = self.client.get(reverse('dashboard:statistics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_sales'], 55.0)
+        self.assertEqual(response.context['order_status_breakdown']['pending'], 55.0)
+
+
+class SalesForecastTest(TestCase):
+    def setUp(self):
+        self.sellers = [
+            User.objects.create_user(
+                username=f'seller{i}',
+                email=f'seller{i}@example.com',
+                password='testpass123',
+                user_type='seller'
+            )
+            for i in range(3)
+        ]
+        month = timezone.localdate().replace(day=1)
+        for months in range(4):
+            for i, seller in enumerate(self.sellers):
+                # Le troisième vendeur n'a qu'un mois d'historique : pas de prévision
+                if i < 2 or months == 0:
+                    SellerDailyStats.objects.create(seller=seller, date=month, revenue=Decimal(100 * (months + 1)))
+            month = (month - timedelta(days=1)).replace(day=1)
+
+    def test_monthly_series(self):
+        series = forecasts.monthly_series()
+        labels, values = series[self.sellers[0].pk]
+        self.assertEqual(len(labels), 4)
+        self.assertEqual(labels, sorted(labels))
+        self.assertEqual(values, [400.0, 300.0, 200.0, 100.0])
+
+    def test_run_stores_forecasts(self):
+        """Un ajustement par vendeur ayant assez d'historique, enregistré avec l'horizon et l'intervalle"""
+        self.assertEqual(forecasts.run(periods=3, processes=1), (2, 0))
+        forecasts.run(periods=6, processes=1)
+        forecast = SalesForecast.objects.get(seller=self.sellers[0])
+        self.assertEqual((forecast.horizon, forecast.history_points), (6, 4))
+        self.assertEqual([len(forecast.labels), len(forecast.lower), len(forecast.upper)], [6, 6, 6])
+        self.assertTrue(all(lo <= v <= hi for lo, v, hi in zip(forecast.lower, forecast.values, forecast.upper)))
+        self.assertFalse(SalesForecast.objects.filter(seller=self.sellers[2]).exists())
+
+    def test_unbatched_backend(self):
+        fitted = []
+
+        def fake_fit(backend, labels, values, periods):
+            fitted.append(labels[-1])
+            return forecasting.result(['f'] * periods, [values[-1]] * periods, [0] * periods, [999] * periods)
+
+        with mock.patch.object(forecasting.Backend, 'fit', fake_fit):
+            self.assertEqual(forecasts.run(periods=2, processes=1, backend='dashboard.forecasting.Backend'), (2, 0))
+        self.assertEqual(len(fitted), 2)
+        self.assertEqual(SalesForecast.objects.get(seller=self.sellers[0]).values, [100.0, 100.0])
+
+    def test_failed_fit_is_recorded(self):
+        with mock.patch.object(forecasting.DampedTrendBackend, 'fit_many', side_effect=RuntimeError('divergence')):
+            self.assertEqual(forecasts.run(processes=1), (0, 2))
+        self.assertEqual(SalesForecast.objects.get(seller=self.sellers[1]).error, 'divergence')
+
+
+class DampedTrendBackendTest(SimpleTestCase):
+    def setUp(self):
+        self.backend = forecasting.DampedTrendBackend()
+        self.labels = forecasting.future_months('2025-12', 12)
+
+    def test_future_months(self):
+        self.assertEqual(forecasting.future_months('2026-11', 3), ['2026-12', '2027-01', '2027-02'])
+
+    def test_linear_series(self):
+        """Une tendance nette est prolongée (légèrement amortie), intervalle quasi nul"""
+        forecast = self.backend.fit(self.labels, [100.0 + 10 * t for t in range(12)], 3)
+        self.assertEqual(forecast['labels'], ['2027-01', '2027-02', '2027-03'])
+        for value, expected in zip(forecast['values'], (220, 230, 240)):
+            self.assertAlmostEqual(value, expected, delta=3)
+        self.assertLess(forecast['upper'][0] - forecast['lower'][0], 5)
+
+    def test_interval_widens(self):
+        values = [100, 140, 90, 130, 110, 150, 95, 125, 105, 145, 100, 135]
+        forecast = self.backend.fit(self.labels, values, 6)
+        widths = [hi - lo for lo, hi in zip(forecast['lower'], forecast['upper'])]
+        self.assertGreater(widths[0], 0)
+        self.assertEqual(widths, sorted(widths))
+        self.assertTrue(all(v >= 0 for v in forecast['lower']))
+
+    def test_batch_matches_single(self):
+        """Des séries de longueurs différentes ajustées ensemble donnent les mêmes prévisions"""
+        series = [
+            (self.labels, [50.0 + 5 * t + (t % 3) * 4 for t in range(12)]),
+            (self.labels[-4:], [10.0, 30.0, 20.0, 40.0]),
+            (self.labels[-2:], [0.0, 0.0]),
+        ]
+        batch = self.backend.fit_many(series, 4)
+        for (labels, values), forecast in zip(series, batch):
+            single = self.backend.fit(labels, values, 4)
+            self.assertEqual(forecast['labels'], single['labels'])
+            for key in ('values', 'lower', 'upper'):
+                for a, b in zip(forecast[key], single[key]):
+                    self.assertAlmostEqual(a, b)
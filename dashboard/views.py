@@ -1,22 +1,21 @@
 from django.views.generic import TemplateView, ListView, CreateView, UpdateView, DeleteView, View
-from django.db.models import Sum, Count, Avg
-from store.models import Order, OrderItem, Product, ProductView, Notification, ProductRequest, Review, SellerProfile
+from django.db.models import Sum, F
+from accounts.models import SellerProfile
+from store.models import Order, OrderItem, Product, Notification, ProductRequest, Review
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
 from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
+from django.http import JsonResponse
 from datetime import datetime
 from django.urls import reverse
-from django.db.models.functions import TruncDate, TruncMonth
+from store import exports
 from .forms import StatisticsFilterForm, ProductForm, ReturnRequestForm
-from prophet import Prophet
-import pandas as pd
+from . import forecasts, rollups
+from .models import SalesForecast
 from decimal import Decimal
 from admin_panel.models import ProductModeration
-from datetime import timedelta
 from returns.models import ReturnRequest
-import csv
 
 class OverviewView(LoginRequiredMixin, TemplateView):
     template_name = 'dashboard/overview.html'
@@ -144,7 +143,7 @@ class ProductsView(LoginRequiredMixin, ListView):
         user = self.request.user
         if user.user_type not in ['seller', 'admin']:
             raise PermissionDenied("Accès réservé aux vendeurs et admins")
-        return Product.objects.filter(seller=user, is_sold=False, sold_out=False).order_by('-created_at')
+        return Product.objects.filter(seller=user, is_sold=False, sold_out=False).order_by('-created_at').cards()
 
 class ProductCreateView(LoginRequiredMixin, CreateView):
     model = Product
@@ -250,14 +249,15 @@ class ReportsView(LoginRequiredMixin, View):
         if request.user.user_type not in ['seller', 'admin']:
             raise PermissionDenied("Accès réservé aux vendeurs et admins")
         
-        orders = Order.objects.filter(items__product__seller=request.user, status='delivered')
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="sales_report_' + datetime.now().strftime('%Y%m%d') + '.csv"'
-        writer = csv.writer(response)
-        writer.writerow(['Order ID', 'Date', 'Total', 'Customer'])
-        for order in orders:
-            writer.writerow([order.id, order.created_at, order.total, order.user.username])
-        return response
+        orders = Order.objects.filter(
+            items__product__seller=request.user, status='delivered',
+        ).annotate(customer=F('user__username')).order_by('pk').distinct()
+        return exports.from_request(request, orders, [
+            ('id', 'Order ID'),
+            ('created_at', 'Date'),
+            ('total', 'Total'),
+            ('customer', 'Customer'),
+        ], 'sales_report_' + datetime.now().strftime('%Y%m%d'))
 
 class StatisticsView(LoginRequiredMixin, TemplateView):
     template_name = 'dashboard/statistics.html'
@@ -278,72 +278,51 @@ class StatisticsView(LoginRequiredMixin, TemplateView):
         context['filter_form'] = form
         context['horizon'] = str(horizon)
 
-        # Base QuerySets
-        base_qs = OrderItem.objects.filter(product__seller=user)
+        # Agrégats quotidiens (dashboard.rollups) : le coût suit la période, pas l'historique
+        start_date = end_date = category = None
         product_qs = Product.objects.filter(seller=user)
-        request_qs = ProductRequest.objects.filter(product__seller=user)
-        view_qs = ProductView.objects.filter(product__seller=user)
-        review_qs = Review.objects.filter(product__seller=user)
-
-        # Appliquer les filtres
         if form.is_valid():
-            if form.cleaned_data['start_date']:
-                start_date = form.cleaned_data['start_date']
-                base_qs = base_qs.filter(order__created_at__gte=start_date)
+            start_date = form.cleaned_data['start_date']
+            end_date = form.cleaned_data['end_date']
+            category = form.cleaned_data['category']
+            if start_date:
                 product_qs = product_qs.filter(created_at__gte=start_date)
-                request_qs = request_qs.filter(created_at__gte=start_date)
-                view_qs = view_qs.filter(view_date__gte=start_date)
-                review_qs = review_qs.filter(created_at__gte=start_date)
-            if form.cleaned_data['end_date']:
-                end_date = form.cleaned_data['end_date']
-                base_qs = base_qs.filter(order__created_at__lte=end_date)
+            if end_date:
                 product_qs = product_qs.filter(created_at__lte=end_date)
-                request_qs = request_qs.filter(created_at__lte=end_date)
-                view_qs = view_qs.filter(view_date__lte=end_date)
-                review_qs = review_qs.filter(created_at__lte=end_date)
-            if form.cleaned_data['category']:
-                category = form.cleaned_data['category']
+            if category:
                 product_qs = product_qs.filter(category=category)
-                base_qs = base_qs.filter(product__category=category)
-                request_qs = request_qs.filter(product__category=category)
-                view_qs = view_qs.filter(product__category=category)
-                review_qs = review_qs.filter(product__category=category)
+        stats = rollups.summary(user, start_date, end_date, category)
+        days, per_product = stats['days'], stats['products']
 
         # Ventes par mois
-        sales_data = base_qs.annotate(month=TruncMonth('order__created_at')).values('month').annotate(total=Sum('price')).order_by('month')
-        context['sales_labels'] = [item['month'].strftime('%Y-%m') if item['month'] else 'N/A' for item in sales_data]
-        context['sales_data'] = [float(item['total'] or 0) for item in sales_data]
+        monthly = {}
+        for day in days:
+            month = day['date'].strftime('%Y-%m')
+            monthly[month] = monthly.get(month, 0) + float(day['revenue'] or 0)
+        context['sales_labels'] = sorted(monthly)
+        context['sales_data'] = [monthly[month] for month in context['sales_labels']]
         context['total_sales'] = sum(context['sales_data']) if context['sales_data'] else 0
         context['avg_monthly_sales'] = context['total_sales'] / len(context['sales_data']) if context['sales_data'] else 0
 
-        # Prévisions avec Prophet
+        # Prévisions : calculées hors requête par la commande forecast_sales
+        forecast = SalesForecast.objects.filter(seller=user).first()
         context['forecast_labels'] = []
         context['forecast_data'] = []
-        if context['sales_labels'] and len(context['sales_labels']) >= 2:  # Minimum 2 points pour Prophet
-            try:
-                df = pd.DataFrame({
-                    'ds': [pd.to_datetime(label) for label in context['sales_labels']],
-                    'y': context['sales_data']
-                })
-                model = Prophet(yearly_seasonality=True, weekly_seasonality=False, daily_seasonality=False)
-                model.fit(df)
-                future = model.make_future_dataframe(periods=horizon, freq='M')
-                forecast = model.predict(future)
-                future_dates = forecast['ds'].tail(horizon).tolist()
-                context['forecast_labels'] = [d.strftime('%Y-%m') for d in future_dates]
-                context['forecast_data'] = [max(0, float(y)) for y in forecast['yhat'].tail(horizon)]
-            except Exception as e:
-                context['forecast_labels'] = []
-                context['forecast_data'] = []
-        if not context['forecast_labels']:
-            context['forecast_labels'] = []
-            context['forecast_data'] = []
+        context['forecast_lower'] = []
+        context['forecast_upper'] = []
+        if forecast is not None and not forecast.error:
+            context['forecast_labels'] = forecast.labels[:horizon]
+            context['forecast_data'] = forecast.values[:horizon]
+            context['forecast_lower'] = forecast.lower[:horizon]
+            context['forecast_upper'] = forecast.upper[:horizon]
+        context['forecast_fitted_at'] = forecast.fitted_at if forecast else None
+        context['forecast_pending'] = forecast is None and len(context['sales_labels']) >= forecasts.MIN_POINTS
 
         # Intégration des statuts des commandes
-        pending_orders = Order.objects.filter(items__product__seller=user, status='pending').aggregate(total=Sum('items__price'))['total'] or Decimal('0')
-        processing_orders = Order.objects.filter(items__product__seller=user, status='processing').aggregate(total=Sum('items__price'))['total'] or Decimal('0')
-        shipped_orders = Order.objects.filter(items__product__seller=user, status='shipped').aggregate(total=Sum('items__price'))['total'] or Decimal('0')
-        delivered_orders = Order.objects.filter(items__product__seller=user, status='delivered').aggregate(total=Sum('items__price'))['total'] or Decimal('0')
+        statuses = stats['statuses']
+        pending_orders, processing_orders, shipped_orders, delivered_orders = [
+            Decimal(statuses.get(status, (0, 0))[1] or 0) for status in ('pending', 'processing', 'shipped', 'delivered')
+        ]
         context['short_term_forecast'] = float(pending_orders * Decimal('0.5') + processing_orders * Decimal('0.7'))
         context['order_status_breakdown'] = {
             'pending': float(pending_orders),
@@ -353,80 +332,75 @@ class StatisticsView(LoginRequiredMixin, TemplateView):
         }
 
         # Vues des produits
-        views_data = view_qs.values('view_date').annotate(total_views=Sum('view_count')).order_by('view_date')
-        context['view_labels'] = [
-            item['view_date'].strftime('%Y-%m-%d') if item['view_date'] and hasattr(item['view_date'], 'strftime') else 'N/A'
-            for item in views_data
-        ]
-        context['view_data'] = [int(item['total_views'] or 0) for item in views_data]
+        viewed_days = [day for day in days if day['views']]
+        context['view_labels'] = [day['date'].strftime('%Y-%m-%d') for day in viewed_days]
+        context['view_data'] = [int(day['views']) for day in viewed_days]
         recent_views = sum(context['view_data'][-7:]) if context['view_data'] and len(context['view_data']) >= 7 else sum(context['view_data'] or [0])
         context['view_influence'] = float(recent_views * Decimal('0.1'))
         context['total_views'] = sum(context['view_data']) if context['view_data'] else 0
 
         # Taux de conversion (ventes / vues)
-        total_sold = base_qs.aggregate(total_sold=Sum('quantity'))['total_sold'] or 0
+        total_sold = sum(day['units'] or 0 for day in days)
         context['conversion_rate'] = (total_sold / context['total_views'] * 100) if context['total_views'] > 0 else None
 
         # Stocks par produit
-        stock_data = product_qs.values('name').annotate(total_stock=Sum('stock')).order_by('name')
-        context['stock_labels'] = [item['name'] or 'N/A' for item in stock_data]
-        context['stock_data'] = [int(item['total_stock'] or 0) for item in stock_data]
+        stock_data = list(product_qs.values_list('name', 'stock').order_by('name'))
+        context['stock_labels'] = [name or 'N/A' for name, _ in stock_data]
+        context['stock_data'] = [int(stock or 0) for _, stock in stock_data]
         context['total_stock'] = sum(context['stock_data']) if context['stock_data'] else 0
         context['min_stock'] = min(context['stock_data']) if context['stock_data'] else float('inf')
         context['avg_stock_per_product'] = context['total_stock'] / len(context['stock_data']) if context['stock_data'] else 0
 
         # Stocks critiques
         low_stock_threshold = 10
-        low_stock_products = product_qs.filter(stock__lt=low_stock_threshold).values('name', 'stock')
-        context['low_stock_products'] = list(low_stock_products)
-        revenue_impact = OrderItem.objects.filter(
-            product__seller=user,
-            product__name__in=[p['name'] for p in low_stock_products],
-            order__status__in=['shipped', 'delivered']
-        ).aggregate(total=Sum('price'))['total'] or 0
-        context['low_stock_revenue_impact'] = float(revenue_impact)
+        context['low_stock_products'] = [
+            {'name': name, 'stock': stock} for name, stock in stock_data if stock < low_stock_threshold
+        ]
+        low_stock_names = {p['name'] for p in context['low_stock_products']}
+        context['low_stock_revenue_impact'] = float(sum(
+            row['revenue'] or 0 for row in per_product if row['product__name'] in low_stock_names
+        ))
 
         # Commandes par jour
-        orders_data = Order.objects.filter(items__product__seller=user).annotate(day=TruncDate('created_at')).values('day').annotate(count=Count('id')).order_by('day')
-        context['orders_labels'] = [item['day'].strftime('%Y-%m-%d') if item['day'] else 'N/A' for item in orders_data]
-        context['orders_data'] = [int(item['count'] or 0) for item in orders_data]
+        ordered_days = [day for day in days if day['orders']]
+        context['orders_labels'] = [day['date'].strftime('%Y-%m-%d') for day in ordered_days]
+        context['orders_data'] = [int(day['orders']) for day in ordered_days]
         context['total_orders_count'] = sum(context['orders_data']) if context['orders_data'] else 0
         context['avg_daily_orders'] = context['total_orders_count'] / len(context['orders_labels']) if context['orders_labels'] else 0
 
         # Produits les mieux vendus
-        top_products = base_qs.values('product__name').annotate(total_sold=Sum('quantity')).order_by('-total_sold')[:5]
-        context['top_products_labels'] = [item['product__name'] or 'N/A' for item in top_products]
-        context['top_products_data'] = [int(item['total_sold'] or 0) for item in top_products]
-        context['top_product_revenue'] = base_qs.filter(product__name__in=context['top_products_labels']).aggregate(total=Sum('price'))['total'] or 0
+        top_products = sorted((row for row in per_product if row['units']), key=lambda row: -row['units'])[:5]
+        context['top_products_labels'] = [row['product__name'] or 'N/A' for row in top_products]
+        context['top_products_data'] = [int(row['units']) for row in top_products]
+        context['top_product_revenue'] = sum(row['revenue'] or 0 for row in top_products)
 
         # Demandes par produit
-        requests_data = request_qs.values('product__name').annotate(count=Count('id')).order_by('-count')[:5]
-        context['requests_labels'] = [item['product__name'] or 'N/A' for item in requests_data]
-        context['requests_data'] = [int(item['count'] or 0) for item in requests_data]
+        requests_data = sorted((row for row in per_product if row['requests']), key=lambda row: -row['requests'])[:5]
+        context['requests_labels'] = [row['product__name'] or 'N/A' for row in requests_data]
+        context['requests_data'] = [int(row['requests']) for row in requests_data]
         context['total_requests'] = sum(context['requests_data']) if context['requests_data'] else 0
 
         # Avis par produit
-        reviews_data = review_qs.values('product__name').annotate(avg_rating=Avg('rating'), review_count=Count('id')).order_by('-avg_rating')[:5]
-        context['reviews_labels'] = [item['product__name'] or 'N/A' for item in reviews_data]
-        context['reviews_avg_data'] = [float(item['avg_rating'] or 0) for item in reviews_data]
-        context['reviews_count_data'] = [int(item['review_count'] or 0) for item in reviews_data]
+        reviews_data = sorted(
+            (row for row in per_product if row['reviews']),
+            key=lambda row: -(row['rating_sum'] / row['reviews']),
+        )[:5]
+        context['reviews_labels'] = [row['product__name'] or 'N/A' for row in reviews_data]
+        context['reviews_avg_data'] = [row['rating_sum'] / row['reviews'] for row in reviews_data]
+        context['reviews_count_data'] = [int(row['reviews']) for row in reviews_data]
         context['min_reviews_avg'] = min(context['reviews_avg_data']) if context['reviews_avg_data'] else float('inf')
-        context['total_reviews'] = review_qs.count()
+        context['total_reviews'] = sum(row['reviews'] or 0 for row in per_product)
 
         # Combinaison Ventes vs Stocks
-        sales_vs_stock = base_qs.values('product__name').annotate(
-            total_sold=Sum('quantity'), 
-            remaining_stock=Sum('product__stock')
-        ).order_by('-total_sold')[:5]
-        context['sales_vs_stock_labels'] = [item['product__name'] or 'N/A' for item in sales_vs_stock]
-        context['sales_vs_stock_sold'] = [int(item['total_sold'] or 0) for item in sales_vs_stock]
-        context['sales_vs_stock_remaining'] = [int(item['remaining_stock'] or 0) for item in sales_vs_stock]
+        context['sales_vs_stock_labels'] = context['top_products_labels']
+        context['sales_vs_stock_sold'] = context['top_products_data']
+        context['sales_vs_stock_remaining'] = [int(row['product__stock'] or 0) for row in top_products]
         context['min_sales_vs_stock_remaining'] = min(context['sales_vs_stock_remaining']) if context['sales_vs_stock_remaining'] else float('inf')
 
         # Activité globale
         activity_data = {
             'orders': context['total_orders_count'],
-            'revenue': base_qs.aggregate(total=Sum('price'))['total'] or 0,
+            'revenue': sum(day['revenue'] or 0 for day in days),
             'requests': context['total_requests'],
             'stocks': context['total_stock'],
         }
@@ -555,6 +529,8 @@ class StatisticsView(LoginRequiredMixin, TemplateView):
         context['chart_forecast'] = {
             'labels': context['forecast_labels'],
             'data': context['forecast_data'],
+            'lower': context['forecast_lower'],
+            'upper': context['forecast_upper'],
             'title': f'Prévisions des Ventes ({horizon} mois)'
         }
         context['chart_order_status'] = {
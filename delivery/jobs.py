@@ -0,0 +1,11 @@
+from store import jobs
+from .models import Location
+from .utils import get_exif_data, get_gps_info
+
+@jobs.handler('location_gps')
+def extract_gps(location, field):
+    """Coordonnées GPS de la photo d'une localisation, lues depuis ses données EXIF."""
+    with getattr(location, field).open('rb') as photo:
+        latitude, longitude = get_gps_info(get_exif_data(photo))
+    Location.objects.filter(pk=location.pk).update(latitude=latitude, longitude=longitude)
+    return {'latitude': latitude, 'longitude': longitude}
@@ -1,11 +1,13 @@
-from PIL import Image
-from PIL.ExifTags import TAGS, GPSTAGS
 import math
 import logging
 
 logger = logging.getLogger(__name__)
 
 def get_exif_data(image_path):
+    # PIL n'est chargé que par le traitement des photos de livraison
+    from PIL import Image
+    from PIL.ExifTags import TAGS
+
     try:
         image = Image.open(image_path)
         exif_data = image._getexif()
@@ -23,6 +25,8 @@ def get_exif_data(image_path):
         return None
 
 def get_gps_info(exif_data):
+    from PIL.ExifTags import GPSTAGS
+
     if not exif_data or 'GPSInfo' not in exif_data:
         logger.warning("No GPSInfo found in EXIF data")
         return None, None
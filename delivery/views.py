@@ -4,7 +4,8 @@ from django.contrib import messages
 from django.core.exceptions import PermissionDenied
 from django.http import JsonResponse  # Correction de l'import
 from .models import Location, Delivery
-from .utils import get_exif_data, get_gps_info
+from django.urls import reverse
+from store import jobs
 from store.models import Order
 from django.contrib.auth.models import User
 import math
@@ -21,21 +22,20 @@ def submit_location(request, order_id):
     if request.method == 'POST':
         photo = request.FILES.get('photo')
         description = request.POST.get('description')
-        latitude, longitude = None, None
-
-        if photo:
-            exif_data = get_exif_data(photo)
-            latitude, longitude = get_gps_info(exif_data)
 
+        # La photo est enregistrée telle quelle ; les coordonnées EXIF sont lues par le
+        # pool de store.jobs et remplies sur la localisation une fois prêtes
         location = Location.objects.create(
             user=request.user,
             photo=photo,
-            latitude=latitude,
-            longitude=longitude,
             description=description
         )
         Delivery.objects.create(order=order, location=location)
-        return JsonResponse({'latitude': latitude, 'longitude': longitude})
+        response = {'latitude': None, 'longitude': None}
+        if photo:
+            job = jobs.enqueue('location_gps', location, 'photo', user=request.user)
+            response.update(job_id=job.pk, status_url=reverse('store:image_job_status', args=[job.pk]))
+        return JsonResponse(response)
 
     return render(request, 'delivery/submit_location.html', {'order': order})
 
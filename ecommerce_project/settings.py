@@ -44,6 +44,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'store.middleware.SessionCartMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
@@ -62,6 +63,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'store.context_processors.categories',
+                'store.context_processors.cart',
             ],
         },
     },
@@ -203,6 +205,41 @@ ACCOUNT_ADAPTER = 'accounts.adapters.CustomAccountAdapter'
 
 PRODUCTS_PER_PAGE = 9
 
+# Cache partagé (Redis, base 1 ; la base 0 sert aux channels) et LRU local de store.cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+        'KEY_PREFIX': 'depotencore',
+        'TIMEOUT': 300,
+    },
+}
+CACHE_LOCAL_MAX_ENTRIES = 1000  # Entrées gardées en mémoire par processus
+CACHE_LOCAL_TTL = 30            # Durée de vie maximale d'une entrée locale (s)
+CACHE_VERSION_TTL = 2           # Délai maximal avant de voir une invalidation d'un autre processus (s)
+
+# Compteurs produits (store.counters) : secondes entre deux écritures groupées
+COUNTER_FLUSH_INTERVAL = 5
+
+# Déclinaisons d'images (store.renditions) : largeurs en pixels, qualité JPEG/WebP
+IMAGE_RENDITION_WIDTHS = (320, 640, 1024)
+IMAGE_RENDITION_QUALITY = 80
+
+# Traitements d'images hors requête (store.jobs) : threads du pool
+IMAGE_JOB_WORKERS = 2
+
+# Réservations de stock (store.reservations) : durée d'une réservation de panier (min)
+STOCK_HOLD_MINUTES = 15
+
+# Numéros de commande (store.allocators) : valeurs réservées par écriture en base
+SEQUENCE_BLOCK_SIZE = 20
+
+# Prévisions des ventes (dashboard.forecasts) : mois prévus, processus du pool (None : un par cœur)
+FORECAST_HORIZON = 12
+FORECAST_WORKERS = None
+# Modèle de prévision (dashboard.forecasting) : NumPy vectorisé ou 'dashboard.forecasting.ProphetBackend'
+FORECAST_BACKEND = 'dashboard.forecasting.DampedTrendBackend'
+
 RECAPTCHA_PUBLIC_KEY = '6Ld2ilErAAAAANKz1d0dytvMyM0SuTq_ir4tULYz'
 RECAPTCHA_PRIVATE_KEY = '6Ld2ilErAAAAAPE2ZJM_7n3CzI1gdFWqTRKtWKWU'
 
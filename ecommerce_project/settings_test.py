@@ -0,0 +1,11 @@
+# Réglages des tests : python manage.py test --settings=ecommerce_project.settings_test
+from .settings import *  # noqa: F401,F403
+
+# Pas de thread pendant les tests : counters.flush() explicite
+COUNTER_FLUSH_INTERVAL = 0
+
+# Cache en mémoire : pas de Redis, ni de clés laissées par une exécution précédente
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+# Traitements d'images exécutés au commit, dans le processus de test
+IMAGE_JOB_WORKERS = 0
@@ -3,9 +3,6 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from marketing.admin import admin_site
-from channels.routing import ProtocolTypeRouter, URLRouter
-from admin_panel import routing as admin_routing
-from chat import routing as chat_routing
 
 handler404 = 'store.views.custom_404'
 handler500 = 'store.views.custom_500'
@@ -25,10 +22,3 @@ urlpatterns = [
 
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
-application = ProtocolTypeRouter({
-    'websocket': URLRouter(
-        admin_routing.websocket_urlpatterns +
-        chat_routing.websocket_urlpatterns
-    ),
-})
\ No newline at end of file
@@ -5,9 +5,8 @@ from django.urls import reverse
 from django.contrib import messages
 from returns.models import ReturnRequest, Refund
 from returns.forms import ReturnReviewForm, ReturnRequestForm
-from store.models import Order, Notification
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from store import notifications
+from store.models import Order
 from django.conf import settings
 from django.http import HttpResponseBadRequest
 from django.core.exceptions import ValidationError
@@ -44,32 +43,7 @@ class ReturnRequestCreateView(LoginRequiredMixin, UserPassesTestMixin, View):
                 return_request.user = request.user
                 return_request.save()
                 print(f"Demande de retour #{return_request.id} sauvegardée.")
-                
-                sellers_notified = set()
-                for item in order.items.all():
-                    if item.product.seller and item.product.seller not in sellers_notified:
-                        print(f"Création notification pour vendeur {item.product.seller.username}")
-                        notification = Notification.objects.create(
-                            user=item.product.seller,
-                            message=f"Une demande de retour a été soumise pour la commande #{order.id}.",
-                            notification_type='return_request',
-                            related_object_id=return_request.id
-                        )
-                        channel_layer = get_channel_layer()
-                        try:
-                            async_to_sync(channel_layer.group_send)(
-                                f'notifications_{item.product.seller.id}',
-                                {
-                                    'type': 'new_notification',
-                                    'message': f"Nouvelle demande de retour #{return_request.id} pour la commande #{order.id}",
-                                    'notification_type': 'return_request',
-                                    'timestamp': return_request.created_at.isoformat()
-                                }
-                            )
-                            print(f"Notification WebSocket envoyée au vendeur {item.product.seller.username}")
-                        except Exception as e:
-                            print(f"Erreur lors de l'envoi de la notification WebSocket : {str(e)}")
-                        sellers_notified.add(item.product.seller)
+                # Les vendeurs sont notifiés par le signal post_save (returns.signals)
                 messages.success(request, "Demande de retour soumise avec succès.")
                 return redirect('store:order_detail', order_id=order.id)
             else:
@@ -110,7 +84,6 @@ class ReturnRequestReviewView(LoginRequiredMixin, UserPassesTestMixin, View):
         form = ReturnReviewForm(request.POST, instance=return_request)
         if form.is_valid():
             return_request = form.save()
-            channel_layer = get_channel_layer()
             if return_request.status == 'APPROVED':
                 try:
                     # Pour le paiement à la livraison, pas de remboursement automatique
@@ -137,21 +110,12 @@ class ReturnRequestReviewView(LoginRequiredMixin, UserPassesTestMixin, View):
                         messages.error(request, "Méthode de paiement non supportée pour le remboursement automatique.")
                         return render(request, self.template_name, {'form': form, 'return_request': return_request})
 
-                    Notification.objects.create(
-                        user=return_request.user,
-                        message=f"Votre demande de retour pour la commande #{return_request.order.id} a été approuvée. Le vendeur vous contactera pour le remboursement.",
+                    notifications.notify(
+                        [return_request.user],
+                        f"Votre demande de retour pour la commande #{return_request.order.id} a été approuvée. Le vendeur vous contactera pour le remboursement.",
                         notification_type='return_approved',
                         related_object_id=return_request.id
                     )
-                    async_to_sync(channel_layer.group_send)(
-                        f'notifications_{return_request.user.id}',
-                        {
-                            'type': 'new_notification',
-                            'message': f"Votre demande de retour #{return_request.id} a été approuvée.",
-                            'notification_type': 'return_approved',
-                            'timestamp': return_request.updated_at.isoformat()
-                        }
-                    )
 
                 except ValidationError as e:
                     logger.error(f"Erreur lors du remboursement pour la demande #{return_request.id}: {str(e)}")
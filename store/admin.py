@@ -28,7 +28,8 @@ class ProductAdmin(admin.ModelAdmin):
 
 @admin.register(Category, site=admin_site)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug']
+    list_display = ['name', 'slug', 'parent']
+    list_filter = ['parent']
     search_fields = ['name']
 
 @admin.register(Cart, site=admin_site)
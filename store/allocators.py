@@ -0,0 +1,224 @@
+# store/allocators.py - Numéros de commande et slugs uniques, sans boucle de exists()
+
+import hashlib
+import hmac
+import os
+import re
+import threading
+import uuid
+
+from django.conf import settings
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Length
+from django.utils.text import slugify
+
+from .models import Sequence
+
+DEFAULT_BLOCK_SIZE = 20
+ORDER_SEQUENCE = 'order_number'
+MAX_ATTEMPTS = 5
+
+# Numéros sur 8 chiffres : deux moitiés de 4 chiffres pour le réseau de Feistel
+HALF = 10 ** 4
+DOMAIN = HALF * HALF
+ROUNDS = 4
+
+# « Duplicate entry '…' for key 'table.clé' » (MySQL 8.0.19+) ou « … for key 'clé' »
+MYSQL_KEY = re.compile(r"for key '(?:[^'.]*\.)?([^']+)'")
+
+_blocks = {}
+_lock = threading.Lock()
+_constraint_names = {}
+
+
+# === Insertion avec reprise sur contrainte unique ===
+
+def _unique_names(model, column):
+    """Noms des contraintes et index uniques portant sur la seule colonne `column` (introspection mise en cache)."""
+    key = (model._meta.db_table, column)
+    if key not in _constraint_names:
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        _constraint_names[key] = {
+            name for name, info in constraints.items() if info['unique'] and info['columns'] == [column]
+        }
+    return _constraint_names[key]
+
+
+def _violates(exc, instance, field):
+    """L'IntegrityError vient-elle de la contrainte unique de `field` ?
+
+    PostgreSQL nomme la contrainte (diag.constraint_name), MySQL la clé ;
+    SQLite ne donne que les colonnes de l'index, sous la forme table.colonne.
+    """
+    table = instance._meta.db_table
+    column = instance._meta.get_field(field).column
+    if connection.vendor == 'sqlite':
+        return str(exc).partition('UNIQUE constraint failed: ')[2] == f'{table}.{column}'
+    name = getattr(getattr(exc.__cause__, 'diag', None), 'constraint_name', None)
+    if name is None:
+        match = MYSQL_KEY.search(str(exc))
+        name = match and match.group(1)
+    return bool(name) and name in _unique_names(type(instance), column)
+
+
+def save_unique(instance, field, allocate, save, attempts=MAX_ATTEMPTS):
+    """Affecte allocate(tentative) à `field` puis appelle save() ; recommence si la base refuse la valeur.
+
+    Pas de vérification préalable : la contrainte unique départage aussi les
+    enregistrements concurrents. Les autres IntegrityError sont propagées.
+    """
+    for attempt in range(attempts):
+        setattr(instance, field, allocate(attempt))
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError as exc:
+            if attempt == attempts - 1 or not _violates(exc, instance, field):
+                raise
+
+
+# === Séquences réservées par blocs ===
+
+def block_size():
+    return getattr(settings, 'SEQUENCE_BLOCK_SIZE', DEFAULT_BLOCK_SIZE)
+
+
+def reserve(name, size):
+    """Réserve `size` valeurs de la séquence `name` en une écriture ; renvoie la dernière."""
+    with transaction.atomic():
+        if not Sequence.objects.filter(name=name).update(value=F('value') + size):
+            try:
+                with transaction.atomic():
+                    Sequence.objects.create(name=name, value=size)
+                return size
+            except IntegrityError:  # Créée en parallèle par un autre processus
+                Sequence.objects.filter(name=name).update(value=F('value') + size)
+        return Sequence.objects.filter(name=name).values_list('value', flat=True).get()
+
+
+def _reserve_committed(name, size):
+    """reserve() validé indépendamment de la transaction de l'appelant.
+
+    Un bloc réservé dans une transaction ensuite annulée retournerait à la séquence
+    tout en restant dans `_blocks` : un autre processus recevrait les mêmes valeurs.
+    Dans une transaction, la réservation passe donc par une connexion dédiée (thread
+    à part). SQLite n'admet qu'un écrivain : elle y suit la transaction de l'appelant,
+    un conflit éventuel étant rattrapé par save_unique (`fresh`).
+    """
+    if not connection.in_atomic_block or connection.vendor == 'sqlite':
+        return reserve(name, size)
+    result = []
+
+    def run():
+        try:
+            result.append(reserve(name, size))
+        except Exception as exc:
+            result.append(exc)
+        finally:
+            connections.close_all()  # Connexions de ce thread uniquement
+
+    thread = threading.Thread(target=run, name='sequence-reserve')
+    thread.start()
+    thread.join()
+    if isinstance(result[0], Exception):
+        raise result[0]
+    return result[0]
+
+
+def _usable(block):
+    # Après un fork (workers gunicorn), le bloc du parent serait partagé
+    return block is not None and block[0] == os.getpid() and block[1] <= block[2]
+
+
+def _new_block(name):
+    size = block_size()
+    last = _reserve_committed(name, size)
+    return [os.getpid(), last - size + 1, last]
+
+
+def prepare(name):
+    """Réserve un nouveau bloc si celui du processus est épuisé.
+
+    À appeler avant d'ouvrir une transaction (orders.place_order) : le bloc est
+    validé aussitôt, une annulation de la transaction ne le rend pas à la séquence.
+    """
+    with _lock:
+        if not _usable(_blocks.get(name)):
+            _blocks[name] = _new_block(name)
+
+
+def next_value(name, fresh=False):
+    """Valeur suivante de la séquence, prise dans le bloc du processus.
+
+    Après un conflit, `fresh` force la réservation d'un nouveau bloc.
+    """
+    with _lock:
+        block = _blocks.get(name)
+        if fresh or not _usable(block):
+            block = _blocks[name] = _new_block(name)
+        value = block[1]
+        block[1] += 1
+        return value
+
+
+# === Numéros de commande ===
+
+def _key():
+    return hashlib.sha256(f'store.allocators:{settings.SECRET_KEY}'.encode()).digest()
+
+
+def _round(value, number, key):
+    digest = hmac.new(key, f'{number}:{value}'.encode(), hashlib.sha256).digest()
+    return int.from_bytes(digest[:8], 'big') % HALF
+
+
+def permute(value):
+    """Bijection de [0, 10^8) : des compteurs consécutifs donnent des numéros sans suite visible."""
+    key = _key()
+    left, right = divmod(value, HALF)
+    for number in range(ROUNDS):
+        left, right = right, (left + _round(right, number, key)) % HALF
+    return left * HALF + right
+
+
+def prepare_order_numbers():
+    """Bloc de numéros de commande réservé avant la transaction de la commande (voir prepare())."""
+    prepare(ORDER_SEQUENCE)
+
+
+def next_order_number(attempt=0):
+    """Numéro à 8 chiffres (préfixé au-delà de 10^8 commandes), unique tant que la séquence l'est."""
+    prefix, value = divmod(next_value(ORDER_SEQUENCE, fresh=attempt > 0), DOMAIN)
+    return f"{prefix or ''}{permute(value):08d}"
+
+
+# === Slugs ===
+
+def next_slug(model, name, attempt=0, field='slug'):
+    """Premier slug libre parmi base, base-1, base-2... en une requête indexée.
+
+    Les slugs « base-N » sont cherchés dans l'intervalle [base-, base.) de l'index
+    unique, puis le plus long / plus grand donne le suffixe suivant.
+    """
+    max_length = model._meta.get_field(field).max_length
+    base = slugify(name)[:max_length - 10].strip('-') or model._meta.model_name
+    if attempt == MAX_ATTEMPTS - 1:
+        # Dernier essai sous forte concurrence : suffixe aléatoire
+        return f'{base}-{uuid.uuid4().hex[:8]}'
+    numbered = Q(**{
+        f'{field}__gte': f'{base}-',
+        f'{field}__lt': f'{base}.',
+        f'{field}__regex': rf'^{re.escape(base)}-[0-9]+$',
+    })
+    last = (
+        model._default_manager.filter(Q(**{field: base}) | numbered)
+        .annotate(slug_length=Length(field)).order_by('-slug_length', f'-{field}')
+        .values_list(field, flat=True).first()
+    )
+    if last is None:
+        return base
+    if last == base:
+        return f'{base}-1'
+    return f'{base}-{int(last.rsplit("-", 1)[1]) + 1}'
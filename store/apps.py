@@ -7,5 +7,6 @@ class StoreConfig(AppConfig):
     def ready(self):
         try:
             import store.signals
+            import store.renditions  # Enregistre le traitement 'renditions' de store.jobs
         except ImportError:
             pass  # Handle the error or log it if needed
\ No newline at end of file
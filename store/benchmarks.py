@@ -0,0 +1,100 @@
+# store/benchmarks.py - Outils communs aux commandes benchmark_*
+
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import connection
+
+WORDS = [
+    'robe', 'chemise', 'pagne', 'bazin', 'sandales', 'baskets', 'sac', 'montre',
+    'téléphone', 'écouteurs', 'chargeur', 'ordinateur', 'télévision', 'réfrigérateur',
+    'marmite', 'théière', 'savon', 'crème', 'parfum', 'collier', 'bracelet', 'boubou',
+    'chaussures', 'casquette', 'lunettes', 'ceinture', 'veste', 'pantalon', 'jupe',
+    'coton', 'cuir', 'wax', 'indigo', 'brodé', 'élégant', 'léger', 'solide', 'neuf',
+]
+BRANDS = ['Samsung', 'Tecno', 'Nike', 'Adidas', 'Vlisco', 'Itel', 'Bic', 'Moulinex', '']
+COLORS = ['noir', 'blanc', 'rouge', 'bleu', 'vert', 'jaune', 'beige', '']
+SIZES = ['', 'XS', 'S', 'M', 'L', 'XL', 'XXL', 'One Size']
+CONDITIONS = ['new', 'like_new', 'good', 'fair', 'poor']
+
+
+@contextmanager
+def temporary_database(verbosity=0):
+    """Exécute le bloc sur une base de test jetable (migrée), détruite à la sortie."""
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, keepdb=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+
+
+def timed(func, *args, **kwargs):
+    """Renvoie (durée en ms, résultat)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def percentiles(samples):
+    """p50 / p95 / max d'une liste de durées en ms."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        'p50': statistics.median(ordered),
+        'p95': ordered[p95_index],
+        'max': ordered[-1],
+    }
+
+
+def make_seller(username='bench_seller'):
+    from django.contrib.auth import get_user_model
+    User = get_user_model()
+    user, _ = User.objects.get_or_create(
+        username=username,
+        defaults={'email': f'{username}@example.com', 'user_type': 'seller'},
+    )
+    return user
+
+
+def make_products(count, seller=None, batch_size=5000, seed=42):
+    """Crée `count` produits actifs aléatoires en bulk (sans signaux)."""
+    from store.models import Category, Product
+
+    rng = random.Random(seed)
+    seller = seller or make_seller()
+    categories = [
+        Category.objects.get_or_create(name=name, defaults={'slug': name})[0]
+        for name in ('mode', 'maison', 'electronique', 'beaute', 'sport')
+    ]
+    created = 0
+    while created < count:
+        batch = []
+        for i in range(created, min(count, created + batch_size)):
+            words = rng.sample(WORDS, 3)
+            batch.append(Product(
+                seller=seller,
+                category=rng.choice(categories),
+                name=' '.join(words).capitalize(),
+                slug=f'bench-{seed}-{i}',
+                description=' '.join(rng.choices(WORDS, k=25)),
+                tags=', '.join(rng.sample(WORDS, 3)),
+                brand=rng.choice(BRANDS) or None,
+                color=rng.choice(COLORS) or None,
+                size=rng.choice(SIZES) or None,
+                condition=rng.choice(CONDITIONS),
+                price=Decimal(rng.randint(1000, 500000)),
+                stock=rng.randint(0, 50),
+                status='active',
+                is_active=True,
+                views=rng.randint(0, 5000),
+                sales_count=rng.randint(0, 300),
+            ))
+        Product.objects.bulk_create(batch)
+        created += len(batch)
+    return created
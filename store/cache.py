@@ -0,0 +1,312 @@
+# store/cache.py - Cache à deux niveaux (LRU local + backend partagé) invalidé par versions
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCAL_MAX_ENTRIES = 1000
+DEFAULT_LOCAL_TTL = 30
+DEFAULT_VERSION_TTL = 2
+
+_MISSING = object()
+
+
+class LocalLRU:
+    """LRU en mémoire du processus, avec expiration par entrée et compteurs."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_local = LocalLRU(getattr(settings, 'CACHE_LOCAL_MAX_ENTRIES', DEFAULT_LOCAL_MAX_ENTRIES))
+_stats_lock = threading.Lock()
+_stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'sets': 0, 'bumps': 0}
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def shared():
+    return caches[getattr(settings, 'STORE_CACHE_ALIAS', 'default')]
+
+
+def local_ttl():
+    return getattr(settings, 'CACHE_LOCAL_TTL', DEFAULT_LOCAL_TTL)
+
+
+def version_ttl():
+    return getattr(settings, 'CACHE_VERSION_TTL', DEFAULT_VERSION_TTL)
+
+
+# === Versions ===
+
+def model_label(model):
+    return model.lower() if isinstance(model, str) else model._meta.label_lower
+
+
+def _version_key(dependency):
+    if isinstance(dependency, tuple):
+        model, pk = dependency
+        return f'v:{model_label(model)}:{pk}'
+    return f'v:{model_label(dependency)}'
+
+
+def versions(dependencies):
+    """Versions courantes des dépendances (modèles ou couples (modèle, pk))."""
+    keys = [_version_key(dep) for dep in dependencies]
+    result, missing = {}, []
+    for key in keys:
+        # Lues localement pendant CACHE_VERSION_TTL s : un bump d'un autre processus
+        # est vu au plus tard après ce délai
+        value = _local.get(key)
+        if value is _MISSING:
+            missing.append(key)
+        else:
+            result[key] = value
+    if missing:
+        try:
+            found = shared().get_many(missing)
+        except Exception:
+            logger.warning("Backend de cache indisponible (lecture des versions)", exc_info=True)
+            found = {}
+        for key in missing:
+            result[key] = found.get(key, 0)
+            _local.set(key, result[key], version_ttl())
+    return [result[key] for key in keys]
+
+
+def bump(model, pk=None):
+    """Invalide tout ce qui dépend du modèle (et de l'objet `pk` s'il est fourni)."""
+    keys = [_version_key(model)]
+    if pk is not None:
+        keys.append(_version_key((model, pk)))
+    backend = shared()
+    for key in keys:
+        try:
+            value = backend.incr(key)
+        except ValueError:
+            # Première invalidation : la version part d'une valeur unique pour ne pas
+            # retomber sur une clé déjà utilisée après une éviction du backend
+            value = time.time_ns()
+            backend.set(key, value, None)
+        except Exception:
+            logger.warning("Backend de cache indisponible (invalidation de %s)", key, exc_info=True)
+            value = time.time_ns()
+        _local.set(key, value, version_ttl())
+    _count('bumps')
+
+
+def bump_many(model, pks):
+    """bump() de plusieurs objets en une écriture : une valeur neuve commune
+    plutôt qu'un incr() par clé."""
+    keys = [_version_key(model)] + [_version_key((model, pk)) for pk in pks]
+    value = time.time_ns()
+    try:
+        shared().set_many({key: value for key in keys}, None)
+    except Exception:
+        logger.warning("Backend de cache indisponible (invalidation de %s)", keys[0], exc_info=True)
+    for key in keys:
+        _local.set(key, value, version_ttl())
+    _count('bumps')
+
+
+def watch(*models):
+    """Branche bump() sur post_save et post_delete des modèles donnés."""
+    for model in models:
+        post_save.connect(_bump_instance, sender=model, dispatch_uid=f'cache-bump-save-{model_label(model)}')
+        post_delete.connect(_bump_instance, sender=model, dispatch_uid=f'cache-bump-delete-{model_label(model)}')
+
+
+def _bump_instance(sender, instance, **kwargs):
+    bump_on_commit(sender, instance.pk)
+
+
+def bump_on_commit(model, pk=None):
+    """bump() immédiat, répété au commit : un autre processus ne peut pas remettre en
+    cache l'état d'avant la transaction sous la nouvelle version."""
+    bump(model, pk)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: bump(model, pk))
+
+
+def bump_many_on_commit(model, pks):
+    """bump_many() immédiat, répété au commit (voir bump_on_commit())."""
+    pks = list(pks)
+    if not pks:
+        return
+    bump_many(model, pks)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: bump_many(model, pks))
+
+
+# === Lecture / écriture ===
+
+def _key(name, version_values):
+    return ':'.join(['c', name] + [str(v) for v in version_values])
+
+
+def make_key(name, depends=()):
+    return _key(name, versions(depends))
+
+
+def _get(key, default):
+    value = _local.get(key)
+    if value is not _MISSING:
+        _count('local_hits')
+        return value
+    try:
+        value = shared().get(key, _MISSING)
+    except Exception:
+        logger.warning("Backend de cache indisponible (lecture)", exc_info=True)
+        value = _MISSING
+    if value is not _MISSING:
+        _count('shared_hits')
+        _local.set(key, value, local_ttl())
+        return value
+    _count('misses')
+    return default
+
+
+def _set(key, value, timeout):
+    try:
+        shared().set(key, value, timeout)
+    except Exception:
+        logger.warning("Backend de cache indisponible (écriture)", exc_info=True)
+    _local.set(key, value, min(timeout, local_ttl()) if timeout else local_ttl())
+    _count('sets')
+
+
+def get(name, depends=(), default=None):
+    return _get(make_key(name, depends), default)
+
+
+def set(name, value, timeout=300, depends=()):
+    _set(make_key(name, depends), value, timeout)
+
+
+def get_or_set(name, compute, timeout=300, depends=()):
+    """Valeur en cache, ou calculée par `compute()` puis mise en cache.
+
+    La clé est figée avant le calcul : si une dépendance change pendant `compute()`,
+    le résultat est rangé sous l'ancienne version et ne sera plus servi.
+    Les valeurs sont partagées dans le processus : ne pas les modifier en place.
+    """
+    key = make_key(name, depends)
+    value = _get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        _set(key, value, timeout)
+    return value
+
+
+def get_or_set_many(entries, compute, timeout=300):
+    """get_or_set() groupé : `entries` {id: (name, depends)}, `compute(ids)` -> {id: valeur}.
+
+    Versions puis valeurs lues en un aller-retour chacune vers le backend partagé ;
+    un seul appel à compute() pour tous les absents. Renvoie {id: valeur}.
+    """
+    flat = versions([dep for _, depends in entries.values() for dep in depends])
+    keys, start = {}, 0
+    for ident, (name, depends) in entries.items():
+        keys[ident] = _key(name, flat[start:start + len(depends)])
+        start += len(depends)
+
+    found, remote = {}, []
+    for ident, key in keys.items():
+        value = _local.get(key)
+        if value is _MISSING:
+            remote.append(ident)
+        else:
+            _count('local_hits')
+            found[ident] = value
+    if remote:
+        try:
+            values = shared().get_many([keys[ident] for ident in remote])
+        except Exception:
+            logger.warning("Backend de cache indisponible (lecture)", exc_info=True)
+            values = {}
+        for ident in remote:
+            if keys[ident] in values:
+                _count('shared_hits')
+                found[ident] = values[keys[ident]]
+                _local.set(keys[ident], found[ident], local_ttl())
+
+    missing = [ident for ident in keys if ident not in found]
+    if missing:
+        computed = compute(missing)
+        try:
+            shared().set_many({keys[ident]: computed[ident] for ident in missing}, timeout)
+        except Exception:
+            logger.warning("Backend de cache indisponible (écriture)", exc_info=True)
+        for ident in missing:
+            _count('misses')
+            _count('sets')
+            found[ident] = computed[ident]
+            _local.set(keys[ident], found[ident], min(timeout, local_ttl()) if timeout else local_ttl())
+    return found
+
+
+def stats():
+    """Compteurs du processus courant (succès local/partagé, échecs, évictions)."""
+    with _stats_lock:
+        result = dict(_stats)
+    lookups = result['local_hits'] + result['shared_hits'] + result['misses']
+    result['evictions'] = _local.evictions
+    result['local_entries'] = len(_local)
+    result['hit_rate'] = round((result['local_hits'] + result['shared_hits']) / lookups, 3) if lookups else None
+    return result
+
+
+def reset_stats():
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+    _local.evictions = 0
+
+
+def clear_local():
+    _local.clear()
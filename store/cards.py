@@ -0,0 +1,75 @@
+# store/cards.py - Projection légère des produits pour les cartes des listes
+
+from django.db.models.query import BaseIterable, ValuesListIterable
+
+# Colonnes lues pour une carte ; les clés de tri (created_at, sales_count, views,
+# rating_*) permettent la pagination par curseur sur une projection
+CARD_FIELDS = (
+    'id', 'name', 'slug', 'price', 'compare_price', 'stock', 'image',
+    'rating_average', 'rating_count', 'created_at', 'sales_count', 'views',
+)
+
+
+class ProductCard:
+    """Ce qu'affiche une carte produit, sans instance de modèle."""
+    __slots__ = CARD_FIELDS + ('extra',)
+
+    def __init__(self, values, extra=None):
+        for field, value in zip(CARD_FIELDS, values):
+            setattr(self, field, value)
+        self.extra = extra or {}
+
+    def __getattr__(self, name):
+        # Annotations du queryset (ex. search_rank)
+        try:
+            return object.__getattribute__(self, 'extra')[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __repr__(self):
+        return f'<ProductCard {self.id}: {self.name}>'
+
+    def __eq__(self, other):
+        return isinstance(other, ProductCard) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def image_url(self):
+        if not self.image:
+            return ''
+        from .models import Product
+        return Product._meta.get_field('image1').storage.url(self.image)
+
+    @property
+    def has_discount(self):
+        return bool(self.compare_price and self.compare_price > self.price)
+
+    @property
+    def discount_percentage(self):
+        if self.has_discount:
+            return round(((self.compare_price - self.price) / self.compare_price) * 100, 1)
+        return 0
+
+    @property
+    def average_rating(self):
+        return round(self.rating_average, 1) if self.rating_count else 0
+
+    def get_absolute_url(self):
+        from django.urls import reverse
+        return reverse('store:product_detail', kwargs={'slug': self.slug})
+
+
+class ProductCardIterable(BaseIterable):
+    """Transforme les lignes de values_list() en ProductCard."""
+
+    def __iter__(self):
+        extra_names = self.queryset._fields[len(CARD_FIELDS):]
+        for row in ValuesListIterable(self.queryset):
+            extra = dict(zip(extra_names, row[len(CARD_FIELDS):])) if extra_names else None
+            yield ProductCard(row[:len(CARD_FIELDS)], extra)
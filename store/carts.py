@@ -0,0 +1,331 @@
+# store/carts.py - Paniers : résumé en cache (connectés), cookie signé (anonymes), fusion à la connexion
+
+import threading
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from . import cache
+from .models import Cart, CartItem, Product, ProductVariant
+
+
+class CartLine:
+    """Ligne du panier telle qu'affichée (valeur en cache, sans accès à la base)"""
+    __slots__ = ('item_id', 'product_id', 'variant_id', 'name', 'slug', 'image', 'variant_name',
+                 'quantity', 'unit_price', 'subtotal', 'stock')
+
+    def __init__(self, item_id, product_id, variant_id, name, slug, image, variant_name,
+                 quantity, unit_price, subtotal, stock):
+        self.item_id = item_id
+        self.product_id = product_id
+        self.variant_id = variant_id
+        self.name = name
+        self.slug = slug
+        self.image = image
+        self.variant_name = variant_name
+        self.quantity = quantity
+        self.unit_price = unit_price
+        self.subtotal = subtotal
+        self.stock = stock
+
+
+class CartSummary:
+    __slots__ = ('lines', 'item_count', 'subtotal')
+
+    def __init__(self, lines=()):
+        self.lines = list(lines)
+        self.item_count = sum(line.quantity for line in self.lines)
+        self.subtotal = sum((line.subtotal for line in self.lines), Decimal('0'))
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __bool__(self):
+        return bool(self.lines)
+
+
+EMPTY = CartSummary()
+
+# Le stock réservé change par UPDATE, sans signal : il est pris en compte au plus tard après ce délai
+SUMMARY_TIMEOUT = 300
+
+
+def available(prefix=''):
+    """Stock disponible en SQL : stock moins les unités réservées (store.reservations).
+
+    `prefix` : chemin vers le produit ou la variante, par exemple 'variant__'.
+    """
+    return Greatest(F(f'{prefix}stock') - F(f'{prefix}reserved'), Value(0))
+
+
+def lines(items):
+    """Lignes d'un queryset de CartItem : prix de la variante sinon du produit, calculés en SQL.
+
+    `stock` : disponible plus la quantité de la ligne, que le panier retient déjà.
+    """
+    unit_price = Coalesce('variant__price', 'product__price')
+    rows = items.annotate(
+        line_unit_price=unit_price,
+        line_subtotal=ExpressionWrapper(F('quantity') * unit_price, output_field=DecimalField(max_digits=12, decimal_places=2)),
+        line_stock=Coalesce(available('variant__'), available('product__')) + F('quantity'),
+    ).order_by('added_at', 'pk').values_list(
+        'pk', 'product_id', 'variant_id', 'product__name', 'product__slug', 'product__image1',
+        'variant__name', 'quantity', 'line_unit_price', 'line_subtotal', 'line_stock',
+    )
+    return [CartLine(*row) for row in rows]
+
+
+def build(user_id):
+    return CartSummary(lines(CartItem.objects.filter(cart__user_id=user_id)))
+
+
+def summary(user):
+    """Résumé du panier de `user`, en cache jusqu'à la prochaine écriture d'un CartItem"""
+    if not user.is_authenticated:
+        return EMPTY
+    return cached(user.pk)
+
+
+def cached(user_id):
+    """Résumé en cache sous la seule version du panier.
+
+    Les écritures de ses lignes et de ses produits l'invalident (store.signals) ;
+    un accès réussi lit une version et une valeur, aucune ligne en base.
+    """
+    return cache.get_or_set(
+        f'cart:{user_id}', lambda: build(user_id), timeout=SUMMARY_TIMEOUT, depends=[(Cart, user_id)],
+    )
+
+
+def invalidate(user_id):
+    if user_id is not None:
+        cache.bump_on_commit(Cart, user_id)
+
+
+def invalidate_holding(**lookup):
+    """Invalide les paniers contenant l'article (`product_id=` ou `variant_id=`) : une requête, une écriture."""
+    user_ids = CartItem.objects.filter(**lookup).values_list('cart__user_id', flat=True).distinct()
+    cache.bump_many_on_commit(Cart, [user_id for user_id in user_ids if user_id is not None])
+
+
+_clearing = threading.local()
+
+
+def clearing():
+    """Vrai pendant clear() : les signaux par ligne laissent l'invalidation à clear()."""
+    return getattr(_clearing, 'active', False)
+
+
+def clear(user_id):
+    """Vide le panier et invalide son résumé une seule fois.
+
+    queryset.delete() envoie post_delete pour chaque ligne ; pendant clear(),
+    bump_cart ne relit pas le panier ligne par ligne.
+    """
+    _clearing.active = True
+    try:
+        deleted, _ = CartItem.objects.filter(cart__user_id=user_id).delete()
+    finally:
+        _clearing.active = False
+    invalidate(user_id)
+    return deleted
+
+
+# === Panier anonyme (cookie signé) ===
+
+COOKIE_NAME = 'cart'
+COOKIE_SALT = 'store.carts'
+COOKIE_MAX_AGE = int(timedelta(days=30).total_seconds())
+MAX_LINES = 50  # Un cookie reste sous 4 Ko
+
+
+def line_key(product_id, variant_id=None):
+    return f'{product_id}.{variant_id}' if variant_id else str(product_id)
+
+
+def parse_key(key):
+    """'12' -> (12, None), '12.5' -> (12, 5) ; ValueError si la clé est invalide."""
+    product_id, _, variant_id = str(key).partition('.')
+    return int(product_id), int(variant_id) if variant_id else None
+
+
+def parse(value):
+    """Contenu du cookie « 12:2,12.5:1 » -> {(12, None): 2, (12, 5): 1} ; ignore ce qui est mal formé."""
+    items = {}
+    for part in (value or '').split(','):
+        key, _, quantity = part.partition(':')
+        try:
+            quantity = int(quantity)
+            if quantity > 0:
+                items[parse_key(key)] = quantity
+        except ValueError:
+            continue
+        if len(items) >= MAX_LINES:
+            break
+    return items
+
+
+def serialize(items):
+    return ','.join(f'{line_key(*key)}:{quantity}' for key, quantity in items.items() if quantity > 0)
+
+
+class SessionCart:
+    """Panier d'un visiteur anonyme : vit dans un cookie signé, aucune écriture en base.
+
+    Les modifications sont renvoyées au navigateur par SessionCartMiddleware.
+    """
+
+    def __init__(self, request):
+        self.items = parse(request.get_signed_cookie(COOKIE_NAME, default='', salt=COOKIE_SALT))
+        self.modified = False
+
+    def __bool__(self):
+        return bool(self.items)
+
+    def set(self, product_id, quantity, variant_id=None):
+        key = (product_id, variant_id)
+        if quantity > 0:
+            if key not in self.items and len(self.items) >= MAX_LINES:
+                return False
+            self.items[key] = quantity
+        else:
+            self.items.pop(key, None)
+        self.modified = True
+        return True
+
+    def add(self, product_id, quantity=1, variant_id=None):
+        return self.set(product_id, self.items.get((product_id, variant_id), 0) + quantity, variant_id)
+
+    @property
+    def item_count(self):
+        return sum(self.items.values())
+
+    def quantity(self, product_id, variant_id=None):
+        return self.items.get((product_id, variant_id), 0)
+
+    def clear(self):
+        self.items = {}
+        self.modified = True
+
+    def summary(self):
+        """Lignes du panier, avec les prix actuels (une requête, deux avec des variantes)."""
+        if not self.items:
+            return EMPTY
+        products = {
+            row[0]: row for row in Product.objects.filter(
+                pk__in={product_id for product_id, _ in self.items}, is_active=True, status='active',
+            ).annotate(available=available()).values_list('pk', 'name', 'slug', 'image1', 'price', 'available')
+        }
+        variant_ids = {variant_id for _, variant_id in self.items if variant_id}
+        variants = {
+            row[0]: row for row in ProductVariant.objects.filter(pk__in=variant_ids, is_active=True)
+            .annotate(available=available()).values_list('pk', 'product_id', 'name', 'price', 'available')
+        } if variant_ids else {}
+        result = []
+        for (product_id, variant_id), quantity in self.items.items():
+            product = products.get(product_id)
+            variant = variants.get(variant_id) if variant_id else None
+            if product is None or (variant_id and (variant is None or variant[1] != product_id)):
+                continue  # Produit retiré du catalogue depuis l'ajout
+            _, name, slug, image, price, stock = product
+            if variant:
+                price, stock = variant[3], variant[4]
+            result.append(CartLine(
+                line_key(product_id, variant_id), product_id, variant_id, name, slug, image,
+                variant[2] if variant else None, quantity, price, quantity * price, stock,
+            ))
+        return CartSummary(result)
+
+    def save(self, response):
+        if not self.modified:
+            return
+        if self.items:
+            response.set_signed_cookie(
+                COOKIE_NAME, serialize(self.items), salt=COOKIE_SALT, max_age=COOKIE_MAX_AGE,
+                httponly=True, samesite='Lax', secure=settings.SESSION_COOKIE_SECURE,
+            )
+        else:
+            response.delete_cookie(COOKIE_NAME, samesite='Lax')
+        self.modified = False
+
+
+def session_cart(request):
+    """Panier anonyme de la requête (lu une fois)."""
+    if not hasattr(request, '_session_cart'):
+        request._session_cart = SessionCart(request)
+    return request._session_cart
+
+
+def for_request(request):
+    """Résumé du panier courant : en cache pour un utilisateur, depuis le cookie sinon."""
+    if request.user.is_authenticated:
+        return cached(request.user.pk)
+    return session_cart(request).summary()
+
+
+def item_count(request):
+    """Nombre d'articles pour le badge : sans requête pour un visiteur anonyme."""
+    if request.user.is_authenticated:
+        return cached(request.user.pk).item_count
+    return session_cart(request).item_count
+
+
+# === Fusion à la connexion ===
+
+def available_stock(keys):
+    """{(product_id, variant_id): unités disponibles} pour les articles demandés (deux requêtes au plus)."""
+    products = dict(
+        Product.objects.filter(pk__in={p for p, _ in keys}, is_active=True, status='active')
+        .annotate(available=available()).values_list('pk', 'available')
+    )
+    variant_ids = {v for _, v in keys if v}
+    variants = dict(
+        ProductVariant.objects.filter(pk__in=variant_ids, is_active=True)
+        .annotate(available=available()).values_list('pk', 'available')
+    ) if variant_ids else {}
+    result = {}
+    for product_id, variant_id in keys:
+        if product_id not in products:
+            continue
+        result[(product_id, variant_id)] = variants.get(variant_id, 0) if variant_id else products[product_id]
+    return result
+
+
+def merge(request, user):
+    """Verse le panier anonyme de la requête dans le panier de `user` ; renvoie le nombre de lignes.
+
+    Les quantités s'additionnent, plafonnées au stock disponible ; les articles
+    épuisés ou retirés sont abandonnés. Le cookie est vidé dans la réponse.
+    """
+    anonymous = session_cart(request)
+    if not anonymous:
+        return 0
+    available = available_stock(list(anonymous.items))
+    with transaction.atomic():
+        cart, _ = Cart.objects.get_or_create(user=user)
+        existing = {
+            (item.product_id, item.variant_id): item
+            for item in CartItem.objects.filter(cart=cart).only('pk', 'product_id', 'variant_id', 'quantity')
+        }
+        to_update, to_create = [], []
+        for key, quantity in anonymous.items.items():
+            limit = available.get(key, 0)
+            item = existing.get(key)
+            if item is not None:
+                merged = min(item.quantity + quantity, max(limit, item.quantity))
+                if merged != item.quantity:
+                    item.quantity = merged
+                    to_update.append(item)
+            elif limit:
+                to_create.append(CartItem(cart=cart, product_id=key[0], variant_id=key[1], quantity=min(quantity, limit)))
+        # Deux requêtes groupées : la contrainte (cart, product, variant) ne détecte pas les
+        # conflits quand variant est NULL, un INSERT ... ON CONFLICT ne suffirait pas
+        CartItem.objects.bulk_update(to_update, ['quantity'])
+        CartItem.objects.bulk_create(to_create)
+        invalidate(user.pk)  # bulk_* n'envoie pas post_save
+    anonymous.clear()
+    return len(to_update) + len(to_create)
@@ -1,7 +1,7 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from store.models import Notification
+from store import notifications
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -43,7 +43,10 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             'related_object_id': event['related_object_id'],
         }))
 
-        unread_count = await self.get_unread_notifications_count()
+        # Compteur fourni par store.notifications.dispatch ; relu seulement s'il manque
+        unread_count = event.get('unread_count')
+        if unread_count is None:
+            unread_count = await self.get_unread_notifications_count()
         await self.send(text_data=json.dumps({
             'type': 'unread_count',
             'count': unread_count,
@@ -51,8 +54,8 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def get_unread_notifications_count(self):
-        return Notification.objects.filter(user=self.user, is_read=False).count()
+        return notifications.unread_count(self.user)
 
     @database_sync_to_async
     def mark_notifications_as_read(self):
-        Notification.objects.filter(user=self.user, is_read=False).update(is_read=True)
\ No newline at end of file
+        notifications.mark_all_read(self.user)
\ No newline at end of file
@@ -1,7 +1,57 @@
+from django.utils.functional import SimpleLazyObject
+from .models import Category, FacetCount, Product
+from . import cache, carts
 
-from .models import Product
+class CategoryNode:
+    """Catégorie de la navigation (valeur en cache, sans accès à la base)"""
+    __slots__ = ('id', 'name', 'slug', 'product_count', 'parent_id', 'children')
+
+    def __init__(self, id, name, slug, product_count, parent_id):
+        self.id = id
+        self.name = name
+        self.slug = slug
+        self.product_count = product_count
+        self.parent_id = parent_id
+        self.children = []
+
+    def __str__(self):
+        return self.name
+
+def build_category_nav():
+    """(racines, liste à plat) des catégories actives, avec leur nombre de produits actifs"""
+    # Nombre de produits du catalogue actif par catégorie, déjà tenu à jour par store.facets
+    counts = dict(
+        FacetCount.objects.filter(facet='category', other_facet='').values_list('value', 'count')
+    )
+    nodes = [
+        CategoryNode(pk, name, slug, counts.get(str(pk), 0), parent_id)
+        for pk, name, slug, parent_id in Category.objects.filter(is_active=True)
+        .order_by('name').values_list('pk', 'name', 'slug', 'parent_id')
+    ]
+    by_id = {node.id: node for node in nodes}
+    roots = []
+    for node in nodes:
+        parent = by_id.get(node.parent_id)
+        if parent is not None:
+            parent.children.append(node)
+        else:
+            roots.append(node)
+    return roots, nodes
+
+def category_nav():
+    return cache.get_or_set('category_nav', build_category_nav, timeout=3600, depends=[Category, Product])
 
 def categories(request):
+    # Évalué seulement si le gabarit lit la variable (pas sur les réponses JSON ni les erreurs)
+    nav = SimpleLazyObject(category_nav)
+    return {
+        'category_nav': SimpleLazyObject(lambda: nav[0]),
+        'categories': SimpleLazyObject(lambda: nav[1]),
+    }
+
+def cart(request):
+    # Badge du panier : zéro requête tant que le panier n'a pas changé, ni pour un visiteur sans panier
     return {
-        'categories': Product.objects.values_list('category', flat=True).distinct()
-    }
\ No newline at end of file
+        'cart_summary': SimpleLazyObject(lambda: carts.for_request(request)),
+        'cart_count': SimpleLazyObject(lambda: carts.item_count(request)),
+    }
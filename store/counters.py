@@ -0,0 +1,129 @@
+# store/counters.py - Compteurs de produits en écriture différée (vues, ventes, favoris)
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('views', 'sales_count', 'favorites_count')
+
+DEFAULT_FLUSH_INTERVAL = 5
+
+# Envoyé après chaque écriture réussie : deltas = {product_id: {champ: n}}
+flushed = Signal()
+
+_pending = defaultdict(int)  # (product_id, champ) -> delta
+_lock = threading.Lock()
+_flusher = None
+_flusher_pid = None
+
+
+def flush_interval():
+    """Secondes entre deux écritures ; 0 désactive le thread (vidage par flush() ou à l'arrêt)."""
+    return getattr(settings, 'COUNTER_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+
+
+def increment(product_id, field, amount=1):
+    """Ajoute `amount` au compteur `field` du produit, sans écrire en base."""
+    if field not in FIELDS:
+        raise ValueError(f"Compteur inconnu : {field}")
+    if not amount:
+        return
+    with _lock:
+        _pending[(product_id, field)] += amount
+    _ensure_flusher()
+
+
+def pending(product_id, field):
+    """Incréments en attente pour un produit (à ajouter à la valeur lue en base)."""
+    with _lock:
+        return _pending.get((product_id, field), 0)
+
+
+def _added(field, amount):
+    # Les compteurs sont des PositiveIntegerField : un retrait ne descend pas sous zéro
+    if amount < 0:
+        return Greatest(F(field) + amount, 0)
+    return F(field) + amount
+
+
+def flush():
+    """Écrit les incréments en attente en UPDATE ... SET champ = champ + n groupés."""
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+    if not batch:
+        return 0
+
+    from .models import Product
+
+    deltas = defaultdict(dict)
+    for (product_id, field), amount in batch.items():
+        if amount:
+            deltas[product_id][field] = amount
+    # Un UPDATE par combinaison de deltas : toutes les vues « +1 » partent ensemble
+    groups = defaultdict(list)
+    for product_id, changes in deltas.items():
+        groups[tuple(sorted(changes.items()))].append(product_id)
+
+    try:
+        with transaction.atomic():
+            for changes, product_ids in groups.items():
+                Product.objects.filter(pk__in=product_ids).update(
+                    **{field: _added(field, amount) for field, amount in changes}
+                )
+    except Exception:
+        # Rien n'est perdu : les incréments repartent au prochain vidage
+        logger.exception("Échec de l'écriture des compteurs produits")
+        with _lock:
+            for key, amount in batch.items():
+                _pending[key] += amount
+        return 0
+    flushed.send_robust(sender=Product, deltas=dict(deltas))
+    return len(deltas)
+
+
+def _run(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            close_old_connections()
+            flush()
+        except Exception:
+            logger.exception("Échec du vidage périodique des compteurs produits")
+
+
+def _ensure_flusher():
+    global _flusher, _flusher_pid
+    interval = flush_interval()
+    if not interval:
+        return
+    # Après un fork (workers gunicorn), le thread du parent n'existe plus
+    if _flusher is not None and _flusher_pid == os.getpid() and _flusher.is_alive():
+        return
+    with _lock:
+        if _flusher is not None and _flusher_pid == os.getpid() and _flusher.is_alive():
+            return
+        _flusher = threading.Thread(
+            target=_run, args=(interval,), name='product-counters', daemon=True
+        )
+        _flusher_pid = os.getpid()
+        _flusher.start()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception:
+        logger.exception("Compteurs produits non écrits à l'arrêt")
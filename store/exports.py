@@ -0,0 +1,203 @@
+# store/exports.py - Exports CSV / JSON Lines en flux : mémoire constante quel que soit le volume
+
+import csv
+import gzip
+import json
+import logging
+import os
+import zlib
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+CHUNK_SIZE = 2000  # Lignes lues par aller-retour avec la base
+BUFFER_SIZE = 64 * 1024  # Octets regroupés avant chaque envoi au client
+JOB_CHUNK_SIZE = 5000  # Lignes par morceau d'un export en tâche de fond
+
+
+class Echo:
+    """Pseudo-tampon : csv.writer écrit une ligne, write() la renvoie au lieu de la garder."""
+
+    def write(self, value):
+        return value
+
+
+def rows(queryset, columns, chunk_size=CHUNK_SIZE):
+    """Tuples des seules colonnes demandées, lus par paquets (iterator) sans cache du queryset."""
+    return queryset.values_list(*(name for name, _ in columns)).iterator(chunk_size=chunk_size)
+
+
+def csv_lines(columns, records, header=True):
+    writer = csv.writer(Echo())
+    if header:
+        yield writer.writerow([title for _, title in columns])
+    for record in records:
+        yield writer.writerow(record)
+
+
+def jsonl_lines(columns, records):
+    keys = [name for name, _ in columns]
+    for record in records:
+        yield json.dumps(dict(zip(keys, record)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def buffered(lines, size=BUFFER_SIZE):
+    """Regroupe les lignes en blocs d'environ `size` octets (moins d'écritures côté serveur)."""
+    chunk, length = [], 0
+    for line in lines:
+        data = line.encode('utf-8')
+        chunk.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(chunk)
+            chunk, length = [], 0
+    if chunk:
+        yield b''.join(chunk)
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)  # En-tête gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def select(columns, names):
+    """Colonnes dont le nom figure dans `names` (ordre de la demande) ; toutes si aucune ne correspond."""
+    known = dict(columns)
+    chosen = [(name, known[name]) for name in names if name in known]
+    return chosen or list(columns)
+
+
+def export(queryset, columns, filename, format='csv', compress=False):
+    """Réponse en flux : `columns` [(nom de champ ou annotation, en-tête)], `filename` sans extension."""
+    content_type, extension = FORMATS.get(format, FORMATS['csv'])
+    lines = jsonl_lines if format == 'jsonl' else csv_lines
+    content = buffered(lines(columns, rows(queryset, columns)))
+    filename = f'{filename}.{extension}'
+    if compress:
+        content, content_type, filename = gzipped(content), 'application/gzip', f'{filename}.gz'
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def from_request(request, queryset, columns, filename):
+    """export() piloté par la requête : ?format=csv|jsonl, ?gzip=1, ?columns=nom,nom"""
+    names = [name for name in request.GET.get('columns', '').split(',') if name]
+    return export(
+        queryset,
+        select(columns, names),
+        filename,
+        format=request.GET.get('format', 'csv'),
+        compress=request.GET.get('gzip') in ('1', 'true'),
+    )
+
+
+# === Exports en tâche de fond (ExportJob, commande run_export_jobs) ===
+
+def enqueue(source, user=None, format='csv', columns=None, params=None):
+    """Crée un export ; `source` est le chemin d'import d'une fonction(**params) -> (queryset, colonnes, nom)."""
+    return ExportJob.objects.create(
+        source=source,
+        params=params or {},
+        format=format if format in FORMATS else 'csv',
+        columns=list(columns or []),
+        user=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def path(job):
+    return os.path.join(settings.MEDIA_ROOT, job.file.name)
+
+
+def run(job_id, chunk_size=JOB_CHUNK_SIZE):
+    """Exécute (ou reprend) un export en attente ; renvoie False s'il a déjà été pris."""
+    claimed = ExportJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now()
+    )
+    if not claimed:
+        return False
+    job = ExportJob.objects.get(pk=job_id)
+    try:
+        _write(job, chunk_size)
+    except Exception as exc:
+        logger.warning("Échec de l'export %s", job_id, exc_info=True)
+        job.status, job.error = 'failed', str(exc) or exc.__class__.__name__
+    else:
+        job.status = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+    return True
+
+
+def _write(job, chunk_size):
+    """Ajoute au fichier un membre gzip par morceau, puis enregistre curseur et taille.
+
+    Un fichier gzip peut enchaîner plusieurs membres : après un arrêt brutal, on
+    tronque à la taille enregistrée et on repart de `last_pk`, sans doublon.
+    """
+    queryset, columns, filename = import_string(job.source)(**job.params)
+    columns = select(columns, job.columns)
+    names = [name for name, _ in columns]
+    if not job.file:
+        job.file.name = f'exports/{job.pk}-{filename}.{FORMATS[job.format][1]}.gz'
+        job.total_rows = queryset.count()
+        job.save(update_fields=['file', 'total_rows', 'updated_at'])
+    os.makedirs(os.path.dirname(path(job)), exist_ok=True)
+
+    queryset = queryset.order_by('pk')
+    with open(path(job), 'r+b' if job.bytes_written else 'wb') as out:
+        out.truncate(job.bytes_written)  # Écarte un morceau écrit mais non validé
+        out.seek(job.bytes_written)
+        while True:
+            page = queryset if job.last_pk is None else queryset.filter(pk__gt=job.last_pk)
+            records = list(page.values_list('pk', *names)[:chunk_size])
+            values = (record[1:] for record in records)
+            if job.format == 'jsonl':
+                lines = jsonl_lines(columns, values)
+            else:
+                lines = csv_lines(columns, values, header=not job.bytes_written)
+            data = ''.join(lines).encode('utf-8')
+            if data:
+                out.write(gzip.compress(data))
+                out.flush()
+                os.fsync(out.fileno())
+                job.bytes_written = out.tell()
+            if records:
+                job.last_pk = records[-1][0]
+                job.rows_written += len(records)
+            job.save(update_fields=['last_pk', 'rows_written', 'bytes_written', 'updated_at'])
+            if len(records) < chunk_size:
+                return
+
+
+def requeue_stale(older_than):
+    """Remet en attente les exports « running » sans progrès depuis `older_than` ; ils reprendront au curseur."""
+    return ExportJob.objects.filter(status='running', updated_at__lt=older_than).update(status='pending')
+
+
+def as_dict(job):
+    """État d'un export pour l'API de suivi."""
+    return {
+        'id': job.pk,
+        'status': job.status,
+        'ready': job.status == 'done',
+        'progress': job.progress,
+        'rows_written': job.rows_written,
+        'total_rows': job.total_rows,
+        'error': job.error,
+    }
@@ -0,0 +1,240 @@
+# store/facets.py - Compteurs de facettes précalculés pour les filtres du catalogue
+
+from contextlib import contextmanager
+from decimal import Decimal
+from itertools import permutations
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+
+# Facettes proposées dans la barre de filtres de product_list
+FACETS = ['category', 'brand', 'color', 'size', 'condition', 'price']
+
+FACET_LABELS = {
+    'category': 'Catégorie',
+    'brand': 'Marque',
+    'color': 'Couleur',
+    'size': 'Taille',
+    'condition': 'État',
+    'price': 'Prix',
+}
+
+# Champs du produit qui influencent les facettes ou l'appartenance au catalogue actif
+TRACKED_FIELDS = ['category_id', 'brand', 'color', 'size', 'condition', 'price', 'is_active', 'status', 'stock']
+
+DEFAULT_PRICE_BUCKETS = [0, 50, 100, 250, 500, 1000]
+
+
+def price_buckets():
+    return getattr(settings, 'FACET_PRICE_BUCKETS', DEFAULT_PRICE_BUCKETS)
+
+
+def price_bucket(price):
+    """Clé de tranche de prix, ex. '50-100' ou '1000+'."""
+    if price is None:
+        return ''
+    edges = price_buckets()
+    for low, high in zip(edges, edges[1:]):
+        if Decimal(low) <= price < Decimal(high):
+            return f'{low}-{high}'
+    return f'{edges[-1]}+'
+
+
+def price_bucket_filter(key):
+    """Q() correspondant à une clé de tranche de prix."""
+    low, _, high = key.partition('-')
+    if key.endswith('+'):
+        return Q(price__gte=Decimal(key[:-1]))
+    return Q(price__gte=Decimal(low), price__lt=Decimal(high))
+
+
+def in_active_catalog(values):
+    return bool(values) and values['is_active'] and values['status'] == 'active' and values['stock'] > 0
+
+
+def facet_values(values):
+    """Valeurs de facettes d'un produit (dict de TRACKED_FIELDS) ; facettes vides omises."""
+    result = {
+        'category': str(values['category_id']) if values['category_id'] else '',
+        'brand': (values['brand'] or '').strip(),
+        'color': (values['color'] or '').strip(),
+        'size': values['size'] or '',
+        'condition': values['condition'] or '',
+        'price': price_bucket(values['price']),
+    }
+    return {facet: value[:100] for facet, value in result.items() if value}
+
+
+def snapshot(product):
+    return {field: getattr(product, field) for field in TRACKED_FIELDS}
+
+
+def keys_for(values):
+    """Clés (facet, value, other_facet, other_value) auxquelles contribue un produit."""
+    if not in_active_catalog(values):
+        return []
+    facets = facet_values(values)
+    keys = [(facet, value, '', '') for facet, value in facets.items()]
+    keys += [(a, facets[a], b, facets[b]) for a, b in permutations(facets, 2)]
+    return keys
+
+
+# === Maintenance incrémentale ===
+
+def apply_changes(before, after):
+    """Applique la différence entre deux états (listes de dicts TRACKED_FIELDS) aux compteurs."""
+    deltas = {}
+    for values in before:
+        for key in keys_for(values):
+            deltas[key] = deltas.get(key, 0) - 1
+    for values in after:
+        for key in keys_for(values):
+            deltas[key] = deltas.get(key, 0) + 1
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    from .models import FacetCount
+
+    def key_q(key):
+        facet, value, other_facet, other_value = key
+        return Q(facet=facet, value=value, other_facet=other_facet, other_value=other_value)
+
+    with transaction.atomic():
+        FacetCount.objects.bulk_create(
+            [FacetCount(facet=k[0], value=k[1], other_facet=k[2], other_value=k[3]) for k in deltas],
+            ignore_conflicts=True,
+        )
+        match = Q()
+        for key in deltas:
+            match |= key_q(key)
+        FacetCount.objects.filter(match).update(count=F('count') + Case(
+            *[When(key_q(key), then=Value(delta)) for key, delta in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+
+
+@contextmanager
+def track(queryset):
+    """Met à jour les compteurs autour d'un .update() ou .delete() en masse sur `queryset`."""
+    ids = list(queryset.values_list('pk', flat=True))
+    model = queryset.model
+    before = list(model.objects.filter(pk__in=ids).values(*TRACKED_FIELDS))
+    yield
+    after = list(model.objects.filter(pk__in=ids).values(*TRACKED_FIELDS))
+    apply_changes(before, after)
+
+
+def rebuild(chunk_size=2000):
+    """Recalcule tous les compteurs à partir du catalogue ; renvoie le nombre de lignes."""
+    from .models import FacetCount, Product
+
+    totals = {}
+    active = Product.objects.filter(is_active=True, status='active', stock__gt=0)
+    for values in active.values(*TRACKED_FIELDS).iterator(chunk_size=chunk_size):
+        for key in keys_for(values):
+            totals[key] = totals.get(key, 0) + 1
+
+    with transaction.atomic():
+        FacetCount.objects.all().delete()
+        FacetCount.objects.bulk_create(
+            [FacetCount(facet=k[0], value=k[1], other_facet=k[2], other_value=k[3], count=n)
+             for k, n in totals.items()],
+            batch_size=5000,
+        )
+    return len(totals)
+
+
+# === Lecture ===
+
+def product_filter(facet, value):
+    """Q() appliqué au queryset de product_list pour une facette sélectionnée."""
+    if facet == 'category':
+        return Q(category_id=value)
+    if facet == 'price':
+        return price_bucket_filter(value)
+    return Q(**{facet: value})
+
+
+def counts(selected, queryset=None):
+    """Compteurs {facet: {value: count}} pour la barre de filtres.
+
+    Chaque facette est comptée avec tous les filtres sauf le sien. Avec au plus un filtre
+    de facette actif, tout est lu dans FacetCount (une requête, indépendante de la taille
+    du catalogue). Au-delà, ou si `queryset` porte d'autres filtres (recherche, prix
+    libres), les compteurs sont calculés sur `queryset`, déjà restreint : une requête par
+    facette (len(FACETS) au plus, GROUP BY ou agrégat conditionnel pour les tranches de
+    prix), quel que soit le nombre de valeurs. product_list met ce résultat en cache tant
+    qu'aucun filtre libre n'est actif.
+    """
+    from .models import FacetCount
+
+    selected = {facet: value for facet, value in selected.items() if value and facet in FACETS}
+    result = {facet: {} for facet in FACETS}
+
+    if queryset is None and len(selected) <= 1:
+        rows = Q(other_facet='')
+        for facet, value in selected.items():
+            # Toutes les valeurs de la facette choisie + les paires conditionnées par sa valeur
+            rows = Q(facet=facet, other_facet='') | Q(facet=facet, value=value)
+        for row in FacetCount.objects.filter(rows, count__gt=0).values('facet', 'value', 'other_facet', 'other_value', 'count'):
+            if row['other_facet']:
+                result[row['other_facet']][row['other_value']] = row['count']
+            else:
+                result[row['facet']][row['value']] = row['count']
+        return result
+
+    from .models import Product
+    base = queryset if queryset is not None else Product.objects.filter(is_active=True, status='active', stock__gt=0)
+    for facet in FACETS:
+        facet_qs = base
+        for other, value in selected.items():
+            if other != facet:
+                facet_qs = facet_qs.filter(product_filter(other, value))
+        if facet == 'price':
+            keys = price_keys()
+            totals = facet_qs.aggregate(**{
+                f'price_{i}': Count('pk', filter=price_bucket_filter(key)) for i, key in enumerate(keys)
+            })
+            result['price'] = {key: totals[f'price_{i}'] for i, key in enumerate(keys) if totals[f'price_{i}']}
+            continue
+        field = 'category_id' if facet == 'category' else facet
+        for row in facet_qs.exclude(**{f'{field}__isnull': True}).values(field).annotate(n=Count('pk')).order_by():
+            value = str(row[field]).strip() if row[field] is not None else ''
+            if value:
+                result[facet][value] = result[facet].get(value, 0) + row['n']
+    return result
+
+
+def price_keys():
+    """Clés de toutes les tranches de prix, dans l'ordre."""
+    edges = price_buckets()
+    return [f'{low}-{high}' for low, high in zip(edges, edges[1:])] + [f'{edges[-1]}+']
+
+
+def sidebar(selected, queryset=None):
+    """Facettes prêtes pour le gabarit : [(facet, libellé, [(value, label, count, is_selected)])]."""
+    from .models import Category, Product
+
+    data = counts(selected, queryset)
+    labels = {
+        'category': dict(Category.objects.filter(pk__in=[int(v) for v in data['category']]).values_list('pk', 'name')),
+        'size': dict(Product.SIZE_CHOICES),
+        'condition': dict(Product.CONDITION_CHOICES),
+    }
+    entries_by_facet = []
+    for facet in FACETS:
+        entries = []
+        order = price_keys() if facet == 'price' else sorted(data[facet], key=lambda v: -data[facet][v])
+        for value in order:
+            if value not in data[facet]:
+                continue
+            if facet == 'category':
+                label = labels['category'].get(int(value), value)
+            else:
+                label = labels.get(facet, {}).get(value, value)
+            entries.append((value, label, data[facet][value], selected.get(facet) == value))
+        entries_by_facet.append((facet, FACET_LABELS[facet], entries))
+    return entries_by_facet
@@ -0,0 +1,47 @@
+# store/favorites.py - Favoris de l'utilisateur chargés une fois par requête
+
+from .models import Favorite
+
+# Stocké sur l'objet utilisateur, qui vit le temps de la requête (request.user)
+_ATTR = '_favorite_product_ids'
+
+
+def _state(user):
+    state = getattr(user, _ATTR, None)
+    if state is None:
+        state = {'favorites': set(), 'checked': set(), 'complete': False}
+        setattr(user, _ATTR, state)
+    return state
+
+
+def prefetch(user, products):
+    """Charge en une requête les favoris de `user` parmi `products` ; renvoie leurs ids."""
+    if not user.is_authenticated:
+        return set()
+    state = _state(user)
+    ids = {getattr(product, 'pk', product) for product in products}
+    missing = ids if not state['complete'] else set()
+    missing -= state['checked']
+    if missing:
+        state['favorites'].update(
+            Favorite.objects.filter(user=user, product_id__in=missing).values_list('product_id', flat=True)
+        )
+        state['checked'].update(missing)
+    return ids & state['favorites']
+
+
+def is_favorite(user, product_id):
+    if not user.is_authenticated:
+        return False
+    state = _state(user)
+    if not state['complete'] and product_id not in state['checked']:
+        # Produit non préchargé : tous les favoris de l'utilisateur, une seule fois
+        state['favorites'] = set(Favorite.objects.filter(user=user).values_list('product_id', flat=True))
+        state['complete'] = True
+    return product_id in state['favorites']
+
+
+def forget(user):
+    """À appeler après ajout ou retrait d'un favori dans la même requête."""
+    if hasattr(user, _ATTR):
+        delattr(user, _ATTR)
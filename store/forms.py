@@ -3,7 +3,6 @@ from django.core.exceptions import ValidationError
 from django.utils.text import slugify
 from .models import Product, Category, ProductVariant, Review
 from captcha.fields import ReCaptchaField
-from PIL import Image
 import os
 
 class ProductForm(forms.ModelForm):
@@ -183,11 +182,10 @@ class ProductForm(forms.ModelForm):
         if ext not in valid_extensions:
             raise ValidationError("Formats autorisés : JPG, JPEG, PNG, WEBP.")
         
-        # Vérifier que c'est bien une image
-        try:
-            img = Image.open(image)
-            img.verify()
-        except Exception:
+        # forms.ImageField a déjà ouvert le fichier avec Pillow : pas de second décodage
+        # dans la requête, le traitement complet se fait dans le pool de store.jobs
+        opened = getattr(image, 'image', None)
+        if opened is not None and opened.format not in ('JPEG', 'PNG', 'WEBP'):
             raise ValidationError("Fichier image invalide.")
         
         return image
@@ -0,0 +1,135 @@
+# store/jobs.py - Traitements d'images exécutés hors de la requête HTTP (pool de threads)
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import ImageJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+
+# Décodage, redimensionnement et encodage Pillow libèrent le GIL : des threads
+# suffisent, sans recharger Django dans des processus séparés
+_handlers = {}
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+
+def workers():
+    """Threads du pool ; 0 exécute les traitements dans le processus appelant (tests)."""
+    return getattr(settings, 'IMAGE_JOB_WORKERS', DEFAULT_WORKERS)
+
+
+def handler(kind):
+    """Enregistre `func(instance, field) -> dict` pour les traitements de type `kind`."""
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, instance, field, user=None):
+    """Crée le traitement et le confie au pool une fois la transaction validée."""
+    if kind not in _handlers:
+        raise ValueError(f"Traitement d'image inconnu : {kind}")
+    job = ImageJob.objects.create(
+        kind=kind,
+        model=instance._meta.label,
+        object_id=instance.pk,
+        field=field,
+        source=getattr(instance, field).name or '',
+        user=user if user is not None and user.is_authenticated else None,
+    )
+    transaction.on_commit(lambda: submit(job.pk))
+    return job
+
+
+def submit(job_id):
+    """Lance le traitement ; renvoie le Future du pool (None en exécution immédiate)."""
+    if not workers():
+        run(job_id)
+        return None
+    return _pool().submit(_run_in_thread, job_id)
+
+
+def _pool():
+    global _executor, _executor_pid
+    # Après un fork (workers gunicorn), les threads du parent n'existent plus
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=workers(), thread_name_prefix='image-jobs')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def shutdown(wait=True):
+    """Arrête le pool (il est recréé au prochain submit())."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run(job_id)
+    except Exception:
+        logger.exception("Traitement d'image %s interrompu", job_id)
+    finally:
+        connection.close()
+
+
+def run(job_id):
+    """Exécute un traitement en attente ; renvoie False s'il a déjà été pris."""
+    # Prise conditionnelle : le pool et process_image_jobs ne traitent jamais le même job
+    claimed = ImageJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now()
+    )
+    if not claimed:
+        return False
+    job = ImageJob.objects.get(pk=job_id)
+    try:
+        instance = apps.get_model(job.model).objects.get(pk=job.object_id)
+        if getattr(instance, job.field).name != job.source:
+            # Image remplacée entre-temps : son propre traitement s'en charge
+            result = {'skipped': True}
+        else:
+            result = _handlers[job.kind](instance, job.field) or {}
+    except Exception as exc:
+        logger.warning("Échec du traitement d'image %s", job_id, exc_info=True)
+        job.status, job.error = 'failed', str(exc) or exc.__class__.__name__
+    else:
+        job.status, job.result = 'done', result
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    return True
+
+
+def requeue_stale(older_than):
+    """Remet en attente les jobs « running » abandonnés (processus arrêté en cours de route)."""
+    return ImageJob.objects.filter(status='running', started_at__lt=older_than).update(
+        status='pending', started_at=None
+    )
+
+
+def as_dict(job):
+    """État d'un traitement pour l'API de suivi."""
+    return {
+        'id': job.pk,
+        'kind': job.kind,
+        'status': job.status,
+        'ready': job.status == 'done',
+        'result': job.result,
+        'error': job.error,
+    }
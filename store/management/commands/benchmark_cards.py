@@ -0,0 +1,40 @@
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from store.models import Product
+from store.benchmarks import make_products, percentiles, temporary_database, timed
+
+class Command(BaseCommand):
+    help = "Compare instances Product complètes et projection ProductCard (latence et mémoire)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=100000, help='Taille du catalogue')
+        parser.add_argument('--rows', default='12,100,1000', help='Nombre de cartes chargées, séparés par des virgules')
+        parser.add_argument('--repeat', type=int, default=30)
+
+    def handle(self, *args, **options):
+        with temporary_database():
+            self.stdout.write(f"Catalogue de {options['size']} produits...")
+            make_products(options['size'])
+            base = Product.objects.filter(is_active=True, status='active', stock__gt=0).order_by('-created_at')
+            variants = (
+                ('instances', lambda n: list(base.select_related('category', 'seller')[:n])),
+                ('cartes', lambda n: list(base.cards()[:n])),
+            )
+
+            for rows in (int(r) for r in options['rows'].split(',')):
+                self.stdout.write(f'{rows} carte(s)')
+                for label, load in variants:
+                    samples = [timed(load, rows)[0] for _ in range(options['repeat'])]
+                    tracemalloc.start()
+                    result = load(rows)
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    del result
+                    stats = percentiles(samples)
+                    self.stdout.write(
+                        f"  {label:<10} p50={stats['p50']:8.2f} ms  p95={stats['p95']:8.2f} ms  "
+                        f"mémoire max={peak / 1024:9.1f} Kio"
+                    )
+
+        self.stdout.write(self.style.SUCCESS('Terminé.'))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from store.models import Product
+from store.pagination import CursorPaginator
+from store.benchmarks import make_products, percentiles, temporary_database, timed
+
+class Command(BaseCommand):
+    help = "Compare le coût d'une page profonde avec OFFSET et avec un curseur"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=100000, help='Taille du catalogue')
+        parser.add_argument('--per-page', type=int, default=12)
+        parser.add_argument('--pages', default='1,100,1000,5000', help='Numéros de page mesurés')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        per_page = options['per_page']
+        pages = sorted(int(p) for p in options['pages'].split(','))
+
+        with temporary_database():
+            self.stdout.write(f"Catalogue de {options['size']} produits...")
+            make_products(options['size'])
+            queryset = Product.objects.filter(is_active=True, status='active', stock__gt=0)
+
+            for ordering in (['-created_at'], ['price'], ['-sales_count', '-views']):
+                self.stdout.write(f"Tri {', '.join(ordering)}")
+                paginator = CursorPaginator(queryset, per_page, ordering)
+                # Curseurs obtenus en suivant les liens « Suivant », comme un visiteur
+                cursors, page, number = {1: None}, paginator.page(), 1
+                while number < pages[-1] and page.has_next():
+                    number += 1
+                    cursors[number] = page.next_cursor
+                    page = paginator.page(page.next_cursor)
+
+                for number in pages:
+                    if number not in cursors:
+                        break
+                    start = (number - 1) * per_page
+                    offset = [timed(lambda: list(paginator.queryset[start:start + per_page]))[0] for _ in range(options['repeat'])]
+                    cursor = [timed(paginator.page, cursors[number])[0] for _ in range(options['repeat'])]
+                    self.stdout.write(
+                        f"  page {number:<6} OFFSET p50={percentiles(offset)['p50']:7.2f} ms"
+                        f"   curseur p50={percentiles(cursor)['p50']:7.2f} ms"
+                    )
+
+        self.stdout.write(self.style.SUCCESS('Terminé.'))
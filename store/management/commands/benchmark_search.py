@@ -0,0 +1,56 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from store.models import Product
+from store import search
+from store.benchmarks import WORDS, make_products, percentiles, temporary_database, timed
+
+class Command(BaseCommand):
+    help = "Compare la latence (p50/p95) de la recherche icontains et de l'index plein texte"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000', help='Tailles de catalogue, séparées par des virgules')
+        parser.add_argument('--queries', type=int, default=50, help='Nombre de requêtes par mesure')
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(s) for s in options['sizes'].split(','))
+        rng = random.Random(7)
+        queries = [
+            ' '.join(rng.sample(WORDS, rng.choice([1, 2])))
+            for _ in range(options['queries'])
+        ]
+        # Préfixes sans accents : « tele » doit trouver « télévision »
+        queries += [word[:4].replace('é', 'e') for word in rng.sample(WORDS, 10)]
+
+        with temporary_database():
+            seeded = 0
+            for size in sizes:
+                self.stdout.write(f'Catalogue de {size} produits...')
+                seeded += make_products(size - seeded, seed=size)
+                search.rebuild_index(Product.objects.all())
+
+                base = Product.objects.filter(is_active=True, status='active', stock__gt=0)
+                legacy = [timed(self._first_page, self._icontains(base, q))[0] for q in queries]
+                indexed = [timed(self._first_page, search.search(base, q).order_by('search_rank'))[0] for q in queries]
+
+                for label, samples in (('icontains', legacy), ('index', indexed)):
+                    stats = percentiles(samples)
+                    self.stdout.write(
+                        f"  {label:<10} p50={stats['p50']:8.2f} ms  p95={stats['p95']:8.2f} ms  max={stats['max']:8.2f} ms"
+                    )
+
+        backend = 'FTS5' if search.fts_available() else 'SearchToken'
+        self.stdout.write(self.style.SUCCESS(f'Terminé (index : {backend}).'))
+
+    def _icontains(self, queryset, query):
+        return queryset.filter(
+            Q(name__icontains=query) |
+            Q(description__icontains=query) |
+            Q(tags__icontains=query) |
+            Q(brand__icontains=query)
+        ).order_by('-created_at')
+
+    def _first_page(self, queryset):
+        # Même travail que la première page de product_list : COUNT + 12 lignes
+        return queryset.count(), list(queryset[:12])
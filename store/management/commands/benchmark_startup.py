@@ -0,0 +1,87 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Exécuté dans un interpréteur neuf : rien n'est déjà importé
+SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls = time.perf_counter()
+from django.test import Client
+response = Client().get(sys.argv[1], HTTP_HOST=sys.argv[2])
+end = time.perf_counter()
+print(json.dumps({
+    'setup': (setup - start) * 1000, 'urls': (urls - setup) * 1000,
+    'request': (end - urls) * 1000, 'total': (end - start) * 1000, 'status': response.status_code,
+}))
+'''
+
+
+def parse_importtime(stderr):
+    """Temps d'import propre (ms) par paquet de premier niveau, depuis la sortie de -X importtime."""
+    packages = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(self_us) / 1000
+    return packages
+
+
+class Command(BaseCommand):
+    help = "Mesure le démarrage d'un worker : temps d'import par application et délai jusqu'à la première réponse"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/', help='URL de la première requête')
+        parser.add_argument('--host', default='localhost', help='En-tête Host de la requête')
+        parser.add_argument('--repeat', type=int, default=5, help='Démarrages mesurés (médiane)')
+        parser.add_argument('--top', type=int, default=10, help='Paquets tiers les plus coûteux affichés')
+
+    def run_once(self, options):
+        env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', SCRIPT, options['path'], options['host']],
+            capture_output=True, text=True, env=env,
+        )
+        lines = process.stdout.strip().splitlines()
+        if process.returncode or not lines:
+            raise CommandError(f"Démarrage en échec :\n{process.stderr[-2000:]}")
+        return json.loads(lines[-1]), parse_importtime(process.stderr)
+
+    def handle(self, *args, **options):
+        runs = [self.run_once(options) for _ in range(options['repeat'])]
+        timings = {key: statistics.median(run[key] for run, _ in runs) for key in ('setup', 'urls', 'request', 'total')}
+        names = {name for _, packages in runs for name in packages}
+        imports = {name: statistics.median(packages.get(name, 0.0) for _, packages in runs) for name in names}
+
+        self.stdout.write(f"Médiane sur {len(runs)} démarrage(s), GET {options['path']} -> {runs[-1][0]['status']}")
+        self.stdout.write(f"  django.setup()        {timings['setup']:8.1f} ms")
+        self.stdout.write(f"  chargement des URLs   {timings['urls']:8.1f} ms")
+        self.stdout.write(f"  première requête      {timings['request']:8.1f} ms")
+        self.stdout.write(f"  total                 {timings['total']:8.1f} ms")
+
+        local = {
+            config.name.split('.')[0] for config in apps.get_app_configs()
+            if str(config.path).startswith(str(settings.BASE_DIR))
+        } | {settings.ROOT_URLCONF.split('.')[0]}
+        self.stdout.write('Imports par application (temps propre, ms)')
+        for name in sorted(local, key=lambda n: -imports.get(n, 0.0)):
+            self.stdout.write(f"  {name:<22}{imports.get(name, 0.0):8.1f}")
+        self.stdout.write('Paquets tiers les plus coûteux (ms)')
+        others = sorted((n for n in imports if n not in local), key=lambda n: -imports[n])
+        for name in others[:options['top']]:
+            self.stdout.write(f"  {name:<22}{imports[name]:8.1f}")
+
+        self.stdout.write(self.style.SUCCESS('Terminé.'))
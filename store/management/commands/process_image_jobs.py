@@ -0,0 +1,25 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from store.models import ImageJob
+from store import jobs
+
+class Command(BaseCommand):
+    help = "Exécute les traitements d'images restés en attente (ex. après un redémarrage des workers)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale-minutes', type=int, default=15,
+                            help='Relancer les traitements « en cours » depuis plus de N minutes')
+        parser.add_argument('--limit', type=int, default=1000, help='Nombre maximal de traitements')
+
+    def handle(self, *args, **options):
+        requeued = jobs.requeue_stale(timezone.now() - timedelta(minutes=options['stale_minutes']))
+        if requeued:
+            self.stdout.write(f'{requeued} traitement(s) abandonné(s) remis en attente.')
+        job_ids = list(
+            ImageJob.objects.filter(status='pending').order_by('created_at')
+            .values_list('pk', flat=True)[:options['limit']]
+        )
+        processed = sum(1 for job_id in job_ids if jobs.run(job_id))
+        failed = ImageJob.objects.filter(pk__in=job_ids, status='failed').count()
+        self.stdout.write(self.style.SUCCESS(f'{processed} traitement(s) exécuté(s), {failed} en échec.'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from store import facets
+
+class Command(BaseCommand):
+    help = 'Recalcule les compteurs de facettes du catalogue actif (FacetCount)'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Recalcul des compteurs de facettes...')
+        rows = facets.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{rows} compteur(s) enregistré(s).'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from store.models import Favorite, Product
+from store import counters
+
+class Command(BaseCommand):
+    help = 'Recalcule Product.favorites_count à partir des favoris enregistrés'
+
+    def handle(self, *args, **options):
+        counters.flush()
+        favorites = (
+            Favorite.objects.filter(product=OuterRef('pk'))
+            .order_by().values('product').annotate(n=Count('pk')).values('n')
+        )
+        updated = Product.objects.update(favorites_count=Coalesce(Subquery(favorites), 0))
+        self.stdout.write(self.style.SUCCESS(f'{updated} produit(s) mis à jour.'))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from store import notifications
+
+class Command(BaseCommand):
+    help = 'Recalcule les compteurs de notifications non lues à partir des notifications enregistrées'
+
+    def handle(self, *args, **options):
+        counters = notifications.recount()
+        self.stdout.write(self.style.SUCCESS(f'{counters} compteur(s) recalculé(s).'))
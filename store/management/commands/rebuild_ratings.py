@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from store.models import Product
+from store import ratings
+
+class Command(BaseCommand):
+    help = 'Recalcule les agrégats de notes des produits (somme, nombre, histogramme) depuis les avis approuvés'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Nombre de produits par lot')
+        parser.add_argument('--product', type=int, action='append', help='Limiter à ce produit (répétable)')
+
+    def handle(self, *args, **options):
+        products = Product.objects.all()
+        if options['product']:
+            products = products.filter(pk__in=options['product'])
+        self.stdout.write('Recalcul des agrégats de notes...')
+        fixed = ratings.rebuild(products, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'{fixed} produit(s) corrigé(s).'))
@@ -0,0 +1,35 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from store.models import ImageRendition
+from store import renditions
+
+class Command(BaseCommand):
+    help = 'Crée les déclinaisons (miniatures, WebP) des images déjà téléversées'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Recréer aussi les images déjà déclinées')
+        parser.add_argument('--model', action='append', choices=sorted(renditions.SOURCES),
+                            help='Limiter à ce modèle (répétable)')
+
+    def handle(self, *args, **options):
+        done = set() if options['force'] else set(
+            ImageRendition.objects.values_list('source', flat=True).distinct()
+        )
+        created = skipped = 0
+        for label in options['model'] or renditions.SOURCES:
+            fields = renditions.SOURCES[label]
+            model = apps.get_model(label)
+            self.stdout.write(f'{label}...')
+            for instance in model.objects.only('pk', *fields).iterator(chunk_size=500):
+                for field in fields:
+                    image = getattr(instance, field)
+                    if not image or image.name in done:
+                        continue
+                    if renditions.generate(image):
+                        created += 1
+                        done.add(image.name)
+                    else:
+                        skipped += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'{created} image(s) déclinée(s), {skipped} ignorée(s) (fichier absent ou illisible).'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from store.models import Product
+from store import search
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche du catalogue (FTS5 ou table SearchToken)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Nombre de produits par lot')
+
+    def handle(self, *args, **options):
+        backend = 'FTS5' if search.fts_available() else 'SearchToken'
+        self.stdout.write(f"Reconstruction de l'index ({backend})...")
+        total = search.rebuild_index(Product.objects.all(), chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'{total} produit(s) indexé(s).'))
@@ -0,0 +1,33 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from store.models import ExportJob
+from store import exports
+
+class Command(BaseCommand):
+    help = "Exécute les exports en attente par morceaux ; reprend ceux interrompus (--loop : worker permanent)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale-minutes', type=int, default=10,
+                            help='Reprendre les exports « en cours » sans progrès depuis N minutes')
+        parser.add_argument('--chunk-size', type=int, default=exports.JOB_CHUNK_SIZE, help='Lignes par morceau')
+        parser.add_argument('--loop', action='store_true', help='Attendre de nouveaux exports au lieu de s\'arrêter')
+        parser.add_argument('--interval', type=float, default=5, help='Secondes entre deux recherches (--loop)')
+
+    def handle(self, *args, **options):
+        while True:
+            self.run_pending(options)
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def run_pending(self, options):
+        requeued = exports.requeue_stale(timezone.now() - timedelta(minutes=options['stale_minutes']))
+        if requeued:
+            self.stdout.write(f'{requeued} export(s) interrompu(s) remis en attente.')
+        job_ids = list(ExportJob.objects.filter(status='pending').order_by('created_at').values_list('pk', flat=True))
+        for job_id in job_ids:
+            if exports.run(job_id, options['chunk_size']):
+                job = ExportJob.objects.get(pk=job_id)
+                self.stdout.write(f'Export {job_id} : {job.status}, {job.rows_written} ligne(s).')
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from store import reservations
+
+class Command(BaseCommand):
+    help = 'Libère les réservations de stock expirées (à lancer régulièrement, ex. chaque minute)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Réservations libérées par transaction')
+
+    def handle(self, *args, **options):
+        released = reservations.sweep(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{released} réservation(s) expirée(s) libérée(s).'))
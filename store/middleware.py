@@ -0,0 +1,16 @@
+# store/middleware.py - Middleware de la boutique
+
+from .carts import SessionCart
+
+class SessionCartMiddleware:
+    """Renvoie au navigateur le cookie du panier anonyme s'il a été modifié (voir store.carts)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        cart = getattr(request, '_session_cart', None)
+        if isinstance(cart, SessionCart):
+            cart.save(response)
+        return response
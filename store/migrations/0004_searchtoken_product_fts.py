@@ -0,0 +1,131 @@
+# Generated by Django 4.2.16 on 2026-10-18 09:12
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Copie figée de la normalisation de store.search au moment de cette migration :
+# une évolution de la recherche ne doit pas changer ce que la migration écrit
+
+FIELD_WEIGHTS = {
+    'name': 10,
+    'brand': 5,
+    'tags': 4,
+    'description': 1,
+}
+
+STOPWORDS = {
+    'a', 'au', 'aux', 'avec', 'ce', 'ces', 'dans', 'de', 'des', 'du', 'en',
+    'et', 'la', 'le', 'les', 'l', 'd', 'ou', 'par', 'pour', 'sur', 'un', 'une',
+}
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    if not text:
+        return ''
+    text = text.lower().replace('œ', 'oe').replace('æ', 'ae')
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def token_weights(document):
+    weights = {}
+    for field, text in document.items():
+        for token in TOKEN_RE.findall(normalize(text)):
+            if token in STOPWORDS:
+                continue
+            token = token[:64]
+            weights[token] = weights.get(token, 0) + FIELD_WEIGHTS[field]
+    return weights
+
+
+def create_fts_table(apps, schema_editor):
+    """Crée la table virtuelle FTS5 si la base est SQLite et que FTS5 est compilé, puis l'alimente."""
+    fts = False
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            try:
+                cursor.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS store_product_fts USING fts5("
+                    "name, brand, tags, description, "
+                    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                )
+                fts = True
+            except Exception:
+                # Pas de FTS5 : store.search bascule sur la table SearchToken
+                pass
+    populate_index(apps, schema_editor, fts)
+
+
+def populate_index(apps, schema_editor, fts, chunk_size=2000):
+    """Indexe les produits existants comme store.search.rebuild_index à cette date."""
+    Product = apps.get_model('store', 'Product')
+    SearchToken = apps.get_model('store', 'SearchToken')
+    # Champs absents de l'état historique (tags) : indexés vides jusqu'au prochain rebuild
+    present = {field.name for field in Product._meta.get_fields()}
+    fields = [field for field in FIELD_WEIGHTS if field in present]
+
+    def flush(rows):
+        documents = []
+        for pk, *values in rows:
+            doc = dict.fromkeys(FIELD_WEIGHTS, '')
+            doc.update((field, normalize(value)) for field, value in zip(fields, values))
+            documents.append((pk, doc))
+        if fts:
+            with schema_editor.connection.cursor() as cursor:
+                cursor.executemany(
+                    "INSERT INTO store_product_fts(rowid, name, brand, tags, description) "
+                    "VALUES (%s, %s, %s, %s, %s)",
+                    [(pk, doc['name'], doc['brand'], doc['tags'], doc['description']) for pk, doc in documents]
+                )
+        else:
+            SearchToken.objects.bulk_create(
+                [SearchToken(product_id=pk, token=token, weight=weight)
+                 for pk, doc in documents for token, weight in token_weights(doc).items()],
+                batch_size=5000,
+            )
+
+    rows = []
+    for row in Product.objects.values_list('pk', *fields).iterator(chunk_size=chunk_size):
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            flush(rows)
+            rows = []
+    if rows:
+        flush(rows)
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS store_product_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0003_guineaaddress_guineaprefecture_guinearegion_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='store.product')),
+            ],
+            options={
+                'verbose_name': 'Jeton de recherche',
+                'verbose_name_plural': 'Jetons de recherche',
+                'indexes': [models.Index(fields=['token', 'product'], name='store_searc_token_221562_idx')],
+            },
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
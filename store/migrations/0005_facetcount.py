@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0004_searchtoken_product_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('other_facet', models.CharField(blank=True, default='', max_length=20)),
+                ('other_value', models.CharField(blank=True, default='', max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Compteur de facette',
+                'verbose_name_plural': 'Compteurs de facettes',
+                'unique_together': {('facet', 'value', 'other_facet', 'other_value')},
+            },
+        ),
+    ]
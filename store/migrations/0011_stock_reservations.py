@@ -0,0 +1,43 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('store', '0010_imagejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='reserved',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Stock réservé'),
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_key', models.CharField(blank=True, max_length=40)),
+                ('quantity', models.PositiveIntegerField()),
+                ('expires_at', models.DateTimeField()),
+                ('release_token', models.CharField(blank=True, default='', max_length=32)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='store.product')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stock_reservations', to=settings.AUTH_USER_MODEL)),
+                # ProductVariant n'existe pas encore dans l'historique des migrations : colonne
+                # sans contrainte, la clé étrangère (et ProductVariant.reserved) viendront avec
+                # la migration qui crée ce modèle
+                ('variant', models.BigIntegerField(blank=True, db_column='variant_id', null=True)),
+            ],
+            options={
+                'verbose_name': 'Réservation de stock',
+                'verbose_name_plural': 'Réservations de stock',
+                'indexes': [models.Index(fields=['expires_at'], name='store_stock_expires_f1477d_idx'), models.Index(fields=['user', 'product'], name='store_stock_user_id_c34ef6_idx'), models.Index(fields=['session_key', 'product'], name='store_stock_session_2f9f65_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.16 on 2026-10-18 23:20
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def backfill_counters(apps, schema_editor):
+    Notification = apps.get_model('store', 'Notification')
+    NotificationCounter = apps.get_model('store', 'NotificationCounter')
+    rows = (
+        Notification.objects.filter(is_read=False)
+        .values('user_id')
+        .annotate(unread=Count('pk'))
+        .order_by()
+    )
+    NotificationCounter.objects.bulk_create(
+        (NotificationCounter(user_id=row['user_id'], unread=row['unread']) for row in rows.iterator()),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('store', '0014_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Compteur de notifications',
+                'verbose_name_plural': 'Compteurs de notifications',
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
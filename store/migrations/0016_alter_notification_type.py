@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0015_notificationcounter'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='notification',
+            old_name='notification_type',
+            new_name='type',
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='type',
+            field=models.CharField(choices=[('order_placed', 'Nouvelle commande'), ('order_updated', 'Commande mise à jour'), ('product_approved', 'Produit approuvé'), ('product_rejected', 'Produit rejeté'), ('review_added', 'Nouvel avis'), ('stock_low', 'Stock faible'), ('general', 'Général')], default='general', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='title',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='action_url',
+            field=models.URLField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='action_text',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
@@ -5,7 +5,6 @@ from decimal import Decimal
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.urls import reverse
-from PIL import Image
 import os
 import uuid
 from datetime import timedelta
@@ -14,6 +13,10 @@ from datetime import timedelta
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True)
+    parent = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='children', verbose_name="Catégorie parente"
+    )
     description = models.TextField(blank=True)
     image = models.ImageField(upload_to='categories/', blank=True, null=True)
     is_active = models.BooleanField(default=True)
@@ -34,6 +37,20 @@ class Category(models.Model):
     def product_count(self):
         return self.products.filter(is_active=True, stock__gt=0).count()
 
+# === QuerySet Product ===
+class ProductQuerySet(models.QuerySet):
+    def cards(self):
+        """Projection légère pour les cartes des listes (voir store.cards.ProductCard)"""
+        from django.db.models.functions import Coalesce, NullIf
+        from .cards import CARD_FIELDS, ProductCardIterable
+
+        images = [NullIf(f'image{i}', models.Value(''), output_field=models.CharField()) for i in range(1, 6)]
+        extra = [name for name in self.query.annotations if name not in CARD_FIELDS]
+        queryset = self.annotate(image=Coalesce(*images, output_field=models.CharField()))
+        queryset = queryset.values_list(*CARD_FIELDS, *extra)
+        queryset._iterable_class = ProductCardIterable
+        return queryset
+
 # === Modèle Product ===
 class Product(models.Model):
     SIZE_CHOICES = [
@@ -79,6 +96,7 @@ class Product(models.Model):
     compare_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, verbose_name="Prix de comparaison")
     cost_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, verbose_name="Prix de revient")
     stock = models.PositiveIntegerField(verbose_name="Stock")
+    reserved = models.PositiveIntegerField(default=0, editable=False, verbose_name="Stock réservé")  # store.reservations
     low_stock_threshold = models.PositiveIntegerField(default=5, verbose_name="Seuil stock faible")
     
     # Images
@@ -117,11 +135,23 @@ class Product(models.Model):
     sales_count = models.PositiveIntegerField(default=0, verbose_name="Nombre de ventes")
     favorites_count = models.PositiveIntegerField(default=0, verbose_name="Nombre de favoris")
     
+    # Notes (avis approuvés, maintenus par store.ratings)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Nombre d'avis")
+    rating_average = models.FloatField(default=0, editable=False, verbose_name="Note moyenne")
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False)
+    
     # Dates
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
 
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Produit"
         verbose_name_plural = "Produits"
@@ -130,27 +160,46 @@ class Product(models.Model):
             models.Index(fields=['seller', 'status']),
             models.Index(fields=['category', 'is_active']),
             models.Index(fields=['created_at']),
+            # Clés de tri de la pagination par curseur
+            models.Index(fields=['price']),
+            models.Index(fields=['sales_count', 'views']),
+            models.Index(fields=['seller', 'created_at']),
+            models.Index(fields=['seller', 'stock']),
+            models.Index(fields=['rating_average', 'rating_count']),
         ]
 
     def __str__(self):
         return self.name
 
+    RATING_FIELDS = (
+        'rating_sum', 'rating_count', 'rating_average',
+        'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+    )
+    COUNTER_FIELDS = ('views', 'sales_count', 'favorites_count')
+    RESERVATION_FIELDS = ('reserved',)
+
     def save(self, *args, **kwargs):
-        # Générer le slug automatiquement
-        if not self.slug:
-            from django.utils.text import slugify
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-            while Product.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
-        
         # Définir la date de publication
         if self.status == 'active' and not self.published_at:
             self.published_at = timezone.now()
         
+        # Notes, compteurs et réservations sont maintenus par UPDATE (store.ratings,
+        # store.counters, store.reservations) : une instance chargée avant un nouvel avis,
+        # une vue ou une réservation ne doit pas les écraser
+        if self.pk is not None and not self._state.adding and not args and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.RATING_FIELDS + self.COUNTER_FIELDS + self.RESERVATION_FIELDS
+            ]
+        
+        # Générer le slug automatiquement (suffixe libre trouvé en une requête)
+        if not self.slug:
+            from .allocators import next_slug, save_unique
+            save_unique(
+                self, 'slug', lambda attempt: next_slug(Product, self.name, attempt),
+                lambda: super(Product, self).save(*args, **kwargs),
+            )
+            return
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -160,6 +209,11 @@ class Product(models.Model):
     def is_in_stock(self):
         return self.stock > 0 and self.is_active
 
+    @property
+    def available_stock(self):
+        """Stock moins les unités retenues dans des paniers en cours de commande"""
+        return max(self.stock - self.reserved, 0)
+
     @property
     def is_low_stock(self):
         return self.stock <= self.low_stock_threshold
@@ -178,14 +232,23 @@ class Product(models.Model):
 
     @property
     def average_rating(self):
-        reviews = self.reviews.filter(is_approved=True)
-        if reviews.exists():
-            return round(sum(review.rating for review in reviews) / reviews.count(), 1)
+        if self.rating_count:
+            return round(self.rating_sum / self.rating_count, 1)
         return 0
 
     @property
     def review_count(self):
-        return self.reviews.filter(is_approved=True).count()
+        return self.rating_count
+
+    @property
+    def rating_histogram(self):
+        """[(étoiles, nombre, pourcentage)] de 5 à 1 étoile"""
+        histogram = []
+        for star in range(5, 0, -1):
+            count = getattr(self, f'rating_{star}_count')
+            percent = round(count * 100 / self.rating_count) if self.rating_count else 0
+            histogram.append((star, count, percent))
+        return histogram
 
     @property
     def main_image(self):
@@ -200,12 +263,128 @@ class Product(models.Model):
         return images
 
     def increment_views(self):
+        # Écriture différée (store.counters) : pas d'UPDATE à chaque affichage
+        from .counters import increment
+        increment(self.pk, 'views')
         self.views += 1
-        self.save(update_fields=['views'])
 
     def can_be_edited_by(self, user):
         return self.seller == user or user.is_staff
 
+# === Modèle SearchToken (index de recherche hors FTS5) ===
+class SearchToken(models.Model):
+    """Index inversé utilisé quand SQLite FTS5 n'est pas disponible (voir store.search)."""
+    token = models.CharField(max_length=64)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='search_tokens')
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        verbose_name = "Jeton de recherche"
+        verbose_name_plural = "Jetons de recherche"
+        indexes = [
+            models.Index(fields=['token', 'product']),
+        ]
+
+    def __str__(self):
+        return f"{self.token} -> {self.product_id}"
+
+# === Modèle SearchDocument (table FTS5 de la recherche, créée par la migration 0004) ===
+class SearchDocument(models.Model):
+    """Ligne de la table virtuelle FTS5, jointe aux produits sur rowid (voir store.search).
+
+    Écrite en SQL brut par store.search ; absente sans FTS5, jamais créée par l'ORM.
+    """
+    product = models.OneToOneField(
+        Product, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='search_document',
+    )
+    # Colonne cachée du nom de la table : cible de MATCH et premier argument de bm25()
+    document = models.TextField(db_column='store_product_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'store_product_fts'
+
+# === Modèle FacetCount (compteurs de filtres du catalogue) ===
+class FacetCount(models.Model):
+    """Nombre de produits du catalogue actif par valeur de facette (voir store.facets).
+
+    Une ligne sans `other_facet` compte une valeur seule ; les autres comptent les
+    produits ayant à la fois `facet=value` et `other_facet=other_value`.
+    """
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=100)
+    other_facet = models.CharField(max_length=20, blank=True, default='')
+    other_value = models.CharField(max_length=100, blank=True, default='')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Compteur de facette"
+        verbose_name_plural = "Compteurs de facettes"
+        unique_together = ('facet', 'value', 'other_facet', 'other_value')
+
+    def __str__(self):
+        if self.other_facet:
+            return f"{self.facet}={self.value} & {self.other_facet}={self.other_value}: {self.count}"
+        return f"{self.facet}={self.value}: {self.count}"
+
+# === Modèle ImageRendition (déclinaisons redimensionnées des images) ===
+class ImageRendition(models.Model):
+    """Version réduite d'une image téléversée, rangée à côté de l'original (voir store.renditions)."""
+    FORMAT_CHOICES = [
+        ('webp', 'WebP'),
+        ('jpeg', 'JPEG'),
+        ('png', 'PNG'),
+    ]
+
+    source = models.CharField(max_length=255, db_index=True)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    name = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Déclinaison d'image"
+        verbose_name_plural = "Déclinaisons d'images"
+        unique_together = ('source', 'format', 'width')
+
+    def __str__(self):
+        return f"{self.source} ({self.format} {self.width}w)"
+
+# === Modèle ImageJob (traitement d'image hors requête HTTP) ===
+class ImageJob(models.Model):
+    """Traitement différé d'une image téléversée, exécuté par le pool de store.jobs."""
+    STATUS_CHOICES = [
+        ('pending', 'En attente'),
+        ('running', 'En cours'),
+        ('done', 'Terminé'),
+        ('failed', 'Échec'),
+    ]
+
+    kind = models.CharField(max_length=30)
+    model = models.CharField(max_length=100)  # "app_label.Model" de l'objet portant l'image
+    object_id = models.PositiveIntegerField()
+    field = models.CharField(max_length=50)
+    source = models.CharField(max_length=255)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='image_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Traitement d'image"
+        verbose_name_plural = "Traitements d'images"
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.model}#{self.object_id}.{self.field} ({self.status})"
+
 # === Modèle ProductImage (pour plus de flexibilité) ===
 class ProductImage(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='additional_images')
@@ -228,6 +407,7 @@ class ProductVariant(models.Model):
     sku = models.CharField(max_length=100, unique=True, verbose_name="SKU")
     price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Prix")
     stock = models.PositiveIntegerField(verbose_name="Stock")
+    reserved = models.PositiveIntegerField(default=0, editable=False, verbose_name="Stock réservé")  # store.reservations
     size = models.CharField(max_length=20, choices=Product.SIZE_CHOICES, blank=True)
     color = models.CharField(max_length=50, blank=True)
     image = models.ImageField(upload_to='products/variants/', blank=True, null=True)
@@ -241,6 +421,106 @@ class ProductVariant(models.Model):
     def __str__(self):
         return f"{self.product.name} - {self.name}"
 
+    def save(self, *args, **kwargs):
+        # Comme Product.save() : `reserved` n'est écrit que par store.reservations
+        if self.pk is not None and not self._state.adding and not args and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'reserved'
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def available_stock(self):
+        return max(self.stock - self.reserved, 0)
+
+# === Modèle StockReservation (unités retenues pendant la commande) ===
+class StockReservation(models.Model):
+    """Réservation temporaire de stock d'un panier (voir store.reservations).
+
+    Tant qu'elle existe, `quantity` est comptée dans `reserved` du produit (ou de la
+    variante) ; confirmée, elle devient une baisse de `stock`.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, null=True, blank=True, related_name='reservations')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='stock_reservations')
+    session_key = models.CharField(max_length=40, blank=True)
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    release_token = models.CharField(max_length=32, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Réservation de stock"
+        verbose_name_plural = "Réservations de stock"
+        indexes = [
+            models.Index(fields=['expires_at']),
+            models.Index(fields=['user', 'product']),
+            models.Index(fields=['session_key', 'product']),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} jusqu'à {self.expires_at:%H:%M}"
+
+# === Modèle Sequence (compteurs réservés par blocs) ===
+class Sequence(models.Model):
+    """Compteur nommé ; store.allocators en réserve des blocs de valeurs par UPDATE."""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Séquence"
+        verbose_name_plural = "Séquences"
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+# === Modèle ExportJob (exports volumineux en tâche de fond) ===
+class ExportJob(models.Model):
+    """Export écrit par morceaux sous MEDIA_ROOT/exports par la commande run_export_jobs."""
+    STATUS_CHOICES = [
+        ('pending', 'En attente'),
+        ('running', 'En cours'),
+        ('done', 'Terminé'),
+        ('failed', 'Échec'),
+    ]
+
+    source = models.CharField(max_length=200)  # Chemin d'import : fonction(**params) -> (queryset, colonnes, nom)
+    params = models.JSONField(default=dict, blank=True)
+    format = models.CharField(max_length=10, default='csv')
+    columns = models.JSONField(default=list, blank=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='export_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    rows_written = models.PositiveIntegerField(default=0)
+    last_pk = models.BigIntegerField(null=True, blank=True)  # Curseur de reprise : dernière ligne écrite
+    bytes_written = models.BigIntegerField(default=0)  # Taille du fichier validée avec le curseur
+    file = models.FileField(upload_to='exports/', blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Export"
+        verbose_name_plural = "Exports"
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.source} ({self.status})"
+
+    @property
+    def progress(self):
+        """Pourcentage écrit (0 tant que le total n'est pas connu)."""
+        if self.status == 'done':
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(99, self.rows_written * 100 // self.total_rows)
+
 # === Modèle ProductModeration ===
 class ProductModeration(models.Model):
     STATUS_CHOICES = [
@@ -277,13 +557,19 @@ class Cart(models.Model):
     def __str__(self):
         return f"Panier de {self.user.username}"
 
+    @property
+    def summary(self):
+        # Une requête (ou aucune, en cache) au lieu d'un parcours de self.items.all()
+        from .carts import cached
+        return cached(self.user_id)
+
     @property
     def total_items(self):
-        return sum(item.quantity for item in self.items.all())
+        return self.summary.item_count
 
     @property
     def subtotal(self):
-        return sum(item.subtotal for item in self.items.all())
+        return self.summary.subtotal
 
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='items')
@@ -339,26 +625,35 @@ class Order(models.Model):
     shipped_at = models.DateTimeField(null=True, blank=True)
     delivered_at = models.DateTimeField(null=True, blank=True)
 
+    # Clé fournie par le client : un double envoi renvoie la même commande (store.orders)
+    idempotency_key = models.CharField(max_length=64, blank=True, default='', editable=False)
+
     class Meta:
         verbose_name = "Commande"
         verbose_name_plural = "Commandes"
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'idempotency_key'],
+                condition=~models.Q(idempotency_key=''),
+                name='store_order_unique_idempotency_key',
+            ),
+        ]
 
     def __str__(self):
         return f"Commande {self.order_number}"
 
     def save(self, *args, **kwargs):
-        if not self.order_number:
-            self.order_number = self.generate_order_number()
-        super().save(*args, **kwargs)
+        if self.order_number:
+            return super().save(*args, **kwargs)
+        # Numéro tiré d'une séquence permutée : collision seulement avec un ancien numéro
+        # aléatoire, réglée par la contrainte unique
+        from .allocators import next_order_number, save_unique
+        save_unique(self, 'order_number', next_order_number, lambda: super(Order, self).save(*args, **kwargs))
 
     def generate_order_number(self):
-        import random
-        import string
-        while True:
-            number = ''.join(random.choices(string.digits, k=8))
-            if not Order.objects.filter(order_number=number).exists():
-                return number
+        from .allocators import next_order_number
+        return next_order_number()
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
@@ -422,6 +717,26 @@ class Favorite(models.Model):
     def __str__(self):
         return f"{self.user.username} ♥ {self.product.name}"
 
+# === Modèle ProductRequest (demandes sur un produit) ===
+class ProductRequest(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='requests')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='product_requests')
+    email = models.EmailField(null=True, blank=True)
+    message = models.TextField(null=True, blank=True)
+    desired_quantity = models.PositiveIntegerField(default=1)
+    desired_date = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    is_notified = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name = "Demande de produit"
+        verbose_name_plural = "Demandes de produits"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Demande sur {self.product.name}"
+
 # === Modèle Notification ===
 class Notification(models.Model):
     TYPE_CHOICES = [
@@ -435,7 +750,7 @@ class Notification(models.Model):
     ]
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
-    type = models.CharField(max_length=20, choices=TYPE_CHOICES, default='general')
+    type = models.CharField(max_length=50, choices=TYPE_CHOICES, default='general')
     title = models.CharField(max_length=255)
     message = models.TextField()
     is_read = models.BooleanField(default=False)
@@ -451,4 +766,17 @@ class Notification(models.Model):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"Notification pour {self.user.username}: {self.title}"
\ No newline at end of file
+        return f"Notification pour {self.user.username}: {self.title}"
+
+# === Modèle NotificationCounter (non lues par utilisateur) ===
+class NotificationCounter(models.Model):
+    """Notifications non lues d'un utilisateur, tenu à jour par store.notifications (les consumers ne comptent plus)."""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='notification_counter')
+    unread = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Compteur de notifications"
+        verbose_name_plural = "Compteurs de notifications"
+
+    def __str__(self):
+        return f"{self.user_id} : {self.unread} non lue(s)"
@@ -0,0 +1,136 @@
+# store/notifications.py - Envoi groupé des notifications : un INSERT, un lot d'envois WebSocket,
+# et compteurs de non lues (NotificationCounter) tenus à jour sans COUNT
+
+import asyncio
+import logging
+from collections import Counter
+
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+
+from .models import Notification, NotificationCounter
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPE = 'send_notification'  # Méthode des NotificationConsumer (admin_panel, store)
+
+
+def group_name(user_id):
+    return f'user_{user_id}'
+
+
+def build(recipient, message, notification_type='general', title='', related_object_id=None,
+          action_url='', action_text=''):
+    """Notification non enregistrée pour `recipient` (utilisateur ou id) ; voir dispatch()."""
+    notification = Notification(
+        user_id=getattr(recipient, 'pk', recipient),
+        type=notification_type,
+        title=(title or message)[:255],
+        message=message,
+        action_url=action_url,
+        action_text=action_text,
+    )
+    notification.event = {
+        'type': EVENT_TYPE,
+        'message': message,
+        'notification_type': notification_type,
+        'related_object_id': related_object_id,
+    }
+    return notification
+
+
+def dispatch(notifications):
+    """Un INSERT pour les notifications, un UPDATE pour les compteurs ; les événements partent après le commit."""
+    notifications = [n for n in notifications if n.user_id is not None]
+    if not notifications:
+        return []
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(notifications)
+        unread = add_unread(Counter(n.user_id for n in notifications))
+    # Le compteur voyage avec l'événement : les consumers n'ont rien à relire
+    events = [(group_name(n.user_id), dict(n.event, unread_count=unread[n.user_id])) for n in notifications]
+    transaction.on_commit(lambda: push(events))
+    return created
+
+
+def notify(recipients, message, **options):
+    """Même message pour plusieurs destinataires (doublons et None ignorés) ; options de build()."""
+    user_ids = dict.fromkeys(getattr(r, 'pk', r) for r in recipients if r is not None)
+    return dispatch([build(user_id, message, **options) for user_id in user_ids])
+
+
+# === Compteurs de non lues ===
+
+def add_unread(deltas):
+    """deltas : {user_id: n} -> lignes créées si besoin, un UPDATE ; renvoie {user_id: non lues}."""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return {}
+    with transaction.atomic():
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=user_id) for user_id in deltas], ignore_conflicts=True
+        )
+        counters = NotificationCounter.objects.filter(pk__in=deltas)
+        counters.update(unread=F('unread') + Case(
+            *[When(pk=user_id, then=Value(delta)) for user_id, delta in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+        return dict(counters.values_list('pk', 'unread'))
+
+
+def unread_count(user):
+    """Non lues de `user` (utilisateur ou id) : lecture d'une ligne par clé primaire."""
+    user_id = getattr(user, 'pk', user)
+    return NotificationCounter.objects.filter(pk=user_id).values_list('unread', flat=True).first() or 0
+
+
+def mark_all_read(user):
+    """Marque toutes les notifications de `user` comme lues et remet son compteur à zéro."""
+    user_id = getattr(user, 'pk', user)
+    with transaction.atomic():
+        Notification.objects.filter(user_id=user_id, is_read=False).update(is_read=True)
+        NotificationCounter.objects.filter(pk=user_id).update(unread=0)
+
+
+def recount():
+    """Recalcule tous les compteurs depuis les notifications (écarts dus aux écritures directes) ; renvoie le nombre de lignes."""
+    rows = (
+        Notification.objects.filter(is_read=False)
+        .values('user_id')
+        .annotate(unread=Count('pk'))
+        .order_by()
+    )
+    with transaction.atomic():
+        NotificationCounter.objects.all().delete()
+        counters = NotificationCounter.objects.bulk_create(
+            (NotificationCounter(user_id=row['user_id'], unread=row['unread']) for row in rows.iterator()),
+            batch_size=5000,
+        )
+    return len(counters)
+
+
+def push(events):
+    """Envoie [(groupe, événement)] en un seul passage par la boucle asyncio.
+
+    Best effort : la notification est déjà en base, l'utilisateur la verra au
+    prochain chargement si la couche WebSocket est indisponible.
+    """
+    if not events:
+        return
+    try:
+        from channels.layers import get_channel_layer
+    except ImportError:
+        return
+    try:
+        layer = get_channel_layer()
+        if layer is None:
+            return
+
+        async def send_all():
+            await asyncio.gather(*(layer.group_send(group, event) for group, event in events))
+
+        async_to_sync(send_all)()
+    except Exception:
+        logger.exception("Événements WebSocket de %d notification(s) non envoyés", len(events))
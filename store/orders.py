@@ -0,0 +1,145 @@
+# store/orders.py - Passage de commande : une transaction courte, écritures groupées, clé d'idempotence
+
+import logging
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+
+from . import allocators, carts, notifications, reservations
+from .models import CartItem, Order, OrderItem
+from .reservations import OutOfStock, ReservationExpired  # noqa: F401 (levées par place_order)
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_LENGTH = 64
+
+# Envoyé dans la transaction de la commande : bulk_create n'envoie pas post_save
+order_placed = Signal()  # order, items
+
+
+class EmptyCart(ValueError):
+    """Aucun article à commander."""
+
+
+def _cart_lines(user):
+    """[(product_id, variant_id, seller_id, quantité, prix unitaire)] en une requête."""
+    rows = CartItem.objects.filter(cart__user=user).annotate(
+        line_unit_price=Coalesce('variant__price', 'product__price'),
+    ).order_by('added_at', 'pk').values_list(
+        'product_id', 'variant_id', 'product__seller_id', 'quantity', 'line_unit_price',
+        'product__is_active', 'product__status',
+    )
+    lines = []
+    for product_id, variant_id, seller_id, quantity, unit_price, is_active, status in rows:
+        if not is_active or status != 'active':
+            raise OutOfStock(product_id, variant_id)  # Retiré du catalogue depuis l'ajout
+        lines.append((product_id, variant_id, seller_id, quantity, unit_price))
+    return lines
+
+
+def _existing(user, key):
+    return Order.objects.filter(user=user, idempotency_key=key).first() if key else None
+
+
+def place_order(user, idempotency_key='', shipping_cost=Decimal('0.00')):
+    """Transforme le panier de `user` en commande ; renvoie (order, created).
+
+    Avec la même `idempotency_key`, un double envoi ou une nouvelle tentative
+    renvoie la commande déjà créée (created=False). Lève EmptyCart, OutOfStock ou
+    ReservationExpired : rien n'est alors écrit.
+    """
+    key = (idempotency_key or '')[:IDEMPOTENCY_KEY_LENGTH]
+    order = _existing(user, key)
+    if order is not None:
+        return order, False
+    # Lecture hors transaction : seules les écritures gardent les verrous
+    lines = _cart_lines(user)
+    if not lines:
+        raise EmptyCart("Votre panier est vide")
+    # Numéros réservés et validés avant la transaction : une commande annulée ne les rend pas
+    allocators.prepare_order_numbers()
+    try:
+        with transaction.atomic():
+            order = _create(user, key, lines, shipping_cost)
+    except IntegrityError:
+        # Envoi concurrent avec la même clé : la contrainte unique a tranché
+        order = _existing(user, key)
+        if order is None:
+            raise
+        return order, False
+    return order, True
+
+
+def _create(user, key, lines, shipping_cost):
+    subtotal = sum((quantity * unit_price for _, _, _, quantity, unit_price in lines), Decimal('0'))
+    order = Order(
+        user=user,
+        idempotency_key=key,
+        subtotal=subtotal,
+        shipping_cost=shipping_cost,
+        total=subtotal + shipping_cost,
+    )
+    order.save()
+    items = OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order, product_id=product_id, variant_id=variant_id, seller_id=seller_id,
+            quantity=quantity, unit_price=unit_price, total_price=quantity * unit_price,
+        )
+        for product_id, variant_id, seller_id, quantity, unit_price in lines
+    ])
+
+    totals = {}
+    for product_id, variant_id, _, quantity, _ in lines:
+        totals[(product_id, variant_id)] = totals.get((product_id, variant_id), 0) + quantity
+    _take_stock(user, totals)
+    carts.clear(user.pk)
+    order_placed.send(sender=Order, order=order, items=items)
+
+    sellers = sorted({seller_id for _, _, seller_id, _, _ in lines})
+    transaction.on_commit(lambda: notify_placed(order, sellers, len(lines)))
+    return order
+
+
+def _take_stock(user, totals):
+    """Confirme les réservations du panier, décrémente le reste ; tout ou rien."""
+    held = list(
+        reservations.owned_by(user).filter(release_token='')
+        .values_list('pk', 'product_id', 'variant_id', 'quantity')
+    )
+    confirmable = [
+        pk for pk, product_id, variant_id, quantity in held
+        if quantity <= totals.get((product_id, variant_id), 0)
+    ]
+    # Les autres réservations (article retiré du panier, quantité baissée) sont rendues
+    reservations.release(reservations.owned_by(user).exclude(pk__in=confirmable))
+    confirmed = reservations.confirm(confirmable) if confirmable else {}
+    remaining = {
+        key: quantity - confirmed.get(key, 0)
+        for key, quantity in totals.items() if quantity > confirmed.get(key, 0)
+    }
+    if remaining:
+        reservations.take_many(remaining)
+
+
+def notify_placed(order, seller_ids, line_count):
+    """Notifications de l'acheteur et des vendeurs, écrites après le commit."""
+    try:
+        notifications.dispatch([
+            notifications.build(
+                order.user_id, f"Votre commande de {line_count} article(s) a bien été enregistrée.",
+                notification_type='order_placed', title=f"Commande {order.order_number} enregistrée",
+                related_object_id=order.pk,
+            ),
+        ] + [
+            notifications.build(
+                seller_id, "Une commande contient un ou plusieurs de vos produits.",
+                notification_type='order_placed', title=f"Nouvelle commande {order.order_number}",
+                related_object_id=order.pk,
+            )
+            for seller_id in seller_ids if seller_id != order.user_id
+        ])
+    except Exception:
+        # La commande est validée : une notification manquée ne doit pas la faire échouer
+        logger.exception("Notifications de la commande %s non envoyées", order.pk)
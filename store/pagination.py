@@ -0,0 +1,169 @@
+# store/pagination.py - Pagination par curseur (keyset) sur (clé de tri, id)
+
+import base64
+import binascii
+import datetime
+import json
+from decimal import Decimal
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _pack(value):
+    # Types restitués à l'identique (DjangoJSONEncoder tronque les microsecondes)
+    if isinstance(value, datetime.datetime):
+        return ['dt', value.isoformat()]
+    if isinstance(value, datetime.date):
+        return ['d', value.isoformat()]
+    if isinstance(value, Decimal):
+        return ['dec', str(value)]
+    return value
+
+
+def _unpack(value):
+    if isinstance(value, list):
+        kind, raw = value
+        if kind == 'dt':
+            return parse_datetime(raw)
+        if kind == 'd':
+            return parse_date(raw)
+        if kind == 'dec':
+            return Decimal(raw)
+        raise InvalidCursor(kind)
+    return value
+
+
+class CursorPage:
+    """Page de résultats ; interface proche de django.core.paginator.Page."""
+
+    def __init__(self, paginator, object_list, has_next, has_previous):
+        self.paginator = paginator
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return self.paginator.encode(self.object_list[-1], 'n')
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return self.paginator.encode(self.object_list[0], 'p')
+        return None
+
+
+class CursorPaginator:
+    """Pagination keyset : chaque page est un WHERE (clé, id) > curseur LIMIT n.
+
+    Le coût d'une page ne dépend pas de sa position, contrairement à OFFSET. `ordering`
+    est une liste de champs (ou d'annotations) non nuls, préfixés de '-' pour un tri
+    décroissant ; la clé primaire est ajoutée pour départager les ex æquo. Le total n'est
+    calculé que si le gabarit lit `paginator.count`, ou fourni (estimation) par l'appelant.
+    """
+
+    def __init__(self, queryset, per_page, ordering=None, count=None):
+        ordering = list(ordering or queryset.query.order_by or queryset.model._meta.ordering)
+        if any(not isinstance(field, str) or '__' in field for field in ordering):
+            raise ValueError("Le tri par curseur n'accepte que des noms de champs ou d'annotations")
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            ordering.append('-pk' if ordering and ordering[-1].startswith('-') else 'pk')
+        self.ordering = ordering
+        self.per_page = int(per_page)
+        self.queryset = queryset.order_by(*ordering)
+        if count is not None:
+            self.count = count
+
+    @cached_property
+    def count(self):
+        return self.queryset.count()
+
+    @cached_property
+    def _signature(self):
+        return ','.join(self.ordering)
+
+    def _key(self, obj):
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    def encode(self, obj, direction):
+        payload = {'o': self._signature, 'd': direction, 'k': [_pack(v) for v in self._key(obj)]}
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            values = [_unpack(v) for v in payload['k']]
+            direction = payload['d']
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise InvalidCursor(cursor)
+        if payload.get('o') != self._signature or len(values) != len(self.ordering) or direction not in ('n', 'p'):
+            raise InvalidCursor(cursor)
+        return values, direction
+
+    def _beyond(self, values, backwards):
+        """Q() des lignes situées après (ou avant) la clé `values` dans l'ordre de tri."""
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            descending = field.startswith('-') != backwards
+            clause = Q(**{f"{field.lstrip('-')}__{'lt' if descending else 'gt'}": values[i]})
+            for previous, value in zip(self.ordering[:i], values):
+                clause &= Q(**{previous.lstrip('-'): value})
+            condition |= clause
+        # Borne sur la première clé : garde la requête indexable malgré le OR
+        first = self.ordering[0]
+        lead = 'lte' if first.startswith('-') != backwards else 'gte'
+        return Q(**{f"{first.lstrip('-')}__{lead}": values[0]}) & condition
+
+    def page(self, cursor=None):
+        """Page suivant (ou précédant) `cursor` ; première page si `cursor` est vide."""
+        queryset = self.queryset
+        direction = 'n'
+        if cursor:
+            values, direction = self.decode(cursor)
+            queryset = queryset.filter(self._beyond(values, backwards=direction == 'p'))
+            if direction == 'p':
+                reverse = [field[1:] if field.startswith('-') else '-' + field for field in self.ordering]
+                queryset = queryset.order_by(*reverse)
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == 'p':
+            rows.reverse()
+            return CursorPage(self, rows, has_next=True, has_previous=has_more)
+        return CursorPage(self, rows, has_next=has_more, has_previous=bool(cursor))
+
+    def get_page(self, cursor=None):
+        """Comme page(), mais revient à la première page si le curseur est invalide."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
@@ -0,0 +1,87 @@
+# store/ratings.py - Agrégats de notes dénormalisés sur Product (somme, nombre, histogramme)
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+
+STARS = range(1, 6)
+
+
+def star_field(star):
+    return f'rating_{star}_count'
+
+
+def contribution(review):
+    """(product_id, note) compté dans les agrégats, ou None si l'avis n'est pas approuvé."""
+    if review is None or not review['is_approved']:
+        return None
+    return review['product_id'], review['rating']
+
+
+def apply_change(before, after):
+    """Répercute le passage d'un avis de `before` à `after` (dicts ou None) en UPDATE atomiques."""
+    from .models import Product
+
+    old, new = contribution(before), contribution(after)
+    if old == new:
+        return
+    with transaction.atomic():
+        for change, sign in ((old, -1), (new, 1)):
+            if change is None:
+                continue
+            product_id, rating = change
+            rating_sum = F('rating_sum') + sign * rating
+            rating_count = F('rating_count') + sign
+            Product.objects.filter(pk=product_id).update(
+                rating_sum=rating_sum,
+                rating_count=rating_count,
+                # Évalué sur les valeurs avant UPDATE, comme les deux colonnes ci-dessus
+                rating_average=Case(
+                    When(rating_count__gt=-sign, then=Cast(rating_sum, FloatField()) / rating_count),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                ),
+                **{star_field(rating): F(star_field(rating)) + sign},
+            )
+
+
+def aggregates(queryset):
+    """Agrégats recalculés depuis les avis approuvés : {product_id: {champ: valeur}}."""
+    from .models import Review
+
+    annotations = {star_field(star): Count('pk', filter=Q(rating=star)) for star in STARS}
+    rows = (
+        Review.objects.filter(product__in=queryset, is_approved=True)
+        .values('product_id')
+        .annotate(rating_sum=Sum('rating'), rating_count=Count('pk'), **annotations)
+        .order_by()
+    )
+    result = {}
+    for row in rows:
+        product_id = row.pop('product_id')
+        row['rating_average'] = row['rating_sum'] / row['rating_count']
+        result[product_id] = row
+    return result
+
+
+def rebuild(queryset, chunk_size=1000):
+    """Recalcule les agrégats de `queryset` par lots ; renvoie le nombre de produits corrigés."""
+    fields = ['rating_sum', 'rating_count', 'rating_average'] + [star_field(star) for star in STARS]
+    empty = dict.fromkeys(fields, 0)
+    empty['rating_average'] = 0.0
+    fixed, last_pk = 0, 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk).order_by('pk').only('pk', *fields)[:chunk_size])
+        if not chunk:
+            return fixed
+        last_pk = chunk[-1].pk
+        expected = aggregates(queryset.model.objects.filter(pk__in=[p.pk for p in chunk]))
+        stale = []
+        for product in chunk:
+            values = expected.get(product.pk, empty)
+            if any(getattr(product, field) != values[field] for field in fields):
+                for field in fields:
+                    setattr(product, field, values[field])
+                stale.append(product)
+        queryset.model.objects.bulk_update(stale, fields)
+        fixed += len(stale)
@@ -0,0 +1,226 @@
+# store/renditions.py - Déclinaisons redimensionnées (WebP + format d'origine) des images
+
+import hashlib
+import io
+import logging
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from . import cache, jobs
+from .models import ImageRendition
+
+logger = logging.getLogger(__name__)
+
+# Champs image déclinés, par modèle (utilisé par la commande rebuild_renditions)
+SOURCES = {
+    'store.Product': ('image1', 'image2', 'image3', 'image4', 'image5'),
+    'store.ProductImage': ('image',),
+    'store.ProductVariant': ('image',),
+    'store.Category': ('image',),
+    'accounts.SellerProfile': ('profile_picture', 'business_logo'),
+}
+
+PRODUCT_IMAGE_FIELDS = SOURCES['store.Product']
+
+_PIL_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG', 'png': 'PNG'}
+
+
+def widths():
+    return tuple(getattr(settings, 'IMAGE_RENDITION_WIDTHS', (320, 640, 1024)))
+
+
+def _source_name(image):
+    """Nom de stockage d'un FieldFile ou d'une chaîne (cartes produit)."""
+    return getattr(image, 'name', image) or ''
+
+
+def _storage(image):
+    return getattr(image, 'storage', None) or default_storage
+
+
+def url(image):
+    """URL de l'original (champ image ou nom de stockage)."""
+    source = _source_name(image)
+    return _storage(image).url(source) if source else ''
+
+
+def rendition_name(source, width, fmt, content):
+    """products/robe.jpg -> products/robe.640w.<empreinte>.webp
+
+    L'empreinte porte sur le contenu : un nom ne désigne jamais deux fichiers
+    différents, les déclinaisons peuvent donc être servies avec un cache long.
+    """
+    directory, filename = posixpath.split(source)
+    stem = filename.rsplit('.', 1)[0]
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    extension = 'jpg' if fmt == 'jpeg' else fmt
+    return posixpath.join(directory, f'{stem}.{width}w.{digest}.{extension}')
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    options = {'quality': getattr(settings, 'IMAGE_RENDITION_QUALITY', 80)}
+    if fmt == 'jpeg':
+        options.update(optimize=True, progressive=True)
+    elif fmt == 'webp':
+        options.update(method=4)
+    elif fmt == 'png':
+        options = {'optimize': True}
+    image.save(buffer, _PIL_FORMATS[fmt], **options)
+    return buffer.getvalue()
+
+
+def _render(data):
+    """[(format, largeur, hauteur, octets)] pour une image source."""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as opened:
+        image = ImageOps.exif_transpose(opened)
+        has_alpha = image.mode in ('RGBA', 'LA', 'P') and (
+            image.mode != 'P' or 'transparency' in image.info
+        )
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    # Jamais d'agrandissement ; une image plus petite que la plus petite largeur
+    # garde sa taille (la déclinaison WebP reste plus légère)
+    targets = [w for w in widths() if w < image.width] or [image.width]
+    fallback = 'png' if has_alpha else 'jpeg'
+    rendered = []
+    for width in targets:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in ('webp', fallback):
+            rendered.append((fmt, width, height, _encode(resized, fmt)))
+    return rendered
+
+
+def build(image):
+    """Crée (ou recrée) les déclinaisons d'une image ; renvoie les ImageRendition.
+
+    Lève l'erreur de Pillow si l'image est illisible.
+    """
+    source = _source_name(image)
+    if not source:
+        return []
+    storage = _storage(image)
+    with storage.open(source, 'rb') as handle:
+        rendered = _render(handle.read())
+
+    renditions = []
+    for fmt, width, height, content in rendered:
+        name = rendition_name(source, width, fmt, content)
+        if not storage.exists(name):
+            name = storage.save(name, ContentFile(content))
+        renditions.append(ImageRendition(source=source, format=fmt, width=width, height=height, name=name))
+
+    with transaction.atomic():
+        stale = set(
+            ImageRendition.objects.filter(source=source).values_list('name', flat=True)
+        ) - {r.name for r in renditions}
+        ImageRendition.objects.filter(source=source).delete()
+        ImageRendition.objects.bulk_create(renditions)
+        cache.bump_on_commit(ImageRendition, source)
+    for name in stale:
+        storage.delete(name)
+    return renditions
+
+
+def generate(image):
+    """build() qui journalise une image illisible au lieu de lever (commande de rattrapage)."""
+    try:
+        return build(image)
+    except Exception:
+        logger.warning("Déclinaisons impossibles pour %s", _source_name(image), exc_info=True)
+        return []
+
+
+def enqueue(instance, fields, user=None):
+    """Confie au pool de store.jobs les champs image remplis de `instance` ; renvoie les jobs."""
+    return [
+        jobs.enqueue('renditions', instance, field, user=user)
+        for field in fields if getattr(instance, field)
+    ]
+
+
+@jobs.handler('renditions')
+def _process(instance, field):
+    image = getattr(instance, field)
+    created = build(image)
+    return {
+        'url': url(image),
+        'renditions': len(created),
+        'srcset': srcset(image),
+        'webp_srcset': srcset(image, 'webp'),
+    }
+
+
+def delete(image):
+    """Supprime les déclinaisons d'une image (à appeler avant de supprimer l'original)."""
+    source = _source_name(image)
+    if not source:
+        return
+    storage = _storage(image)
+    names = list(ImageRendition.objects.filter(source=source).values_list('name', flat=True))
+    ImageRendition.objects.filter(source=source).delete()
+    cache.bump_on_commit(ImageRendition, source)
+    for name in names:
+        storage.delete(name)
+
+
+def _load(sources):
+    found = {source: [] for source in sources}
+    rows = (
+        ImageRendition.objects.filter(source__in=sources)
+        .order_by('format', 'width').values_list('source', 'format', 'width', 'name')
+    )
+    for source, fmt, width, name in rows:
+        found[source].append((fmt, width, name))
+    return found
+
+
+def lookup(images):
+    """{source: [(format, largeur, nom)]} des images données ; une requête pour celles absentes du cache."""
+    sources = list(dict.fromkeys(filter(None, (_source_name(image) for image in images))))
+    if not sources:
+        return {}
+    return cache.get_or_set_many(
+        {source: (f'renditions:{source}', [(ImageRendition, source)]) for source in sources},
+        _load, timeout=86400,
+    )
+
+
+def prefetch(images):
+    """Charge d'un coup les déclinaisons des images d'une page : les srcset qui suivent restent en mémoire."""
+    lookup(images)
+
+
+def _srcset(image, found, fmt):
+    storage = _storage(image)
+    wanted = (fmt,) if fmt else ('jpeg', 'png')
+    return ', '.join(
+        f'{storage.url(name)} {width}w' for rendition_fmt, width, name in found if rendition_fmt in wanted
+    )
+
+
+def srcset(image, fmt=None):
+    """Valeur d'attribut srcset ("url 320w, url 640w") ; '' sans déclinaison.
+
+    `fmt` : 'webp', ou None pour le format de repli (JPEG/PNG).
+    """
+    source = _source_name(image)
+    if not source:
+        return ''
+    return _srcset(image, lookup([image])[source], fmt)
+
+
+def srcsets(image):
+    """(srcset WebP, srcset de repli) d'une image, en une seule lecture."""
+    source = _source_name(image)
+    if not source:
+        return '', ''
+    found = lookup([image])[source]
+    return _srcset(image, found, 'webp'), _srcset(image, found, None)
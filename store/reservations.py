@@ -0,0 +1,241 @@
+# store/reservations.py - Réservations de stock et décréments atomiques (pas de survente)
+
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from . import cache, facets
+from .models import Product, ProductVariant, StockReservation
+
+DEFAULT_HOLD_MINUTES = 15
+
+
+class OutOfStock(ValueError):
+    """Stock disponible insuffisant pour l'article demandé."""
+
+    def __init__(self, product_id, variant_id=None):
+        self.product_id = product_id
+        self.variant_id = variant_id
+        super().__init__(f"Stock insuffisant pour le produit {product_id}")
+
+
+class ReservationExpired(ValueError):
+    """Réservation expirée (ou libérée) avant la confirmation de la commande."""
+
+
+def hold_minutes():
+    return getattr(settings, 'STOCK_HOLD_MINUTES', DEFAULT_HOLD_MINUTES)
+
+
+def _pk(obj):
+    return getattr(obj, 'pk', obj)
+
+
+def _target(product_id, variant_id):
+    """Ligne portant le stock de l'article : la variante si elle existe, sinon le produit."""
+    if variant_id:
+        return ProductVariant.objects.filter(pk=variant_id)
+    return Product.objects.filter(pk=product_id)
+
+
+def owned_by(user=None, session_key=''):
+    """Réservations d'un panier (utilisateur connecté ou session anonyme)."""
+    if user is not None and user.is_authenticated:
+        return StockReservation.objects.filter(user=user)
+    if not session_key:
+        return StockReservation.objects.none()
+    return StockReservation.objects.filter(user=None, session_key=session_key)
+
+
+# === Réservation ===
+
+def hold(product, quantity, user=None, session_key='', variant=None, minutes=None):
+    """Retient `quantity` unités pour ce panier pendant `minutes` ; lève OutOfStock.
+
+    Remplace la réservation précédente du panier sur le même article : en cas
+    d'échec, celle-ci est conservée. Renvoie None si `quantity` vaut 0.
+    """
+    product_id, variant_id = _pk(product), _pk(variant)
+    with transaction.atomic():
+        release(owned_by(user, session_key).filter(product_id=product_id, variant_id=variant_id))
+        if quantity <= 0:
+            return None
+        # stock - reserved >= quantity, vérifié et réservé dans le même UPDATE
+        taken = _target(product_id, variant_id).filter(
+            stock__gte=F('reserved') + quantity
+        ).update(reserved=F('reserved') + quantity)
+        if not taken:
+            raise OutOfStock(product_id, variant_id)
+        return StockReservation.objects.create(
+            product_id=product_id,
+            variant_id=variant_id,
+            user=user if user is not None and user.is_authenticated else None,
+            session_key='' if user is not None and user.is_authenticated else session_key,
+            quantity=quantity,
+            expires_at=timezone.now() + timedelta(minutes=minutes or hold_minutes()),
+        )
+
+
+def _per_row(amounts):
+    """CASE pk WHEN ... THEN n : une quantité par ligne dans un seul UPDATE."""
+    return Case(
+        *[When(pk=pk, then=Value(amount)) for pk, amount in amounts.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _split(totals):
+    """{(product_id, variant_id): n} -> ({product_id: n}, {variant_id: n})"""
+    products, variants = {}, {}
+    for (product_id, variant_id), quantity in totals.items():
+        if variant_id:
+            variants[variant_id] = variants.get(variant_id, 0) + quantity
+        else:
+            products[product_id] = products.get(product_id, 0) + quantity
+    return products, variants
+
+
+def _subtract(model, totals, field):
+    """field = max(field - totals[pk], 0) pour chaque pk, en un seul UPDATE."""
+    if not totals:
+        return
+    model.objects.filter(pk__in=totals).update(**{field: Greatest(F(field) - _per_row(totals), 0)})
+
+
+def release(queryset):
+    """Libère les réservations de `queryset` ; renvoie leur nombre.
+
+    Les lignes sont d'abord marquées par un jeton (UPDATE conditionnel) : une
+    réservation libérée, balayée ou confirmée en parallèle n'est comptée qu'une fois.
+    """
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        claimed = queryset.filter(release_token='').update(release_token=token)
+        if not claimed:
+            return 0
+        mine = StockReservation.objects.filter(release_token=token)
+        products, variants = _split({
+            (product_id, variant_id): total for product_id, variant_id, total
+            in mine.values_list('product_id', 'variant_id').annotate(total=Sum('quantity'))
+        })
+        _subtract(Product, products, 'reserved')
+        _subtract(ProductVariant, variants, 'reserved')
+        mine.delete()
+    return claimed
+
+
+def release_for(user=None, session_key=''):
+    return release(owned_by(user, session_key))
+
+
+def sweep(now=None, batch_size=1000):
+    """Libère en masse les réservations expirées ; renvoie leur nombre."""
+    now = now or timezone.now()
+    released = 0
+    while True:
+        ids = list(
+            StockReservation.objects.filter(expires_at__lt=now, release_token='')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return released
+        released += release(StockReservation.objects.filter(pk__in=ids, expires_at__lt=now))
+        if len(ids) < batch_size:
+            return released
+
+
+# === Confirmation ===
+
+def _decrement(totals, held):
+    """stock -= n sous condition, un UPDATE par table (produits, variantes) ; lève OutOfStock.
+
+    `held` : les unités sont déjà comptées dans `reserved` (confirmation), sinon elles
+    doivent rester disponibles en plus des unités retenues par d'autres paniers.
+    """
+    products, variants = _split(totals)
+    for model, amounts in ((Product, products), (ProductVariant, variants)):
+        if not amounts:
+            continue
+        amount = _per_row(amounts)
+        if held:
+            rows = model.objects.filter(pk__in=amounts, stock__gte=amount)
+            changes = {'stock': F('stock') - amount, 'reserved': Greatest(F('reserved') - amount, 0)}
+        else:
+            rows = model.objects.filter(pk__in=amounts, stock__gte=F('reserved') + amount)
+            changes = {'stock': F('stock') - amount}
+        # Tout ou rien : une ligne manquante annule la transaction de l'appelant
+        if rows.update(**changes) != len(amounts):
+            raise _shortage(totals, model, amounts, held)
+
+
+def _shortage(totals, model, amounts, held):
+    """OutOfStock pour le premier article dont le stock ne suffit pas."""
+    for pk, stock, reserved in model.objects.filter(pk__in=amounts).values_list('pk', 'stock', 'reserved'):
+        if stock - (0 if held else reserved) < amounts[pk]:
+            break
+    else:
+        pk = next(iter(amounts))
+    if model is Product:
+        return OutOfStock(pk)
+    product_id = next((p for p, v in totals if v == pk), None)
+    return OutOfStock(product_id, pk)
+
+
+def _apply(totals, held=True):
+    product_ids = {product_id for product_id, _ in totals}
+    # Un produit épuisé quitte le catalogue actif : compteurs de facettes et cache suivent
+    with facets.track(Product.objects.filter(pk__in=product_ids)):
+        _decrement(totals, held)
+    for product_id in product_ids:
+        cache.bump_on_commit(Product, product_id)
+
+
+def confirm(reservations):
+    """Transforme des réservations en baisses de stock ; renvoie {(product_id, variant_id): quantité}.
+
+    Tout ou rien : lève ReservationExpired si l'une a été libérée entre-temps,
+    OutOfStock si le stock a été réduit sous la quantité réservée.
+    """
+    ids = [_pk(reservation) for reservation in reservations]
+    with transaction.atomic():
+        pending = StockReservation.objects.filter(pk__in=ids, release_token='')
+        rows = list(pending.values_list('product_id', 'variant_id', 'quantity'))
+        # La suppression réclame les lignes : un balayage concurrent ne les compte plus
+        deleted, _ = pending.delete()
+        if len(rows) != len(ids) or deleted != len(ids):
+            raise ReservationExpired("Réservation expirée, merci de valider à nouveau le panier")
+        totals = {}
+        for product_id, variant_id, quantity in rows:
+            totals[(product_id, variant_id)] = totals.get((product_id, variant_id), 0) + quantity
+        _apply(totals)
+    return totals
+
+
+def take(product, quantity, variant=None):
+    """Retire `quantity` unités sans réservation préalable, sans toucher aux unités retenues."""
+    take_many({(_pk(product), _pk(variant)): quantity})
+
+
+def take_many(totals):
+    """take() pour plusieurs articles {(product_id, variant_id): quantité}, tout ou rien."""
+    with transaction.atomic():
+        _apply(totals, held=False)
+
+
+def held(product, user=None, session_key='', variant=None):
+    """Unités que ce panier retient déjà sur l'article (elles restent à sa disposition)."""
+    return owned_by(user, session_key).filter(
+        product_id=_pk(product), variant_id=_pk(variant), release_token=''
+    ).aggregate(total=Sum('quantity'))['total'] or 0
+
+
+def available(product, variant=None):
+    """Unités encore réservables (lecture directe, sans verrou)."""
+    stock, reserved = _target(_pk(product), _pk(variant)).values_list('stock', 'reserved').get()
+    return max(stock - reserved, 0)
@@ -0,0 +1,246 @@
+# store/search.py - Index de recherche plein texte du catalogue
+
+import re
+import unicodedata
+
+from django.db import connection, transaction
+from django.db.models import (
+    BooleanField, Case, F, FloatField, Func, IntegerField, Max, OuterRef, Q, Subquery, Sum, Value, When,
+)
+
+FTS_TABLE = 'store_product_fts'
+
+# Poids de chaque champ dans le classement (nom > marque > tags > description)
+FIELD_WEIGHTS = {
+    'name': 10,
+    'brand': 5,
+    'tags': 4,
+    'description': 1,
+}
+
+MIN_PREFIX_LENGTH = 2
+
+STOPWORDS = {
+    'a', 'au', 'aux', 'avec', 'ce', 'ces', 'dans', 'de', 'des', 'du', 'en',
+    'et', 'la', 'le', 'les', 'l', 'd', 'ou', 'par', 'pour', 'sur', 'un', 'une',
+}
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_fts_available = None
+
+
+def normalize(text):
+    """Met en minuscules et retire les accents (é -> e, ç -> c, œ -> oe)."""
+    if not text:
+        return ''
+    text = text.lower().replace('œ', 'oe').replace('æ', 'ae')
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Découpe un texte normalisé en mots, sans les mots vides français."""
+    return [t for t in _TOKEN_RE.findall(normalize(text)) if t not in STOPWORDS]
+
+
+def query_terms(query):
+    """Termes de recherche utilisables en préfixe (au moins 2 caractères)."""
+    terms = []
+    for term in tokenize(query):
+        if len(term) >= MIN_PREFIX_LENGTH and term not in terms:
+            terms.append(term[:64])
+    return terms
+
+
+def fts_available():
+    """Vrai si la table FTS5 existe (SQLite compilé avec FTS5)."""
+    global _fts_available
+    if _fts_available is None:
+        if connection.vendor != 'sqlite':
+            _fts_available = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                    [FTS_TABLE]
+                )
+                _fts_available = cursor.fetchone() is not None
+    return _fts_available
+
+
+def _document(product):
+    return {
+        'name': normalize(product.name),
+        'brand': normalize(product.brand),
+        'tags': normalize(product.tags),
+        'description': normalize(product.description),
+    }
+
+
+# === Mise à jour de l'index ===
+
+def index_product(product):
+    """(Ré)indexe un produit dans l'index actif."""
+    if fts_available():
+        doc = _document(product)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [product.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}(rowid, name, brand, tags, description) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [product.pk, doc['name'], doc['brand'], doc['tags'], doc['description']]
+            )
+        return
+
+    from .models import SearchToken
+    SearchToken.objects.filter(product_id=product.pk).delete()
+    SearchToken.objects.bulk_create(_tokens_for(product))
+
+
+def remove_product(product_id):
+    """Retire un produit de l'index."""
+    if fts_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [product_id])
+        return
+
+    from .models import SearchToken
+    SearchToken.objects.filter(product_id=product_id).delete()
+
+
+def token_weights(document):
+    """{jeton: poids} d'un document normalisé ({champ: texte}, voir _document)."""
+    weights = {}
+    for field, text in document.items():
+        for token in tokenize(text):
+            token = token[:64]
+            weights[token] = weights.get(token, 0) + FIELD_WEIGHTS[field]
+    return weights
+
+
+def _tokens_for(product):
+    from .models import SearchToken
+
+    return [
+        SearchToken(product_id=product.pk, token=token, weight=weight)
+        for token, weight in token_weights(_document(product)).items()
+    ]
+
+
+def rebuild_index(queryset, chunk_size=2000):
+    """Reconstruit tout l'index par lots ; renvoie le nombre de produits indexés."""
+    from .models import SearchToken
+
+    fields = ['id', 'name', 'brand', 'tags', 'description']
+    total = 0
+    with transaction.atomic():
+        if fts_available():
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        else:
+            SearchToken.objects.all().delete()
+
+        batch = []
+        for product in queryset.only(*fields).iterator(chunk_size=chunk_size):
+            batch.append(product)
+            if len(batch) >= chunk_size:
+                _bulk_index(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            _bulk_index(batch)
+            total += len(batch)
+    return total
+
+
+def _bulk_index(products):
+    if fts_available():
+        rows = []
+        for product in products:
+            doc = _document(product)
+            rows.append((product.pk, doc['name'], doc['brand'], doc['tags'], doc['description']))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE}(rowid, name, brand, tags, description) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                rows
+            )
+        return
+
+    from .models import SearchToken
+    tokens = []
+    for product in products:
+        tokens.extend(_tokens_for(product))
+    SearchToken.objects.bulk_create(tokens, batch_size=5000)
+
+
+# === Recherche ===
+
+def _fts_match(terms):
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+class _Match(Func):
+    """`document MATCH requête` (FTS5), utilisable dans filter()."""
+    arg_joiner = ' MATCH '
+    template = '%(expressions)s'
+    output_field = BooleanField()
+
+
+def _token_matches(terms):
+    """Produits ayant tous les termes (en préfixe), avec leur score : product_id, score."""
+    from .models import SearchToken
+
+    any_term = Q()
+    per_term = {}
+    for i, term in enumerate(terms):
+        any_term |= Q(token__startswith=term)
+        per_term[f'term_{i}'] = Max(Case(
+            When(token__startswith=term, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+    return (
+        SearchToken.objects.filter(any_term)
+        .values('product_id')
+        .annotate(score=Sum('weight'), **per_term)
+        .filter(**{name: 1 for name in per_term})
+    )
+
+
+def search(queryset, query):
+    """Restreint `queryset` aux produits trouvés et l'annote avec `search_rank` (croissant = plus pertinent).
+
+    Tous les termes doivent correspondre (ET), chacun en préfixe. Le rang est
+    calculé dans la requête du catalogue : les filtres (catégorie, prix,
+    facettes) s'appliquent à tous les résultats, sans plafond préalable.
+    Avec FTS5, la table d'index est jointe une fois sur rowid : MATCH choisit
+    les lignes et bm25() les classe pendant le même parcours.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return queryset.none()
+
+    if fts_available():
+        document = F('search_document__document')
+        # isnull=False rend la jointure INNER : MATCH n'est pas accepté sur un LEFT JOIN
+        return queryset.filter(
+            _Match(document, Value(_fts_match(terms))), search_document__isnull=False,
+        ).annotate(search_rank=Func(
+            document, *(Value(float(w)) for w in FIELD_WEIGHTS.values()),
+            function='bm25', output_field=FloatField(),
+        ))
+
+    matches = _token_matches(terms)
+    score = matches.filter(product_id=OuterRef('pk')).values('score')
+    return queryset.filter(
+        pk__in=matches.values('product_id')
+    ).annotate(search_rank=-Subquery(score, output_field=IntegerField()))
+
+
+def ranked_ids(query, limit=None):
+    """Identifiants des produits correspondant à `query`, du plus pertinent au moins pertinent."""
+    from .models import Product
+
+    ids = search(Product.objects.all(), query).order_by('search_rank', 'pk').values_list('pk', flat=True)
+    return list(ids[:limit] if limit else ids)
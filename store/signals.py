@@ -1,23 +1,119 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from django.contrib.auth.models import User
-from .models import AIPreferences, Order, ProductRequest, OrderItem
-
-@receiver(post_save, sender=User)
-def create_ai_preferences(sender, instance, created, **kwargs):
-    if created:
-        AIPreferences.objects.create(user=instance)
+from .models import Cart, CartItem, Category, Favorite, Order, Product, ProductRequest, ProductVariant, Review
+from . import cache, carts, counters, facets, ratings, search
 
 @receiver(post_save, sender=Order)
 def update_product_sales(sender, instance, created, **kwargs):
     if created and instance.status == 'delivered':
-        for item in instance.items.all():
-            if item.product:
-                item.product.sales_count += item.quantity
-                item.product.save()
+        for product_id, quantity in instance.items.filter(product__isnull=False).values_list('product_id', 'quantity'):
+            counters.increment(product_id, 'sales_count', quantity)
 
 @receiver(post_save, sender=ProductRequest)
 def update_product_views(sender, instance, created, **kwargs):
     if created:
-        instance.product.views += 1
-        instance.product.save()
\ No newline at end of file
+        counters.increment(instance.product_id, 'views')
+
+@receiver(post_save, sender=Favorite)
+def count_favorite_added(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(instance.product_id, 'favorites_count')
+
+@receiver(post_delete, sender=Favorite)
+def count_favorite_removed(sender, instance, **kwargs):
+    counters.increment(instance.product_id, 'favorites_count', -1)
+
+# === Index de recherche ===
+
+@receiver(post_save, sender=Product)
+def index_product_for_search(sender, instance, update_fields=None, **kwargs):
+    # Les mises à jour de compteurs (vues, ventes...) ne touchent pas au texte indexé
+    if update_fields and not set(update_fields) & set(search.FIELD_WEIGHTS):
+        return
+    transaction.on_commit(lambda: search.index_product(instance))
+
+@receiver(post_delete, sender=Product)
+def remove_product_from_search(sender, instance, **kwargs):
+    product_id = instance.pk
+    transaction.on_commit(lambda: search.remove_product(product_id))
+
+# === Compteurs de facettes ===
+
+def _touches_facets(update_fields):
+    if not update_fields:
+        return True
+    tracked = {field.replace('_id', '') for field in facets.TRACKED_FIELDS}
+    return bool(set(update_fields) & tracked)
+
+@receiver(pre_save, sender=Product)
+def remember_facet_values(sender, instance, update_fields=None, **kwargs):
+    instance._facet_before = None
+    if instance.pk and _touches_facets(update_fields):
+        instance._facet_before = Product.objects.filter(pk=instance.pk).values(*facets.TRACKED_FIELDS).first()
+
+@receiver(post_save, sender=Product)
+def update_facet_counts(sender, instance, update_fields=None, **kwargs):
+    if not _touches_facets(update_fields):
+        return
+    before = getattr(instance, '_facet_before', None)
+    facets.apply_changes([before] if before else [], [facets.snapshot(instance)])
+
+@receiver(post_delete, sender=Product)
+def remove_facet_counts(sender, instance, **kwargs):
+    facets.apply_changes([facets.snapshot(instance)], [])
+
+# === Agrégats de notes ===
+
+REVIEW_FIELDS = ['product_id', 'rating', 'is_approved']
+
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, **kwargs):
+    instance._rating_before = None
+    if instance.pk:
+        instance._rating_before = Review.objects.filter(pk=instance.pk).values(*REVIEW_FIELDS).first()
+
+@receiver(post_save, sender=Review)
+def update_product_rating(sender, instance, **kwargs):
+    after = {field: getattr(instance, field) for field in REVIEW_FIELDS}
+    ratings.apply_change(getattr(instance, '_rating_before', None), after)
+
+@receiver(post_delete, sender=Review)
+def remove_product_rating(sender, instance, **kwargs):
+    before = {field: getattr(instance, field) for field in REVIEW_FIELDS}
+    ratings.apply_change(before, None)
+
+# === Invalidation du cache ===
+
+cache.watch(Product, ProductVariant, Category, Review)
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_reviewed_product(sender, instance, **kwargs):
+    # Les agrégats de notes sont écrits par UPDATE, sans post_save sur Product
+    cache.bump_on_commit(Product, instance.product_id)
+
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def bump_cart(sender, instance, **kwargs):
+    if carts.clearing():
+        return  # carts.clear() invalide une fois pour tout le panier
+    carts.invalidate(Cart.objects.filter(pk=instance.cart_id).values_list('user_id', flat=True).first())
+
+@receiver(post_save, sender=Product)
+def bump_carts_holding_product(sender, instance, **kwargs):
+    carts.invalidate_holding(product_id=instance.pk)
+
+@receiver(post_save, sender=ProductVariant)
+def bump_carts_holding_variant(sender, instance, **kwargs):
+    carts.invalidate_holding(variant_id=instance.pk)
+
+@receiver(post_delete, sender=Cart)
+def bump_deleted_cart(sender, instance, **kwargs):
+    carts.invalidate(instance.user_id)
+
+@receiver(user_logged_in)
+def merge_anonymous_cart(sender, request, user, **kwargs):
+    if request is not None:
+        carts.merge(request, user)
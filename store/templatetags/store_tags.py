@@ -1,14 +1,31 @@
 from django import template
 from django.forms import BaseForm
-from store.models import Favorite
+from store import favorites, renditions
 
 register = template.Library()
 
 @register.filter
 def is_favorite(product, user):
-    if not user.is_authenticated:
-        return False
-    return Favorite.objects.filter(user=user, product=product).exists()
+    # Une requête au plus par page (voir store.favorites.prefetch)
+    return favorites.is_favorite(user, getattr(product, 'pk', product))
+
+@register.simple_tag
+def srcset(image, fmt=None):
+    """{% srcset product.image1 'webp' as webp %} : déclinaisons "url 320w, url 640w"."""
+    return renditions.srcset(image, fmt)
+
+@register.inclusion_tag('store/partial_picture.html')
+def picture(image, alt='', css_class='', sizes='100vw'):
+    """<picture> avec source WebP et srcset du format d'origine ; `image` est un champ image ou un nom."""
+    webp, fallback = renditions.srcsets(image)
+    return {
+        'src': renditions.url(image),
+        'webp': webp,
+        'fallback': fallback,
+        'alt': alt,
+        'css_class': css_class,
+        'sizes': sizes,
+    }
 
 @register.filter
 def get_item(dictionary, key):
@@ -0,0 +1,163 @@
+import threading
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import allocators
+from .models import Category, Order, Product, Sequence
+
+User = get_user_model()
+
+
+class OrderNumberTest(TestCase):
+    def setUp(self):
+        allocators._blocks.clear()
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@example.com',
+            password='testpass123',
+            user_type='buyer'
+        )
+
+    def test_permutation_is_a_bijection(self):
+        """Compteurs distincts -> numéros distincts, sans suite visible"""
+        numbers = [allocators.permute(n) for n in range(20000)]
+        self.assertEqual(len(set(numbers)), len(numbers))
+        self.assertTrue(all(0 <= n < allocators.DOMAIN for n in numbers))
+        self.assertNotEqual(numbers[:3], sorted(numbers[:3]))
+
+    @override_settings(SEQUENCE_BLOCK_SIZE=10)
+    def test_block_reservation(self):
+        """Une écriture en base pour dix numéros"""
+        with CaptureQueriesContext(connection) as queries:
+            values = [allocators.next_value('test') for _ in range(10)]
+        # UPDATE (séquence absente) et création, puis neuf numéros sans requête
+        self.assertEqual(len([q for q in queries if 'store_sequence' in q['sql']]), 2)
+        self.assertEqual(values, list(range(1, 11)))
+        self.assertEqual(allocators.next_value('test'), 11)
+        self.assertEqual(Sequence.objects.get(name='test').value, 20)
+
+    def test_order_number(self):
+        order = Order.objects.create(user=self.buyer, total=Decimal('10.00'))
+        self.assertRegex(order.order_number, r'^\d{8}$')
+        other = Order.objects.create(user=self.buyer, total=Decimal('10.00'))
+        self.assertNotEqual(order.order_number, other.order_number)
+
+    def test_collision_retries(self):
+        """Un numéro déjà pris (ancien numéro aléatoire) : nouvel essai sur un bloc neuf"""
+        taken = allocators.next_order_number()
+        allocators._blocks.clear()
+        Sequence.objects.all().delete()
+        Order.objects.create(user=self.buyer, total=Decimal('10.00'), order_number=taken)
+        order = Order.objects.create(user=self.buyer, total=Decimal('10.00'))
+        self.assertNotEqual(order.order_number, taken)
+        self.assertEqual(Order.objects.count(), 2)
+
+
+class SlugTest(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.category = Category.objects.create(name='Mode', slug='mode')
+
+    def create(self, name, **kwargs):
+        return Product.objects.create(
+            seller=self.seller, category=self.category, name=name, description='Description',
+            price=Decimal('10.00'), stock=1, **kwargs
+        )
+
+    def test_suffixes(self):
+        slugs = [self.create('T-shirt').slug for _ in range(3)]
+        self.assertEqual(slugs, ['t-shirt', 't-shirt-1', 't-shirt-2'])
+        # « t-shirt-rouge » et les suffixes non numériques ne comptent pas
+        self.create('T-shirt rouge')
+        self.create('T-shirt', slug='t-shirt-10')
+        self.assertEqual(self.create('T-shirt').slug, 't-shirt-11')
+
+    def test_one_query(self):
+        for _ in range(5):
+            self.create('Pagne wax')
+        with self.assertNumQueries(1):
+            self.assertEqual(allocators.next_slug(Product, 'Pagne wax'), 'pagne-wax-5')
+
+    def test_taken_slug_retries(self):
+        """La valeur refusée par la contrainte unique est recalculée"""
+        product = self.create('Boubou')
+        calls = []
+
+        def allocate(attempt):
+            calls.append(attempt)
+            return 'boubou' if attempt == 0 else allocators.next_slug(Product, 'Boubou', attempt)
+
+        duplicate = Product(
+            seller=self.seller, category=self.category, name='Boubou', description='Description',
+            price=Decimal('10.00'), stock=1,
+        )
+        allocators.save_unique(duplicate, 'slug', allocate, lambda: super(Product, duplicate).save())
+        self.assertEqual(calls, [0, 1])
+        self.assertEqual((product.slug, duplicate.slug), ('boubou', 'boubou-1'))
+
+    def test_other_unique_constraint_propagates(self):
+        """Une autre contrainte unique, même sur une colonne du même nom, n'est pas reprise"""
+        calls = []
+        product = Product(
+            seller=self.seller, category=self.category, name='Boubou', description='Description',
+            price=Decimal('10.00'), stock=1,
+        )
+        with self.assertRaises(IntegrityError):
+            allocators.save_unique(
+                product, 'slug', lambda attempt: calls.append(attempt) or 'boubou',
+                lambda: Category.objects.create(name='Mode bis', slug='mode'),
+            )
+        self.assertEqual(calls, [0])
+
+
+class OrderNumberRollbackTest(TransactionTestCase):
+    def test_block_survives_rolled_back_order(self):
+        """Le bloc réservé avant la transaction de commande reste acquis si elle est annulée"""
+        allocators._blocks.clear()
+        buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@example.com',
+            password='testpass123',
+            user_type='buyer'
+        )
+        allocators.prepare_order_numbers()
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                Order.objects.create(user=buyer, total=Decimal('10.00'))
+                raise ValueError
+        self.assertEqual(Sequence.objects.get(name=allocators.ORDER_SEQUENCE).value, allocators.block_size())
+        # Le bloc sert encore : pas de nouvelle réservation
+        Order.objects.create(user=buyer, total=Decimal('10.00'))
+        self.assertEqual(Sequence.objects.get(name=allocators.ORDER_SEQUENCE).value, allocators.block_size())
+
+
+class ConcurrentOrderNumberTest(TransactionTestCase):
+    def test_threads_get_distinct_numbers(self):
+        if connection.vendor == 'sqlite':
+            self.skipTest("SQLite en mémoire : pas d'écritures concurrentes")
+        allocators._blocks.clear()
+        numbers, lock = [], threading.Lock()
+
+        def work():
+            try:
+                values = [allocators.next_order_number() for _ in range(30)]
+                with lock:
+                    numbers.extend(values)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(numbers)), 240)
@@ -0,0 +1,83 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from .models import Product, Category, Review
+from . import cache
+
+User = get_user_model()
+
+class LocalLRUTest(TestCase):
+    def test_eviction(self):
+        """Les entrées les moins récemment lues sont évincées en premier"""
+        lru = cache.LocalLRU(2)
+        lru.set('a', 1, 60)
+        lru.set('b', 2, 60)
+        lru.get('a')
+        lru.set('c', 3, 60)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIs(lru.get('b'), cache._MISSING)
+        self.assertEqual(lru.evictions, 1)
+
+    def test_expiry(self):
+        lru = cache.LocalLRU(2)
+        lru.set('a', 1, -1)
+        self.assertIs(lru.get('a'), cache._MISSING)
+
+class VersionedCacheTest(TestCase):
+    def setUp(self):
+        cache.shared().clear()
+        cache.clear_local()
+        cache.reset_stats()
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.category = Category.objects.create(name='Mode', slug='mode')
+        self.product = Product.objects.create(
+            seller=self.seller,
+            category=self.category,
+            name='Produit',
+            description='Description',
+            price=Decimal('100.00'),
+            stock=10,
+            status='active',
+        )
+
+    def product_names(self):
+        return cache.get_or_set(
+            'names', lambda: list(Product.objects.values_list('name', flat=True)), depends=[Product]
+        )
+
+    def test_hits_and_misses(self):
+        """Premier appel calculé, suivants servis par le LRU local puis par le backend partagé"""
+        self.assertEqual(self.product_names(), ['Produit'])
+        with self.assertNumQueries(0):
+            self.product_names()
+        cache.clear_local()
+        with self.assertNumQueries(0):
+            self.product_names()
+        stats = cache.stats()
+        self.assertEqual((stats['misses'], stats['local_hits'], stats['shared_hits']), (1, 1, 1))
+
+    def test_save_and_delete_bump_model_version(self):
+        """post_save et post_delete invalident les valeurs dépendant du modèle"""
+        self.product_names()
+        self.product.name = 'Renommé'
+        self.product.save()
+        self.assertEqual(self.product_names(), ['Renommé'])
+        self.product.delete()
+        self.assertEqual(self.product_names(), [])
+
+    def test_object_version(self):
+        """Un avis invalide son produit, pas les autres"""
+        other = Product.objects.create(
+            seller=self.seller, category=self.category, name='Autre',
+            description='Description', price=Decimal('10.00'), stock=1, status='active',
+        )
+        before = cache.versions([(Product, self.product.pk), (Product, other.pk)])
+        Review.objects.create(product=self.product, user=self.seller, rating=5, comment='Bien')
+        after = cache.versions([(Product, self.product.pk), (Product, other.pk)])
+        self.assertNotEqual(before[0], after[0])
+        self.assertEqual(before[1], after[1])
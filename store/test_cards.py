@@ -0,0 +1,52 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from .models import Product, Category
+from .cards import ProductCard
+from .pagination import CursorPaginator
+
+User = get_user_model()
+
+class ProductCardTest(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.category = Category.objects.create(name='Mode', slug='mode')
+        self.product = Product.objects.create(
+            seller=self.seller,
+            category=self.category,
+            name='Robe',
+            description='Description',
+            price=Decimal('75.00'),
+            compare_price=Decimal('100.00'),
+            stock=10,
+            status='active',
+            image2='products/robe.jpg',
+        )
+
+    def test_projection(self):
+        """Une requête, colonnes de carte uniquement, image principale déduite"""
+        with self.assertNumQueries(1):
+            card = Product.objects.cards().get(pk=self.product.pk)
+        self.assertIsInstance(card, ProductCard)
+        self.assertEqual((card.name, card.slug, card.price), ('Robe', self.product.slug, Decimal('75.00')))
+        self.assertEqual(card.image, 'products/robe.jpg')
+        self.assertTrue(card.image_url.endswith('products/robe.jpg'))
+        self.assertEqual(card.discount_percentage, Decimal('25.0'))
+        self.assertFalse(hasattr(card, 'description'))
+
+    def test_cursor_pagination_over_cards(self):
+        """Les cartes portent les clés de tri de la pagination par curseur"""
+        for i in range(4):
+            Product.objects.create(
+                seller=self.seller, category=self.category, name=f'Produit {i}',
+                description='Description', price=Decimal(10 + i), stock=1, status='active',
+            )
+        paginator = CursorPaginator(Product.objects.cards(), 2, ['price'])
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        self.assertEqual([c.price for c in list(first) + list(second)], [10, 11, 12, 13])
@@ -0,0 +1,214 @@
+from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.contrib.auth import login
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from decimal import Decimal
+from .models import Product, Category, ProductVariant, Cart, CartItem
+from . import cache, carts
+
+User = get_user_model()
+
+class CartSummaryTest(TestCase):
+    def setUp(self):
+        cache.shared().clear()
+        cache.clear_local()
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@example.com',
+            password='testpass123',
+            user_type='buyer'
+        )
+        self.category = Category.objects.create(name='Mode', slug='mode')
+        self.cart = Cart.objects.create(user=self.buyer)
+        self.products = [
+            Product.objects.create(
+                seller=self.seller,
+                category=self.category,
+                name=f'Produit {i}',
+                description='Description',
+                price=Decimal('10.00') + i,
+                stock=10,
+                status='active',
+            )
+            for i in range(20)
+        ]
+        for product in self.products:
+            CartItem.objects.create(cart=self.cart, product=product, quantity=2)
+
+    def test_single_query(self):
+        """20 lignes : une requête, puis aucune tant que le panier ne change pas"""
+        with self.assertNumQueries(1):
+            summary = carts.summary(self.buyer)
+        self.assertEqual(summary.item_count, 40)
+        self.assertEqual(summary.subtotal, sum(2 * p.price for p in self.products))
+        self.assertEqual(len(summary), 20)
+        self.assertEqual(summary.lines[0].unit_price, Decimal('10.00'))
+        with self.assertNumQueries(0):
+            self.assertEqual(carts.summary(self.buyer).item_count, 40)
+            self.assertEqual(self.cart.total_items, 40)
+
+    def test_item_write_invalidates(self):
+        """Ajout, modification et suppression d'un article rafraîchissent le résumé"""
+        carts.summary(self.buyer)
+        item = CartItem.objects.get(cart=self.cart, product=self.products[0])
+        item.quantity = 5
+        item.save()
+        self.assertEqual(carts.summary(self.buyer).item_count, 43)
+        item.delete()
+        self.assertEqual(carts.summary(self.buyer).item_count, 38)
+
+    def test_price_change_invalidates(self):
+        """Un changement de prix du produit est reflété dans le sous-total"""
+        before = carts.summary(self.buyer).subtotal
+        product = self.products[0]
+        product.price = Decimal('20.00')
+        product.save()
+        self.assertEqual(carts.summary(self.buyer).subtotal, before + 2 * Decimal('10.00'))
+
+    def test_other_products_do_not_invalidate(self):
+        """Un produit absent du panier peut changer sans invalider le résumé"""
+        carts.summary(self.buyer)
+        other = Product.objects.create(
+            seller=self.seller, category=self.category, name='Autre', description='Description',
+            price=Decimal('5.00'), stock=10, status='active',
+        )
+        other.stock = 3
+        other.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(carts.summary(self.buyer).item_count, 40)
+
+    def test_clear(self):
+        """Vidage en nombre de requêtes constant (lecture, suppression), résumé invalidé une fois"""
+        carts.summary(self.buyer)
+        with self.assertNumQueries(2):
+            self.assertEqual(carts.clear(self.buyer.pk), 20)
+        self.assertFalse(carts.summary(self.buyer))
+
+    def test_variant_price(self):
+        """Le prix de la variante remplace celui du produit"""
+        variant = ProductVariant.objects.create(product=self.products[0], name='XL', sku='XL-1', price=Decimal('99.00'), stock=3)
+        CartItem.objects.create(cart=self.cart, product=self.products[0], variant=variant, quantity=1)
+        line = carts.summary(self.buyer).lines[-1]
+        self.assertEqual((line.variant_name, line.unit_price, line.subtotal), ('XL', Decimal('99.00'), Decimal('99.00')))
+        variant.price = Decimal('89.00')
+        variant.save()
+        self.assertEqual(carts.summary(self.buyer).lines[-1].unit_price, Decimal('89.00'))
+
+    def test_line_stock_is_available_stock(self):
+        """Stock d'une ligne : réservé déduit comme dans available_stock(), quantité de la ligne comprise"""
+        product = self.products[0]
+        Product.objects.filter(pk=product.pk).update(reserved=7)
+        self.assertEqual(carts.available_stock([(product.pk, None)]), {(product.pk, None): 3})
+        self.assertEqual(carts.summary(self.buyer).lines[0].stock, 3 + 2)
+
+    def test_badge(self):
+        """Le badge lit le résumé en cache ; rien pour un visiteur anonyme"""
+        carts.summary(self.buyer)
+        template = Template("{{ cart_summary.item_count }}")
+        with self.assertNumQueries(0):
+            self.assertEqual(template.render(Context({'cart_summary': carts.summary(self.buyer)})), '40')
+        self.assertFalse(carts.summary(AnonymousUser()))
+
+class SessionCartTest(TestCase):
+    def setUp(self):
+        cache.shared().clear()
+        cache.clear_local()
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@example.com',
+            password='testpass123',
+            user_type='buyer'
+        )
+        self.category = Category.objects.create(name='Mode', slug='mode')
+        self.robe, self.jupe, self.epuise = [
+            Product.objects.create(
+                seller=self.seller, category=self.category, name=name, description='Description',
+                price=Decimal('10.00'), stock=stock, status='active',
+            )
+            for name, stock in (('Robe', 3), ('Jupe', 10), ('Épuisé', 0))
+        ]
+
+    def request_with_cart(self, items):
+        """Requête portant le cookie signé d'un panier anonyme"""
+        response = HttpResponse()
+        response.set_signed_cookie(carts.COOKIE_NAME, carts.serialize(items), salt=carts.COOKIE_SALT)
+        request = RequestFactory().get('/')
+        request.COOKIES[carts.COOKIE_NAME] = response.cookies[carts.COOKIE_NAME].value
+        SessionMiddleware(lambda r: HttpResponse()).process_request(request)
+        request.user = AnonymousUser()
+        return request
+
+    def test_cookie_format(self):
+        """Format compact, relu à l'identique ; un cookie falsifié est ignoré"""
+        items = {(12, None): 2, (12, 5): 1}
+        self.assertEqual(carts.serialize(items), '12:2,12.5:1')
+        self.assertEqual(carts.parse('12:2,12.5:1,x:3,13:0'), items)
+        request = self.request_with_cart(items)
+        self.assertEqual(carts.session_cart(request).items, items)
+        request = RequestFactory().get('/')
+        request.COOKIES[carts.COOKIE_NAME] = '12:99'
+        self.assertEqual(carts.SessionCart(request).items, {})
+
+    def test_anonymous_cart_reads_only(self):
+        """Ajouter, compter et résumer un panier anonyme n'écrit rien en base"""
+        request = self.request_with_cart({(self.robe.pk, None): 1})
+        cart = carts.session_cart(request)
+        with CaptureQueriesContext(connection) as queries:
+            cart.add(self.jupe.pk, 2)
+            self.assertEqual(carts.item_count(request), 3)
+            summary = carts.for_request(request)
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]['sql'].startswith('SELECT'))
+        self.assertEqual((summary.item_count, summary.subtotal), (3, Decimal('30.00')))
+        response = HttpResponse()
+        cart.save(response)
+        self.assertIn(carts.COOKIE_NAME, response.cookies)
+
+    def test_merge_at_login(self):
+        """Fusion en écritures groupées, quantités additionnées et plafonnées au stock"""
+        user_cart = Cart.objects.create(user=self.buyer)
+        CartItem.objects.create(cart=user_cart, product=self.robe, quantity=2)
+        request = self.request_with_cart({
+            (self.robe.pk, None): 2,     # 2 + 2 > 3 en stock
+            (self.jupe.pk, None): 4,
+            (self.epuise.pk, None): 1,   # Épuisé : abandonné
+        })
+        with CaptureQueriesContext(connection) as queries:
+            login(request, self.buyer, backend='django.contrib.auth.backends.ModelBackend')
+        # Stock disponible, panier, lignes existantes, mise à jour groupée, création groupée
+        self.assertEqual(len([q for q in queries if '"store_' in q['sql']]), 5)
+        self.assertEqual(
+            dict(CartItem.objects.filter(cart=user_cart).values_list('product_id', 'quantity')),
+            {self.robe.pk: 3, self.jupe.pk: 4},
+        )
+        self.assertEqual(carts.summary(self.buyer).item_count, 7)
+        response = HttpResponse()
+        carts.session_cart(request).save(response)
+        self.assertEqual(response.cookies[carts.COOKIE_NAME].value, '')
+
+    def test_add_to_cart_view_anonymous(self):
+        """La vue d'ajout au panier ne fait aucune écriture pour un visiteur anonyme"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('store:add_to_cart', args=[self.jupe.pk]), {'quantity': 2})
+        self.assertEqual(response.json()['cart_count'], 2)
+        self.assertFalse([q for q in queries if not q['sql'].startswith('SELECT')])
+        response = self.client.post(reverse('store:add_to_cart', args=[self.robe.pk]), {'quantity': 4})
+        self.assertEqual(response.status_code, 400)
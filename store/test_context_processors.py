@@ -0,0 +1,56 @@
+from django.test import TestCase, RequestFactory
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from .models import Product, Category
+from .context_processors import categories
+from . import cache
+
+User = get_user_model()
+
+class CategoryNavTest(TestCase):
+    def setUp(self):
+        cache.shared().clear()
+        cache.clear_local()
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.mode = Category.objects.create(name='Mode', slug='mode')
+        self.robes = Category.objects.create(name='Robes', slug='robes', parent=self.mode)
+        Category.objects.create(name='Archives', slug='archives', is_active=False)
+        self.create_product(self.robes)
+        self.request = RequestFactory().get('/')
+
+    def create_product(self, category, **kwargs):
+        return Product.objects.create(
+            seller=self.seller,
+            category=category,
+            name='Produit',
+            description='Description',
+            price=Decimal('100.00'),
+            stock=10,
+            status='active',
+            **kwargs
+        )
+
+    def test_lazy(self):
+        """Aucune requête tant que le gabarit ne lit pas la navigation"""
+        with self.assertNumQueries(0):
+            categories(self.request)
+
+    def test_hierarchy_and_counts(self):
+        nav = categories(self.request)
+        self.assertEqual([c.slug for c in nav['category_nav']], ['mode'])
+        robes = nav['category_nav'][0].children[0]
+        self.assertEqual((robes.slug, robes.product_count), ('robes', 1))
+        self.assertEqual([c.name for c in nav['categories']], ['Mode', 'Robes'])
+
+    def test_cached_then_refreshed(self):
+        """Servie depuis le cache, reconstruite après modification d'un produit"""
+        list(categories(self.request)['categories'])
+        with self.assertNumQueries(0):
+            list(categories(self.request)['categories'])
+        self.create_product(self.mode)
+        self.assertEqual(categories(self.request)['category_nav'][0].product_count, 1)
@@ -0,0 +1,74 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from .models import Product, Category, Favorite
+from . import counters
+
+User = get_user_model()
+
+@override_settings(COUNTER_FLUSH_INTERVAL=0)
+class ProductCountersTest(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        category = Category.objects.create(name='Mode', slug='mode')
+        self.products = [
+            Product.objects.create(
+                seller=self.seller,
+                category=category,
+                name=f'Produit {i}',
+                description='Description',
+                price=Decimal('100.00'),
+                stock=10,
+                status='active',
+            )
+            for i in range(3)
+        ]
+        counters.flush()
+
+    def tearDown(self):
+        counters.flush()
+
+    def test_views_are_buffered(self):
+        """Les vues ne sont écrites qu'au vidage, en un UPDATE par combinaison de deltas"""
+        with self.assertNumQueries(0):
+            for product in self.products:
+                product.increment_views()
+        self.assertEqual(counters.pending(self.products[0].pk, 'views'), 1)
+        self.products[0].increment_views()
+
+        with self.assertNumQueries(4):  # SAVEPOINT, deux UPDATE, RELEASE
+            self.assertEqual(counters.flush(), 3)
+        views = dict(Product.objects.values_list('pk', 'views'))
+        self.assertEqual([views[p.pk] for p in self.products], [2, 1, 1])
+        self.assertEqual(counters.pending(self.products[0].pk, 'views'), 0)
+
+    def test_full_save_keeps_counters(self):
+        """Un save() complet d'une instance périmée n'écrase pas les compteurs"""
+        stale = Product.objects.get(pk=self.products[0].pk)
+        self.products[0].increment_views()
+        counters.flush()
+        stale.name = 'Nouveau nom'
+        stale.save()
+        self.assertEqual(Product.objects.get(pk=stale.pk).views, 1)
+
+    def test_favorites_count(self):
+        """Les favoris ajoutés et retirés mettent à jour favorites_count, sans passer sous zéro"""
+        buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@example.com',
+            password='testpass123',
+            user_type='buyer'
+        )
+        favorite = Favorite.objects.create(user=buyer, product=self.products[1])
+        counters.flush()
+        self.assertEqual(Product.objects.get(pk=self.products[1].pk).favorites_count, 1)
+
+        favorite.delete()
+        counters.increment(self.products[1].pk, 'favorites_count', -1)
+        counters.flush()
+        self.assertEqual(Product.objects.get(pk=self.products[1].pk).favorites_count, 0)
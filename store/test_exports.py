@@ -0,0 +1,126 @@
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.db.models import F
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import exports
+from .models import Category
+
+COLUMNS = [('id', 'ID'), ('name', 'Nom'), ('parent_name', 'Parent'), ('is_active', 'Actif')]
+
+
+def categories():
+    return Category.objects.annotate(parent_name=F('parent__name')), COLUMNS, 'categories'
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.mode = Category.objects.create(name='Mode', slug='mode')
+        self.shoes = Category.objects.create(name='Chaussures, "sport"', slug='chaussures', parent=self.mode)
+        self.queryset = Category.objects.annotate(parent_name=F('parent__name')).order_by('pk')
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_csv(self):
+        """En-têtes puis une ligne par objet, échappement CSV et None vide, en une requête"""
+        with CaptureQueriesContext(connection) as queries:
+            response = exports.export(self.queryset, COLUMNS, 'categories')
+            content = self.content(response).decode()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="categories.csv"')
+        self.assertEqual(content.splitlines(), [
+            'ID,Nom,Parent,Actif',
+            f'{self.mode.pk},Mode,,True',
+            f'{self.shoes.pk},"Chaussures, ""sport""",Mode,True',
+        ])
+
+    def test_jsonl_with_selected_columns(self):
+        request = self.factory.get('/', {'format': 'jsonl', 'columns': 'parent_name,name,unknown'})
+        response = exports.from_request(request, self.queryset, COLUMNS, 'categories')
+        lines = [json.loads(line) for line in self.content(response).decode().splitlines()]
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(lines, [
+            {'parent_name': None, 'name': 'Mode'},
+            {'parent_name': 'Mode', 'name': 'Chaussures, "sport"'},
+        ])
+
+    def test_gzip(self):
+        request = self.factory.get('/', {'gzip': '1', 'columns': 'name'})
+        response = exports.from_request(request, self.queryset, COLUMNS, 'categories')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="categories.csv.gz"')
+        self.assertEqual(gzip.decompress(self.content(response)).decode().splitlines(),
+                         ['Nom', 'Mode', '"Chaussures, ""sport"""'])
+
+    def test_buffered(self):
+        chunks = list(exports.buffered(['ab', 'cd', 'e'], size=4))
+        self.assertEqual(chunks, [b'abcd', b'e'])
+
+
+class ExportJobTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.names = ['Mode', 'Maison', 'Sport', 'Jardin', 'Auto']
+        for name in self.names:
+            Category.objects.create(name=name, slug=name.lower())
+
+    def read(self, job):
+        with open(exports.path(job), 'rb') as f:
+            return gzip.decompress(f.read()).decode().splitlines()
+
+    def test_run_in_chunks(self):
+        """Un membre gzip par morceau, en-tête unique, progression complète"""
+        job = exports.enqueue('store.test_exports.categories', columns=['name'])
+        self.assertEqual(job.progress, 0)
+        self.assertTrue(exports.run(job.pk, chunk_size=2))
+        self.assertFalse(exports.run(job.pk))  # Déjà pris
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.total_rows, job.rows_written, job.progress), ('done', 5, 5, 100))
+        self.assertTrue(job.file.name.endswith('-categories.csv.gz'))
+        self.assertEqual(self.read(job), ['Nom'] + self.names)
+        self.assertEqual(exports.as_dict(job)['ready'], True)
+
+    def test_resume_after_crash(self):
+        """Arrêt brutal après l'écriture d'un morceau non validé : reprise sans doublon"""
+        job = exports.enqueue('store.test_exports.categories', format='jsonl', columns=['name'])
+        fsync = exports.os.fsync
+        calls = []
+
+        def crash_on_second(fd):
+            calls.append(fd)
+            if len(calls) == 2:
+                raise SystemExit  # Le morceau est dans le fichier, pas encore dans la base
+            fsync(fd)
+
+        with mock.patch.object(exports.os, 'fsync', crash_on_second), self.assertRaises(SystemExit):
+            exports.run(job.pk, chunk_size=2)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rows_written), ('running', 2))
+
+        self.assertEqual(exports.requeue_stale(timezone.now() + timedelta(minutes=1)), 1)
+        self.assertTrue(exports.run(job.pk, chunk_size=2))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rows_written), ('done', 5))
+        self.assertEqual([json.loads(line)['name'] for line in self.read(job)], self.names)
+
+    def test_failure_is_recorded(self):
+        job = exports.enqueue('store.test_exports.missing')
+        exports.run(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertTrue(job.error)
@@ -0,0 +1,77 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from .models import Product, Category, FacetCount
+from . import facets
+
+User = get_user_model()
+
+class FacetCountTest(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.category = Category.objects.create(name='Mode', slug='mode')
+        self.red_nike = self.create_product(brand='Nike', color='rouge', price=Decimal('30.00'))
+        self.blue_nike = self.create_product(brand='Nike', color='bleu', price=Decimal('300.00'))
+        self.red_adidas = self.create_product(brand='Adidas', color='rouge', price=Decimal('30.00'))
+
+    def create_product(self, **kwargs):
+        return Product.objects.create(
+            seller=self.seller,
+            category=self.category,
+            name='Produit',
+            description='Description',
+            stock=10,
+            status='active',
+            **kwargs
+        )
+
+    def active_products(self):
+        return Product.objects.filter(is_active=True, status='active', stock__gt=0)
+
+    def test_counts_without_selection(self):
+        """Compteurs globaux lus dans FacetCount"""
+        counts = facets.counts({})
+        self.assertEqual(counts['brand'], {'Nike': 2, 'Adidas': 1})
+        self.assertEqual(counts['price'], {'0-50': 2, '250-500': 1})
+
+    def test_counts_with_one_selection(self):
+        """Les autres facettes sont restreintes, la facette choisie garde toutes ses valeurs"""
+        counts = facets.counts({'brand': 'Nike'})
+        self.assertEqual(counts['brand'], {'Nike': 2, 'Adidas': 1})
+        self.assertEqual(counts['color'], {'rouge': 1, 'bleu': 1})
+
+    def test_incremental_matches_group_by(self):
+        """Après modifications, les compteurs précalculés égalent un GROUP BY"""
+        self.blue_nike.color = 'rouge'
+        self.blue_nike.save(update_fields=['color'])
+        self.red_adidas.stock = 0
+        self.red_adidas.save()
+        self.red_nike.delete()
+        for selected in ({}, {'color': 'rouge'}, {'brand': 'Nike'}):
+            self.assertEqual(facets.counts(selected), facets.counts(selected, self.active_products()))
+
+    def test_track_bulk_update(self):
+        """track() répercute un update() en masse"""
+        with facets.track(Product.objects.filter(brand='Nike')):
+            Product.objects.filter(brand='Nike').update(is_active=False)
+        self.assertEqual(facets.counts({})['brand'], {'Adidas': 1})
+
+    def test_rebuild(self):
+        """rebuild() reconstruit les mêmes compteurs"""
+        expected = facets.counts({'color': 'rouge'})
+        FacetCount.objects.all().delete()
+        facets.rebuild()
+        self.assertEqual(facets.counts({'color': 'rouge'}), expected)
+
+    def test_multi_selection_query_bound(self):
+        """Plusieurs facettes choisies : une requête par facette, tranches de prix comprises"""
+        with self.assertNumQueries(len(facets.FACETS)):
+            counts = facets.counts({'brand': 'Nike', 'color': 'rouge'})
+        self.assertEqual(counts['price'], {'0-50': 1})
+        self.assertEqual(counts['color'], {'rouge': 1, 'bleu': 1})
+        self.assertEqual(counts['brand'], {'Nike': 1, 'Adidas': 1})
@@ -0,0 +1,74 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.template import Context, Template
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from .models import Product, Category, Favorite
+from . import favorites
+
+User = get_user_model()
+
+class FavoritesPrefetchTest(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@example.com',
+            password='testpass123',
+            user_type='buyer'
+        )
+        self.category = Category.objects.create(name='Mode', slug='mode')
+        self.products = [self.create_product(i) for i in range(12)]
+        for product in self.products[::3]:
+            Favorite.objects.create(user=self.buyer, product=product)
+
+    def create_product(self, i):
+        return Product.objects.create(
+            seller=self.seller,
+            category=self.category,
+            name=f'Produit {i}',
+            description='Description',
+            price=Decimal('100.00'),
+            stock=10,
+            status='active',
+        )
+
+    def render_grid(self, user):
+        template = Template(
+            "{% load store_tags %}{% for product in products %}{{ product|is_favorite:user|yesno:'1,0' }}{% endfor %}"
+        )
+        return template.render(Context({'products': self.products, 'user': user}))
+
+    def test_prefetched_grid(self):
+        """Une requête pour toute la grille, aucune au rendu"""
+        user = User.objects.get(pk=self.buyer.pk)
+        with self.assertNumQueries(1):
+            favorites.prefetch(user, self.products)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.render_grid(user), '100100100100')
+
+    def test_filter_without_prefetch(self):
+        """Sans préchargement, le filtre ne fait qu'une requête par requête HTTP"""
+        user = User.objects.get(pk=self.buyer.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.render_grid(user), '100100100100')
+
+    def test_product_list_query_count_is_constant(self):
+        """Le nombre de requêtes de product_list ne dépend pas du nombre de produits affichés"""
+        self.client.login(username='buyer', password='testpass123')
+        self.client.get(reverse('store:product_list'))  # Barre de facettes et navigation mises en cache
+        Product.objects.filter(pk__in=[p.pk for p in self.products[2:]]).update(stock=0)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('store:product_list'))
+        Product.objects.update(stock=10)
+        with CaptureQueriesContext(connection) as full:
+            response = self.client.get(reverse('store:product_list'))
+        self.assertEqual(len(response.context['page_obj']), 12)
+        self.assertEqual(len(full), len(small))
@@ -215,7 +215,7 @@ class FullWorkflowIntegrationTest(TestCase):
         
         # Supprimer du panier
         print("3. Suppression du panier...")
-        response = self.client.get(reverse('store:remove_from_cart', args=[cart_item.id]))
+        response = self.client.post(reverse('store:remove_from_cart', args=[cart_item.id]))
         self.assertEqual(response.status_code, 302)
         
         self.assertEqual(cart.items.count(), 0)
@@ -0,0 +1,114 @@
+import io
+import shutil
+import tempfile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from decimal import Decimal
+from PIL import Image
+from .models import Product, Category, ImageJob, ImageRendition
+from . import jobs, renditions
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+def photo(name='robe.jpg', size=(800, 600)):
+    image_io = io.BytesIO()
+    Image.new('RGB', size, color='blue').save(image_io, format='JPEG')
+    return SimpleUploadedFile(name, image_io.getvalue(), content_type='image/jpeg')
+
+class ImageJobMixin:
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.category = Category.objects.create(name='Mode', slug='mode')
+        self.product = Product.objects.create(
+            seller=self.seller,
+            category=self.category,
+            name='Robe',
+            description='Description',
+            price=Decimal('75.00'),
+            stock=10,
+            status='active',
+            image1=photo(),
+        )
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_JOB_WORKERS=0, IMAGE_RENDITION_WIDTHS=(320,))
+class ImageJobTest(ImageJobMixin, TestCase):
+    def test_enqueue_runs_after_commit(self):
+        """Rien n'est traité avant le commit ; le job est ensuite terminé avec son srcset"""
+        with self.captureOnCommitCallbacks(execute=True):
+            job, = renditions.enqueue(self.product, renditions.PRODUCT_IMAGE_FIELDS, user=self.seller)
+            self.assertEqual(job.status, 'pending')
+            self.assertFalse(ImageRendition.objects.exists())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.result['renditions'], 2)
+        self.assertIn('320w', job.result['webp_srcset'])
+        self.assertIsNotNone(job.finished_at)
+
+    def test_unreadable_image_fails(self):
+        """Une image illisible termine le job en échec, avec l'erreur"""
+        self.product.image2 = SimpleUploadedFile('robe.jpg', b'pas une image')
+        self.product.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            job, = renditions.enqueue(self.product, ['image2'])
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertTrue(job.error)
+
+    def test_job_runs_once(self):
+        """Un job déjà pris n'est pas exécuté une seconde fois"""
+        job = jobs.enqueue('renditions', self.product, 'image1')
+        self.assertTrue(jobs.run(job.pk))
+        self.assertFalse(jobs.run(job.pk))
+
+    def test_replaced_image_is_skipped(self):
+        """Si l'image a été remplacée entre-temps, l'ancien job ne fait rien"""
+        job = jobs.enqueue('renditions', self.product, 'image1')
+        self.product.image1 = photo('autre.jpg')
+        self.product.save()
+        jobs.run(job.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), ('done', {'skipped': True}))
+        self.assertFalse(ImageRendition.objects.exists())
+
+    def test_status_endpoint(self):
+        """Le suivi n'est visible que par l'auteur du téléversement"""
+        job = jobs.enqueue('renditions', self.product, 'image1', user=self.seller)
+        User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        self.client.login(username='other', password='testpass123')
+        self.assertEqual(self.client.get(reverse('store:image_job_status', args=[job.pk])).status_code, 403)
+        self.client.login(username='seller', password='testpass123')
+        response = self.client.get(reverse('store:image_job_status', args=[job.pk]))
+        self.assertEqual(response.json()['status'], 'pending')
+
+# Un seul thread : la base SQLite en mémoire des tests verrouille les tables par écrivain
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_JOB_WORKERS=1, IMAGE_RENDITION_WIDTHS=(320,))
+class ImageJobPoolTest(ImageJobMixin, TransactionTestCase):
+    def tearDown(self):
+        jobs.shutdown()
+        super().tearDown()
+
+    def test_pool_processes_jobs(self):
+        """Les jobs confiés au pool sont traités hors du thread appelant"""
+        self.product.image2 = photo('robe2.jpg')
+        self.product.image3 = photo('robe3.jpg')
+        self.product.save()
+        queued = renditions.enqueue(self.product, ['image1', 'image2', 'image3'])
+        futures = [jobs.submit(job.pk) for job in queued]
+        for future in futures:
+            future.result(timeout=30)
+        self.assertEqual(list(ImageJob.objects.values_list('status', flat=True)), ['done'] * 3)
+        self.assertEqual(ImageRendition.objects.count(), 6)
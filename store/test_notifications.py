@@ -0,0 +1,85 @@
+import sys
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from . import notifications
+from .models import Notification, NotificationCounter
+
+User = get_user_model()
+
+
+class NotificationDispatchTest(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                username=f'user{i}',
+                email=f'user{i}@example.com',
+                password='testpass123',
+                user_type='buyer'
+            )
+            for i in range(3)
+        ]
+
+    def test_notify_constant_queries(self):
+        """Requêtes en nombre constant quel que soit le nombre de destinataires, doublons et None ignorés"""
+        recipients = self.users + [self.users[0].pk, None]
+        # Notifications (INSERT), compteurs (INSERT, UPDATE, SELECT) et points de sauvegarde
+        with self.assertNumQueries(8):
+            created = notifications.notify(recipients, 'Bonjour', notification_type='order_placed')
+        self.assertEqual(len(created), 3)
+        self.assertEqual(
+            sorted(Notification.objects.filter(type='order_placed').values_list('user_id', flat=True)),
+            sorted(user.pk for user in self.users),
+        )
+
+    def test_build_type_and_title(self):
+        notification = notifications.build(self.users[0], 'Votre compte a été signalé', 'report_received')
+        self.assertEqual((notification.type, notification.title), ('report_received', 'Votre compte a été signalé'))
+        notifications.dispatch([notifications.build(self.users[0], 'Compte désactivé', 'account_deactivation_manual')])
+        self.assertTrue(Notification.objects.filter(type='account_deactivation_manual').exists())
+
+    def test_events_sent_after_commit(self):
+        """Les événements partent en un seul lot, après le commit"""
+        with mock.patch.object(notifications, 'push') as push:
+            with self.captureOnCommitCallbacks(execute=True):
+                notifications.notify(self.users[:2], 'Retour', notification_type='return_request', related_object_id=7)
+                push.assert_not_called()
+        push.assert_called_once_with([
+            (f'user_{user.pk}', {
+                'type': 'send_notification',
+                'message': 'Retour',
+                'notification_type': 'return_request',
+                'related_object_id': 7,
+                'unread_count': 1,
+            })
+            for user in self.users[:2]
+        ])
+
+    def test_unread_counter(self):
+        """Le compteur suit les envois et la lecture, sans COUNT"""
+        user = self.users[0]
+        self.assertEqual(notifications.unread_count(user), 0)
+        notifications.notify([user], 'Un')
+        notifications.dispatch([notifications.build(user, 'Deux'), notifications.build(user.pk, 'Trois')])
+        with self.assertNumQueries(1):
+            self.assertEqual(notifications.unread_count(user), 3)
+        self.assertEqual(notifications.unread_count(self.users[1]), 0)
+
+        notifications.mark_all_read(user)
+        self.assertEqual(notifications.unread_count(user), 0)
+        self.assertFalse(Notification.objects.filter(user=user, is_read=False).exists())
+
+    def test_recount(self):
+        """Les notifications créées hors de store.notifications sont rattrapées par recount()"""
+        notifications.notify(self.users[:2], 'Bonjour')
+        Notification.objects.create(user=self.users[2], title='Direct', message='Direct')
+        NotificationCounter.objects.filter(pk=self.users[0].pk).update(unread=5)
+        self.assertEqual(notifications.recount(), 3)
+        self.assertEqual([notifications.unread_count(user) for user in self.users], [1, 1, 1])
+
+    def test_push_without_channels(self):
+        """Sans couche WebSocket, l'envoi est ignoré sans erreur"""
+        with mock.patch.dict(sys.modules, {'channels.layers': None}):
+            notifications.push([('user_1', {'type': 'send_notification'})])
@@ -0,0 +1,117 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from . import cache, orders, reservations
+from .models import Cart, CartItem, Category, Notification, Order, OrderItem, Product
+
+User = get_user_model()
+
+
+class PlaceOrderTest(TestCase):
+    def setUp(self):
+        cache.shared().clear()
+        cache.clear_local()
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@example.com',
+            password='testpass123',
+            user_type='buyer'
+        )
+        self.category = Category.objects.create(name='Mode', slug='mode')
+        self.robe, self.jupe = [
+            Product.objects.create(
+                seller=self.seller, category=self.category, name=name, description='Description',
+                price=price, stock=5, status='active',
+            )
+            for name, price in (('Robe', Decimal('20.00')), ('Jupe', Decimal('15.00')))
+        ]
+        self.cart = Cart.objects.create(user=self.buyer)
+        CartItem.objects.create(cart=self.cart, product=self.robe, quantity=2)
+        CartItem.objects.create(cart=self.cart, product=self.jupe, quantity=1)
+
+    def test_place_order(self):
+        """Commande, lignes, stock, panier vidé et notifications"""
+        with self.captureOnCommitCallbacks(execute=True):
+            order, created = orders.place_order(self.buyer, 'cle-1')
+        self.assertTrue(created)
+        self.assertEqual((order.subtotal, order.total), (Decimal('55.00'), Decimal('55.00')))
+        self.assertEqual(
+            sorted(OrderItem.objects.filter(order=order).values_list('product_id', 'quantity', 'total_price')),
+            sorted([(self.robe.pk, 2, Decimal('40.00')), (self.jupe.pk, 1, Decimal('15.00'))]),
+        )
+        self.robe.refresh_from_db()
+        self.jupe.refresh_from_db()
+        self.assertEqual((self.robe.stock, self.jupe.stock), (3, 4))
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
+        self.assertEqual(self.cart.total_items, 0)
+        self.assertEqual(
+            set(Notification.objects.filter(type='order_placed').values_list('user_id', flat=True)),
+            {self.buyer.pk, self.seller.pk},
+        )
+
+    def test_query_count_does_not_grow_with_lines(self):
+        """Écritures groupées : le nombre de requêtes ne dépend pas du nombre de lignes"""
+        def count_queries(user):
+            with CaptureQueriesContext(connection) as queries:
+                orders.place_order(user)
+            return len(queries)
+
+        baseline = count_queries(self.buyer)
+        other = User.objects.create_user(username='other', password='testpass123', user_type='buyer')
+        cart = Cart.objects.create(user=other)
+        for i in range(6):
+            product = Product.objects.create(
+                seller=self.seller, category=self.category, name=f'Produit {i}', description='Description',
+                price=Decimal('5.00'), stock=5, status='active',
+            )
+            CartItem.objects.create(cart=cart, product=product, quantity=1)
+        self.assertEqual(count_queries(other), baseline)
+
+    def test_idempotency_key(self):
+        """Un second envoi avec la même clé renvoie la commande existante"""
+        order, created = orders.place_order(self.buyer, 'cle-1')
+        CartItem.objects.create(cart=self.cart, product=self.robe, quantity=1)
+        again, created_again = orders.place_order(self.buyer, 'cle-1')
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(again.pk, order.pk)
+        self.assertEqual(Order.objects.filter(user=self.buyer).count(), 1)
+        self.robe.refresh_from_db()
+        self.assertEqual(self.robe.stock, 3)
+
+    def test_out_of_stock_writes_nothing(self):
+        """Stock insuffisant sur une ligne : aucune commande, stock et panier intacts"""
+        Product.objects.filter(pk=self.jupe.pk).update(stock=0)
+        with self.assertRaises(orders.OutOfStock) as raised:
+            orders.place_order(self.buyer, 'cle-1')
+        self.assertEqual(raised.exception.product_id, self.jupe.pk)
+        self.assertFalse(Order.objects.exists())
+        self.robe.refresh_from_db()
+        self.assertEqual(self.robe.stock, 5)
+        self.assertEqual(CartItem.objects.filter(cart=self.cart).count(), 2)
+
+    def test_confirms_reservations(self):
+        """Les unités réservées par le panier sont confirmées, les autres prises sur le stock libre"""
+        reservations.hold(self.robe, 2, user=self.buyer)
+        reservations.hold(self.jupe, 3, user=self.buyer)  # Plus que le panier : rendue
+        orders.place_order(self.buyer)
+        self.robe.refresh_from_db()
+        self.jupe.refresh_from_db()
+        self.assertEqual((self.robe.stock, self.robe.reserved), (3, 0))
+        self.assertEqual((self.jupe.stock, self.jupe.reserved), (4, 0))
+        self.assertFalse(reservations.owned_by(self.buyer).exists())
+
+    def test_empty_cart(self):
+        CartItem.objects.all().delete()
+        with self.assertRaises(orders.EmptyCart):
+            orders.place_order(self.buyer)
@@ -0,0 +1,65 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from .models import Product, Category
+from .pagination import CursorPaginator
+
+User = get_user_model()
+
+class CursorPaginatorTest(TestCase):
+    def setUp(self):
+        seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        category = Category.objects.create(name='Mode', slug='mode')
+        # Prix en double pour vérifier le départage par id
+        for i in range(23):
+            Product.objects.create(
+                seller=seller,
+                category=category,
+                name=f'Produit {i}',
+                description='Description',
+                price=Decimal(10 + i % 5),
+                stock=10,
+                status='active',
+                sales_count=i % 3,
+            )
+
+    def walk(self, ordering):
+        paginator = CursorPaginator(Product.objects.all(), 5, ordering)
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        return paginator, pages
+
+    def test_forward_matches_full_ordering(self):
+        """Parcourir toutes les pages redonne le tri complet, sans doublon ni oubli"""
+        for ordering in (['-created_at'], ['price'], ['-price'], ['-sales_count', '-views']):
+            paginator, pages = self.walk(ordering)
+            walked = [p.pk for page in pages for p in page]
+            self.assertEqual(walked, list(paginator.queryset.values_list('pk', flat=True)))
+            self.assertEqual(len(pages), 5)
+
+    def test_backward(self):
+        """Le curseur précédent ramène exactement la page précédente"""
+        paginator, pages = self.walk(['price'])
+        for previous, current in zip(pages, pages[1:]):
+            back = paginator.page(current.previous_cursor)
+            self.assertEqual([p.pk for p in back], [p.pk for p in previous])
+        self.assertFalse(paginator.page(pages[1].previous_cursor).has_previous())
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        """Un curseur invalide ou d'un autre tri renvoie la première page"""
+        paginator, pages = self.walk(['price'])
+        other = CursorPaginator(Product.objects.all(), 5, ['-price'])
+        self.assertEqual(list(other.get_page(pages[1].next_cursor)), list(other.page()))
+        self.assertEqual(list(other.get_page('nimportequoi')), list(other.page()))
+
+    def test_no_count_query(self):
+        """Une page coûte une seule requête, sans COUNT"""
+        paginator, pages = self.walk(['-created_at'])
+        with self.assertNumQueries(1):
+            list(paginator.page(pages[3].next_cursor))
@@ -0,0 +1,87 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from .models import Product, Category, Review
+from . import ratings
+
+User = get_user_model()
+
+class RatingAggregatesTest(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.buyers = [
+            User.objects.create_user(
+                username=f'buyer{i}',
+                email=f'buyer{i}@example.com',
+                password='testpass123',
+                user_type='buyer'
+            )
+            for i in range(3)
+        ]
+        self.product = Product.objects.create(
+            seller=self.seller,
+            category=Category.objects.create(name='Mode', slug='mode'),
+            name='Produit',
+            description='Description',
+            price=Decimal('100.00'),
+            stock=10,
+            status='active',
+        )
+
+    def review(self, buyer, rating, is_approved=True):
+        return Review.objects.create(
+            product=self.product, user=buyer, rating=rating, comment='Avis', is_approved=is_approved
+        )
+
+    def test_approved_reviews_only(self):
+        """Seuls les avis approuvés comptent, y compris après changement d'approbation"""
+        self.review(self.buyers[0], 4)
+        pending = self.review(self.buyers[1], 1, is_approved=False)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_count, self.product.average_rating), (1, 4.0))
+
+        pending.is_approved = True
+        pending.save()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_count, self.product.average_rating), (2, 2.5))
+        self.assertEqual(self.product.rating_1_count, 1)
+
+    def test_rating_change_and_delete(self):
+        """Modifier ou supprimer un avis met à jour somme, nombre et histogramme"""
+        first = self.review(self.buyers[0], 5)
+        second = self.review(self.buyers[1], 3)
+        first.rating = 2
+        first.save()
+        second.delete()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_sum, self.product.rating_count), (2, 1))
+        self.assertEqual(self.product.rating_average, 2.0)
+        self.assertEqual(self.product.rating_histogram[3], (2, 1, 100))
+
+        first.delete()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_count, self.product.rating_average), (0, 0))
+
+    def test_stale_instance_does_not_overwrite(self):
+        """Enregistrer une instance chargée avant un avis ne réinitialise pas les agrégats"""
+        stale = Product.objects.get(pk=self.product.pk)
+        self.review(self.buyers[0], 5)
+        stale.name = 'Nouveau nom'
+        stale.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_count, 1)
+
+    def test_rebuild_repairs_drift(self):
+        """rebuild() corrige des agrégats faussés"""
+        self.review(self.buyers[0], 5)
+        self.review(self.buyers[1], 4)
+        Product.objects.filter(pk=self.product.pk).update(rating_sum=0, rating_count=7, rating_5_count=0)
+        self.assertEqual(ratings.rebuild(Product.objects.all(), chunk_size=1), 1)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_sum, self.product.rating_count, self.product.rating_5_count), (9, 2, 1))
+        self.assertEqual(ratings.rebuild(Product.objects.all()), 0)
@@ -0,0 +1,126 @@
+import io
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+from django.template import Context, Template
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import default_storage
+from decimal import Decimal
+from PIL import Image
+from .models import Product, Category, ImageRendition
+from . import cache, renditions
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_RENDITION_WIDTHS=(320, 640))
+class RenditionTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.category = Category.objects.create(name='Mode', slug='mode')
+        self.product = Product.objects.create(
+            seller=self.seller,
+            category=self.category,
+            name='Robe',
+            description='Description',
+            price=Decimal('75.00'),
+            stock=10,
+            status='active',
+            image1=self.upload((1200, 800)),
+        )
+
+    def upload(self, size, mode='RGB', fmt='JPEG'):
+        image = Image.new(mode, size, color='red')
+        image_io = io.BytesIO()
+        image.save(image_io, format=fmt)
+        return SimpleUploadedFile(f"robe.{fmt.lower()}", image_io.getvalue())
+
+    def test_generate(self):
+        """Une déclinaison WebP et JPEG par largeur, à côté de l'original, sous un nom à empreinte"""
+        created = renditions.generate(self.product.image1)
+        self.assertEqual(
+            sorted((r.format, r.width, r.height) for r in created),
+            [('jpeg', 320, 213), ('jpeg', 640, 427), ('webp', 320, 213), ('webp', 640, 427)],
+        )
+        for rendition in created:
+            self.assertTrue(rendition.name.startswith('products/robe'))
+            self.assertRegex(rendition.name, r'\.\d+w\.[0-9a-f]{12}\.(webp|jpg)$')
+            self.assertTrue(default_storage.exists(rendition.name))
+            with Image.open(default_storage.open(rendition.name)) as image:
+                self.assertEqual(image.size, (rendition.width, rendition.height))
+
+    def test_generate_is_idempotent(self):
+        """Même contenu, mêmes noms : aucune copie en double"""
+        first = {r.name for r in renditions.generate(self.product.image1)}
+        second = {r.name for r in renditions.generate(self.product.image1)}
+        self.assertEqual(first, second)
+        self.assertEqual(ImageRendition.objects.filter(source=self.product.image1.name).count(), 4)
+
+    def test_small_image_and_transparency(self):
+        """Pas d'agrandissement ; une image transparente garde PNG comme format de repli"""
+        self.product.image2 = self.upload((100, 50), mode='RGBA', fmt='PNG')
+        self.product.save()
+        created = renditions.generate(self.product.image2)
+        self.assertEqual(sorted((r.format, r.width) for r in created), [('png', 100), ('webp', 100)])
+
+    def test_unreadable_image(self):
+        """Un fichier illisible ne produit rien et ne lève pas d'erreur"""
+        self.product.image2 = SimpleUploadedFile('robe.jpg', b'pas une image')
+        self.product.save()
+        self.assertEqual(renditions.generate(self.product.image2), [])
+
+    def test_srcset_tag(self):
+        """Le srcset suit les déclinaisons créées ou supprimées"""
+        template = Template("{% load store_tags %}{% srcset image 'webp' %}|{% srcset image %}")
+        render = lambda: template.render(Context({'image': self.product.image1}))
+        self.assertEqual(render(), '|')
+        renditions.generate(self.product.image1)
+        webp, fallback = render().split('|')
+        self.assertRegex(webp, r'^/media/products/robe[^ ]*\.320w\.\w+\.webp 320w, /media/[^ ]+\.640w\.\w+\.webp 640w$')
+        self.assertIn('.jpg 640w', fallback)
+        with self.assertNumQueries(0):
+            render()
+        renditions.delete(self.product.image1)
+        self.assertEqual(render(), '|')
+        self.assertFalse(ImageRendition.objects.exists())
+
+    def test_picture_tag_with_card(self):
+        """Le tag picture accepte le nom d'image d'une carte produit"""
+        renditions.generate(self.product.image1)
+        card = Product.objects.cards().get(pk=self.product.pk)
+        html = Template("{% load store_tags %}{% picture card.image alt=card.name css_class='product-img' %}").render(
+            Context({'card': card})
+        )
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn(f'src="/media/{self.product.image1.name}"', html)
+        self.assertIn('alt="Robe"', html)
+
+    def test_prefetch_page(self):
+        """Les déclinaisons d'une page se chargent en une requête, les tags picture n'en font plus"""
+        for i in range(3):
+            product = Product.objects.create(
+                seller=self.seller, category=self.category, name=f'Robe {i}', description='Description',
+                price=Decimal('75.00'), stock=10, status='active', image1=self.upload((800, 600)),
+            )
+            renditions.generate(product.image1)
+        cards = list(Product.objects.cards())
+        cache.shared().clear()
+        cache.clear_local()
+        template = Template("{% load store_tags %}{% for card in cards %}{% picture card.image %}{% endfor %}")
+        with self.assertNumQueries(1):
+            renditions.prefetch([card.image for card in cards])
+        with self.assertNumQueries(0):
+            html = template.render(Context({'cards': cards}))
+        self.assertEqual(html.count('<source type="image/webp"'), 3)
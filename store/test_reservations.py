@@ -0,0 +1,197 @@
+import threading
+import time
+from datetime import timedelta
+from django.test import TestCase, TransactionTestCase
+from django.db import OperationalError, connection
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from decimal import Decimal
+from .models import CartItem, Product, Category, Order, ProductVariant, StockReservation, FacetCount
+from . import reservations
+from .reservations import OutOfStock, ReservationExpired
+
+User = get_user_model()
+
+class ReservationMixin:
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.buyer = User.objects.create_user(
+            username='buyer',
+            email='buyer@example.com',
+            password='testpass123',
+            user_type='buyer'
+        )
+        self.category = Category.objects.create(name='Mode', slug='mode')
+        self.product = Product.objects.create(
+            seller=self.seller,
+            category=self.category,
+            name='Robe',
+            description='Description',
+            price=Decimal('75.00'),
+            stock=5,
+            status='active',
+        )
+
+    def stock(self):
+        return Product.objects.values_list('stock', 'reserved').get(pk=self.product.pk)
+
+class ReservationTest(ReservationMixin, TestCase):
+    def test_hold_and_confirm(self):
+        """La réservation retient les unités ; la confirmation les retire du stock"""
+        hold = reservations.hold(self.product, 2, user=self.buyer)
+        self.assertEqual(self.stock(), (5, 2))
+        self.assertEqual(reservations.available(self.product), 3)
+        self.assertEqual(reservations.confirm([hold]), {(self.product.pk, None): 2})
+        self.assertEqual(self.stock(), (3, 0))
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_hold_respects_other_carts(self):
+        """Les unités retenues par un panier ne sont pas réservables par un autre"""
+        reservations.hold(self.product, 4, user=self.buyer)
+        with self.assertRaises(OutOfStock):
+            reservations.hold(self.product, 2, session_key='anonyme')
+        self.assertIsNotNone(reservations.hold(self.product, 1, session_key='anonyme'))
+        self.assertEqual(self.stock(), (5, 5))
+
+    def test_hold_replaces_previous(self):
+        """Une nouvelle réservation du même article remplace la précédente, sauf si elle échoue"""
+        reservations.hold(self.product, 2, user=self.buyer)
+        reservations.hold(self.product, 3, user=self.buyer)
+        self.assertEqual(self.stock(), (5, 3))
+        with self.assertRaises(OutOfStock):
+            reservations.hold(self.product, 6, user=self.buyer)
+        self.assertEqual(self.stock(), (5, 3))
+        self.assertEqual(StockReservation.objects.get().quantity, 3)
+
+    def test_sweep_expired(self):
+        """Le balayage libère les réservations expirées, et seulement elles"""
+        expired = reservations.hold(self.product, 2, user=self.buyer)
+        reservations.hold(self.product, 1, session_key='anonyme')
+        StockReservation.objects.filter(pk=expired.pk).update(expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(reservations.sweep(batch_size=1), 1)
+        self.assertEqual(self.stock(), (5, 1))
+        with self.assertRaises(ReservationExpired):
+            reservations.confirm([expired])
+        self.assertEqual(self.stock(), (5, 1))
+
+    def test_confirm_is_all_or_nothing(self):
+        """Si un article manque, aucune baisse de stock n'est appliquée"""
+        other = Product.objects.create(
+            seller=self.seller, category=self.category, name='Jupe',
+            description='Description', price=Decimal('20.00'), stock=2, status='active',
+        )
+        holds = [reservations.hold(self.product, 2, user=self.buyer), reservations.hold(other, 2, user=self.buyer)]
+        Product.objects.filter(pk=other.pk).update(stock=1)  # Inventaire corrigé par le vendeur
+        with self.assertRaises(OutOfStock):
+            reservations.confirm(holds)
+        self.assertEqual(self.stock(), (5, 2))
+        self.assertEqual(StockReservation.objects.count(), 2)
+
+    def test_variant_stock(self):
+        """Une réservation de variante porte sur le stock de la variante"""
+        variant = ProductVariant.objects.create(product=self.product, name='Rouge', sku='R-1', price=Decimal('80.00'), stock=1)
+        hold = reservations.hold(self.product, 1, user=self.buyer, variant=variant)
+        with self.assertRaises(OutOfStock):
+            reservations.hold(self.product, 1, session_key='anonyme', variant=variant)
+        reservations.confirm([hold])
+        variant.refresh_from_db()
+        self.assertEqual((variant.stock, variant.reserved), (0, 0))
+        self.assertEqual(self.stock(), (5, 0))
+
+    def test_stale_save_keeps_reserved(self):
+        """Une instance chargée avant la réservation ne remet pas `reserved` à zéro"""
+        stale = Product.objects.get(pk=self.product.pk)
+        reservations.hold(self.product, 2, user=self.buyer)
+        stale.name = 'Robe longue'
+        stale.save()
+        self.assertEqual(self.stock(), (5, 2))
+
+    def test_sold_out_leaves_facets(self):
+        """Un produit épuisé par une commande quitte les compteurs de facettes"""
+        self.assertEqual(FacetCount.objects.get(facet='category', other_facet='').count, 1)
+        reservations.confirm([reservations.hold(self.product, 5, user=self.buyer)])
+        self.assertEqual(FacetCount.objects.get(facet='category', other_facet='').count, 0)
+
+class CartHoldTest(ReservationMixin, TestCase):
+    """Le panier d'un utilisateur connecté réserve ; la commande confirme"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='buyer', password='testpass123')
+
+    def item(self):
+        return CartItem.objects.get(cart__user=self.buyer, product=self.product)
+
+    def test_cart_writes_hold_stock(self):
+        add = reverse('store:add_to_cart', args=[self.product.pk])
+        self.assertEqual(self.client.post(add, {'quantity': 2}).status_code, 200)
+        self.assertEqual(self.stock(), (5, 2))
+        # Les unités déjà retenues par ce panier restent disponibles pour lui
+        self.assertEqual(self.client.post(add, {'quantity': 3}).status_code, 200)
+        self.assertEqual(self.stock(), (5, 5))
+        self.assertEqual(reservations.held(self.product, self.buyer), 5)
+        self.assertEqual(self.client.post(add, {'quantity': 1}).status_code, 400)
+
+        self.client.post(reverse('store:update_cart', args=[self.item().pk]), {'quantity': 1})
+        self.assertEqual(self.stock(), (5, 1))
+        self.client.post(reverse('store:update_cart', args=[self.item().pk]), {'quantity': 0})
+        self.assertEqual(self.stock(), (5, 0))
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_other_cart_cannot_take_held_units(self):
+        self.client.post(reverse('store:add_to_cart', args=[self.product.pk]), {'quantity': 4})
+        self.client.logout()
+        response = self.client.post(reverse('store:add_to_cart', args=[self.product.pk]), {'quantity': 2})
+        self.assertEqual(response.status_code, 400)
+
+    def test_checkout_confirms_hold(self):
+        self.client.post(reverse('store:add_to_cart', args=[self.product.pk]), {'quantity': 2})
+        self.client.post(reverse('store:checkout'), {'idempotency_key': 'commande-1'})
+        self.assertEqual(self.stock(), (3, 0))
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertTrue(Order.objects.filter(user=self.buyer).exists())
+
+class OversellTest(ReservationMixin, TransactionTestCase):
+    BUYERS = 25
+
+    def attempt(self, index, results):
+        # La base SQLite en mémoire des tests refuse les écrivains concurrents au lieu de
+        # les faire attendre : on rejoue la tentative, comme le ferait le délai d'attente
+        # d'une base sur disque
+        try:
+            while True:
+                try:
+                    hold = reservations.hold(self.product, 1, session_key=f'panier-{index}')
+                    reservations.confirm([hold])
+                    results.append('ok')
+                    return
+                except OutOfStock:
+                    results.append('out')
+                    return
+                except OperationalError:
+                    time.sleep(0.001)
+        finally:
+            connection.close()
+
+    def test_no_oversell_under_concurrency(self):
+        """Beaucoup d'acheteurs simultanés sur le même article : jamais plus d'unités vendues que le stock"""
+        results = []
+        start = threading.Barrier(self.BUYERS)
+        threads = [
+            threading.Thread(target=lambda i=i: (start.wait(), self.attempt(i, results)))
+            for i in range(self.BUYERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+        self.assertEqual(results.count('ok'), 5)
+        self.assertEqual(results.count('out'), self.BUYERS - 5)
+        self.assertEqual(self.stock(), (0, 0))
+        self.assertFalse(StockReservation.objects.exists())
@@ -0,0 +1,107 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from unittest import mock
+from .models import Product, Category
+from . import search
+from .pagination import CursorPaginator
+
+User = get_user_model()
+
+class NormalizeTest(TestCase):
+    def test_accents_removed(self):
+        """Les accents français sont ignorés"""
+        self.assertEqual(search.normalize('Télévision Écran Œuvre'), 'television ecran oeuvre')
+
+    def test_stopwords_and_short_terms(self):
+        """Les mots vides et les termes d'une lettre sont ignorés"""
+        self.assertEqual(search.query_terms("Robe de l'été à fleurs x"), ['robe', 'ete', 'fleurs'])
+
+class ProductSearchTest(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(
+            username='seller',
+            email='seller@example.com',
+            password='testpass123',
+            user_type='seller'
+        )
+        self.category = Category.objects.create(name='Électronique', slug='electronique')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tv = self.create_product('Télévision Samsung 42 pouces', brand='Samsung')
+            self.support = self.create_product('Support mural', description='Support pour télévision et écran')
+            self.robe = self.create_product('Robe en coton', tags='été, légère')
+
+    def create_product(self, name, description='Description', **kwargs):
+        kwargs.setdefault('category', self.category)
+        return Product.objects.create(
+            seller=self.seller,
+            name=name,
+            description=description,
+            price=Decimal('100.00'),
+            stock=10,
+            status='active',
+            **kwargs
+        )
+
+    def test_prefix_and_accent_insensitive(self):
+        """« tele » trouve « Télévision »"""
+        self.assertEqual(set(search.ranked_ids('tele')), {self.tv.pk, self.support.pk})
+
+    def test_name_ranked_before_description(self):
+        """Un terme dans le nom passe avant le même terme dans la description"""
+        self.assertEqual(search.ranked_ids('télévision'), [self.tv.pk, self.support.pk])
+
+    def test_all_terms_required(self):
+        """Tous les termes doivent correspondre"""
+        self.assertEqual(search.ranked_ids('robe ete'), [self.robe.pk])
+        self.assertEqual(search.ranked_ids('robe samsung'), [])
+
+    def test_index_follows_save_and_delete(self):
+        """L'index suit les modifications et suppressions de produits"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.robe.name = 'Boubou brodé'
+            self.robe.save()
+        self.assertEqual(search.ranked_ids('boubou'), [self.robe.pk])
+        self.assertEqual(search.ranked_ids('robe'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tv.delete()
+        self.assertEqual(search.ranked_ids('tele'), [self.support.pk])
+
+    def test_product_list_uses_index(self):
+        """product_list renvoie les résultats classés par pertinence"""
+        response = self.client.get(reverse('store:product_list') + '?q=televi')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [p.pk for p in response.context['page_obj']],
+            [self.tv.pk, self.support.pk]
+        )
+
+    def test_filters_apply_to_all_matches(self):
+        """Les filtres du catalogue portent sur tous les résultats, pas sur les premiers classés"""
+        mode = Category.objects.create(name='Mode', slug='mode')
+        with self.captureOnCommitCallbacks(execute=True):
+            low = self.create_product('Tunique', description='Portée avec une robe', category=mode)
+        products = search.search(Product.objects.filter(category=mode), 'robe').order_by('search_rank')
+        self.assertEqual([p.pk for p in products], [low.pk])
+        ranked = search.search(Product.objects.all(), 'robe').order_by('search_rank', 'pk')
+        self.assertEqual([p.pk for p in ranked], [self.robe.pk, low.pk])
+
+    def test_cursor_pages_follow_rank(self):
+        """Les pages suivantes filtrent sur le rang, calculé dans la même requête"""
+        paginator = CursorPaginator(search.search(Product.objects.all(), 'télévision').cards(), 1, ['search_rank'])
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        self.assertEqual([first[0].pk, second[0].pk], [self.tv.pk, self.support.pk])
+        self.assertFalse(second.has_next())
+
+
+class TokenSearchTest(ProductSearchTest):
+    """Mêmes cas avec la table SearchToken (base sans FTS5)"""
+
+    def setUp(self):
+        patcher = mock.patch.object(search, 'fts_available', return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
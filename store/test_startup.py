@@ -0,0 +1,31 @@
+import json
+import subprocess
+import sys
+
+from django.test import SimpleTestCase
+
+from store.management.commands.benchmark_startup import parse_importtime
+
+HEAVY = ('PIL', 'qrcode', 'numpy', 'pandas', 'prophet')
+
+
+class LazyImportTest(SimpleTestCase):
+    def test_heavy_dependencies_not_loaded_at_startup(self):
+        """Un worker neuf ne charge ni PIL, ni qrcode, ni les modèles de prévision"""
+        code = (
+            'import json, sys, django; django.setup(); '
+            'import store.models, store.utils, delivery.utils, dashboard.forecasts; '
+            f'print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))'
+        )
+        process = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertEqual(json.loads(process.stdout.splitlines()[-1]), [])
+
+    def test_parse_importtime(self):
+        stderr = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       500 |        500 |   store.models\n'
+            'import time:      1500 |       2000 | store\n'
+            'import time:       250 |        250 | json\n'
+        )
+        self.assertEqual(parse_importtime(stderr), {'store': 2.0, 'json': 0.25})
@@ -157,7 +157,12 @@ class CartViewsTest(TestCase):
         cart_item = cart.items.first()
         
         # Supprimer du panier
+        # Un simple lien (GET) ne modifie pas le panier
         response = self.client.get(reverse('store:remove_from_cart', args=[cart_item.id]))
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(cart.items.count(), 1)
+
+        response = self.client.post(reverse('store:remove_from_cart', args=[cart_item.id]))
         self.assertEqual(response.status_code, 302)
         self.assertEqual(cart.items.count(), 0)
 
@@ -292,7 +292,7 @@ class StoreViewTests(TestCase):
     def test_remove_from_cart(self):
         """Teste la suppression d'un article du panier."""
         self.client.login(username=self.user.username, password='testpass')
-        response = self.client.get(reverse('store:remove_from_cart', args=[self.cart_item.id]))
+        response = self.client.post(reverse('store:remove_from_cart', args=[self.cart_item.id]))
         self.assertEqual(response.status_code, 302)
         self.assertFalse(CartItem.objects.filter(id=self.cart_item.id).exists())
 
@@ -10,8 +10,17 @@ urlpatterns = [
     path('product/<slug:slug>/', views.product_detail, name='product_detail'),
     path('category/<slug:slug>/', views.product_list, name='category_products'),
     
+    # === PANIER ===
+    path('cart/', views.cart, name='cart'),
+    path('cart/add/<int:product_id>/', views.add_to_cart, name='add_to_cart'),
+    path('cart/update/<str:key>/', views.update_cart, name='update_cart'),
+    path('cart/remove/<str:key>/', views.remove_from_cart, name='remove_from_cart'),
+    path('checkout/', views.checkout, name='checkout'),
+    
     # === API UTILITAIRES ===
     path('api/categories/autocomplete/', views.categories_autocomplete, name='categories_autocomplete'),
+    path('api/cache-stats/', views.cache_stats, name='cache_stats'),
+    path('api/image-jobs/<int:job_id>/', views.image_job_status, name='image_job_status'),
 ]
 
 # URLs vendeur séparées
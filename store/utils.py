@@ -1,8 +1,5 @@
 from django.db.models import Sum, Count, F
 from .models import OrderItem, Product
-import qrcode
-from io import BytesIO
-import base64
 
 def get_sales_metrics(user):
     """
@@ -31,6 +28,12 @@ def generate_qr_code_image(data, size=(300, 300)):
     """
     Génère une image QR Code à partir des données
     """
+    # Import différé : qrcode et PIL ne sont chargés qu'à la première génération
+    import base64
+    from io import BytesIO
+
+    import qrcode
+
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
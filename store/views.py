@@ -4,8 +4,9 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponseForbidden
+from django.http import JsonResponse, HttpResponseForbidden, Http404
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import Q, Count, Sum, Avg
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy, reverse
@@ -13,36 +14,41 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.http import require_POST
 from django.core.exceptions import PermissionDenied
 from django.utils import timezone
+from django.utils.http import urlencode
 from decimal import Decimal
 import json
+import uuid
 
 from .models import (
     Product, Category, ProductVariant, ProductModeration, 
-    Review, Order, OrderItem, Cart, CartItem, Favorite, Notification
+    Review, Order, OrderItem, Cart, CartItem, Favorite, ImageJob
 )
 from .forms import (
     ProductForm, ProductVariantForm, ProductSearchForm, 
     BulkProductActionForm, ReviewReplyForm, ProductStatusForm
 )
+from . import cache, carts, facets, favorites, jobs, notifications, orders, renditions, reservations, search
+from .pagination import CursorPaginator
 
 # === VUES GÉNÉRALES ===
 
 def home(request):
     """Page d'accueil"""
-    featured_products = Product.objects.filter(
+    featured_products = list(Product.objects.filter(
         is_featured=True, 
         is_active=True, 
         status='active',
         stock__gt=0
-    )[:8]
+    ).cards()[:8])
     
-    recent_products = Product.objects.filter(
+    recent_products = list(Product.objects.filter(
         is_active=True, 
         status='active',
         stock__gt=0
-    ).order_by('-created_at')[:12]
+    ).order_by('-created_at').cards()[:12])
     
     categories = Category.objects.filter(is_active=True)[:8]
+    favorites.prefetch(request.user, featured_products + recent_products)
     
     context = {
         'featured_products': featured_products,
@@ -64,18 +70,10 @@ def product_list(request):
     category_slug = request.GET.get('category')
     min_price = request.GET.get('min_price')
     max_price = request.GET.get('max_price')
-    sort_by = request.GET.get('sort', 'newest')
+    sort_by = request.GET.get('sort', 'relevance' if query else 'newest')
     
     if query:
-        products = products.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query) |
-            Q(tags__icontains=query) |
-            Q(brand__icontains=query)
-        )
-    
-    if category_slug:
-        products = products.filter(category__slug=category_slug)
+        products = search.search(products, query)
     
     if min_price:
         try:
@@ -89,31 +87,66 @@ def product_list(request):
         except:
             pass
     
-    # Tri
+    # Facettes (marque, couleur, taille, état, tranche de prix, catégorie)
+    selected_facets = {
+        facet: request.GET.get(facet, '') for facet in facets.FACETS if facet != 'category'
+    }
+    if category_slug:
+        category = Category.objects.filter(slug=category_slug).values_list('pk', flat=True).first()
+        selected_facets['category'] = str(category) if category else '0'
+    if selected_facets['price'] not in facets.price_keys():
+        selected_facets['price'] = ''
+    selected_facets = {facet: value for facet, value in selected_facets.items() if value}
+    
+    # Les compteurs précalculés suffisent tant qu'aucun filtre libre (recherche, prix) n'est actif
+    has_free_filters = bool(query or min_price or max_price)
+    if has_free_filters:
+        facet_sidebar = facets.sidebar(selected_facets, products)
+    else:
+        facet_sidebar = cache.get_or_set(
+            'facets:' + urlencode(sorted(selected_facets.items())),
+            lambda: facets.sidebar(selected_facets),
+            timeout=300,
+            depends=[Product, Category],
+        )
+    
+    for facet, value in selected_facets.items():
+        products = products.filter(facets.product_filter(facet, value))
+    
+    # Tri (clé de tri + id, pour la pagination par curseur)
     if sort_by == 'price_low':
-        products = products.order_by('price')
+        ordering = ['price']
     elif sort_by == 'price_high':
-        products = products.order_by('-price')
+        ordering = ['-price']
     elif sort_by == 'popular':
-        products = products.order_by('-sales_count', '-views')
+        ordering = ['-sales_count', '-views']
     elif sort_by == 'rating':
-        products = products.annotate(avg_rating=Avg('reviews__rating')).order_by('-avg_rating')
+        ordering = ['-rating_average', '-rating_count']
+    elif sort_by == 'relevance' and query:
+        ordering = ['search_rank']
     else:  # newest
-        products = products.order_by('-created_at')
+        ordering = ['-created_at']
     
     # Pagination
-    paginator = Paginator(products, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = CursorPaginator(products.cards(), 12, ordering)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    favorites.prefetch(request.user, page_obj.object_list)
+    renditions.prefetch([product.image for product in page_obj.object_list])
+    
+    # Paramètres de filtre à conserver dans les liens de pagination
+    filter_params = request.GET.copy()
+    filter_params.pop('cursor', None)
     
     context = {
         'page_obj': page_obj,
-        'categories': Category.objects.filter(is_active=True),
+        'filter_query': filter_params.urlencode(),
         'query': query,
         'selected_category': category_slug,
         'min_price': min_price,
         'max_price': max_price,
         'sort_by': sort_by,
+        'facets': facet_sidebar,
+        'selected_facets': selected_facets,
     }
     return render(request, 'store/product_list.html', context)
 
@@ -129,12 +162,16 @@ def product_detail(request, slug):
     product.increment_views()
     
     # Produits similaires
-    similar_products = Product.objects.filter(
+    similar_products = list(Product.objects.filter(
         category=product.category,
         is_active=True,
         status='active',
         stock__gt=0
-    ).exclude(id=product.id)[:4]
+    ).exclude(id=product.id).cards()[:4])
+    # Déclinaisons de la galerie et des produits similaires en une requête
+    renditions.prefetch(
+        [product.image1, product.image2, product.image3] + [similar.image for similar in similar_products]
+    )
     
     # Avis approuvés
     reviews = product.reviews.filter(is_approved=True).order_by('-created_at')
@@ -161,6 +198,8 @@ def product_detail(request, slug):
         'product': product,
         'similar_products': similar_products,
         'reviews': reviews,
+        'average_rating': product.average_rating,
+        'is_favorite': favorites.is_favorite(request.user, product.pk),
         'can_review': can_review,
         'variants': product.variants.filter(is_active=True),
     }
@@ -210,8 +249,15 @@ class VendorProductListView(ListView):
         
         return queryset.order_by('-created_at')
 
+    def paginate_queryset(self, queryset, page_size):
+        page = CursorPaginator(queryset, page_size).get_page(self.request.GET.get('cursor'))
+        return page.paginator, page, page.object_list, page.has_other_pages()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        filter_params = self.request.GET.copy()
+        filter_params.pop('cursor', None)
+        context['filter_query'] = filter_params.urlencode()
         context['search_form'] = ProductSearchForm(self.request.GET)
         context['bulk_form'] = BulkProductActionForm()
         
@@ -250,7 +296,9 @@ class VendorProductCreateView(CreateView):
             f"Produit '{form.instance.name}' créé avec succès ! "
             "Il sera visible après modération."
         )
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        renditions.enqueue(self.object, renditions.PRODUCT_IMAGE_FIELDS, user=self.request.user)
+        return response
 
     def get_success_url(self):
         return reverse('vendor:products')
@@ -285,7 +333,11 @@ class VendorProductUpdateView(UpdateView):
             )
         
         messages.success(self.request, f"Produit '{form.instance.name}' mis à jour avec succès !")
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        # Seules les images remplacées sont redéclinées
+        changed = [field for field in renditions.PRODUCT_IMAGE_FIELDS if field in form.changed_data]
+        renditions.enqueue(self.object, changed, user=self.request.user)
+        return response
 
     def get_success_url(self):
         return reverse('vendor:products')
@@ -348,11 +400,13 @@ def bulk_product_action(request):
     count = products.count()
     
     if action == 'activate':
-        products.update(is_active=True)
+        with facets.track(products):
+            products.update(is_active=True)
         message = f"{count} produit(s) activé(s)"
     
     elif action == 'deactivate':
-        products.update(is_active=False)
+        with facets.track(products):
+            products.update(is_active=False)
         message = f"{count} produit(s) désactivé(s)"
     
     elif action == 'delete':
@@ -373,7 +427,8 @@ def bulk_product_action(request):
     elif action == 'update_category':
         new_category = form.cleaned_data['new_category']
         if new_category:
-            products.update(category=new_category)
+            with facets.track(products):
+                products.update(category=new_category)
             message = f"{count} produit(s) déplacé(s) vers {new_category.name}"
         else:
             return JsonResponse({'error': 'Catégorie requise'}, status=400)
@@ -381,6 +436,8 @@ def bulk_product_action(request):
     else:
         return JsonResponse({'error': 'Action non supportée'}, status=400)
     
+    # Les update() en masse ne déclenchent pas post_save
+    cache.bump(Product)
     return JsonResponse({'success': True, 'message': message})
 
 @login_required
@@ -444,6 +501,8 @@ def product_duplicate(request, product_id):
     duplicate.views = 0
     duplicate.sales_count = 0
     duplicate.favorites_count = 0
+    for field in Product.RATING_FIELDS + Product.RESERVATION_FIELDS:
+        setattr(duplicate, field, 0)
     duplicate.save()
     
     messages.success(
@@ -633,6 +692,21 @@ def categories_autocomplete(request):
     results = [{'id': cat.id, 'name': cat.name} for cat in categories]
     return JsonResponse({'results': results})
 
+@login_required
+def cache_stats(request):
+    """Compteurs du cache à deux niveaux pour ce processus (réglage des TTL)"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Accès refusé'}, status=403)
+    return JsonResponse(cache.stats())
+
+@login_required
+def image_job_status(request, job_id):
+    """État d'un traitement d'image (déclinaisons, GPS) lancé par un téléversement"""
+    job = get_object_or_404(ImageJob, id=job_id)
+    if job.user_id != request.user.id and not request.user.is_staff:
+        return JsonResponse({'error': 'Accès refusé'}, status=403)
+    return JsonResponse(jobs.as_dict(job))
+
 @login_required
 def product_status_update(request, product_id):
     """Mettre à jour le statut d'un produit"""
@@ -650,11 +724,12 @@ def product_status_update(request, product_id):
             
             # Créer une notification si nécessaire
             if old_status != product.status:
-                Notification.objects.create(
-                    user=request.user,
-                    type='product_updated',
-                    title=f"Statut du produit mis à jour",
-                    message=f"Le statut de '{product.name}' est passé de {old_status} à {product.status}",
+                notifications.notify(
+                    [request.user],
+                    f"Le statut de '{product.name}' est passé de {old_status} à {product.status}",
+                    notification_type='product_updated',
+                    title="Statut du produit mis à jour",
+                    related_object_id=product.pk,
                     action_url=product.get_absolute_url(),
                     action_text="Voir le produit"
                 )
@@ -682,18 +757,23 @@ def upload_product_image(request, product_id):
     
     image = request.FILES['image']
     slot = request.POST.get('slot', '1')  # image1, image2, etc.
+    if slot not in ['1', '2', '3', '4', '5']:
+        return JsonResponse({'error': 'Slot invalide'}, status=400)
     
     # Validation
     if image.size > 5 * 1024 * 1024:  # 5MB
         return JsonResponse({'error': 'Image trop volumineuse (max 5MB)'}, status=400)
     
-    # Sauvegarder l'image
+    # Sauvegarder l'image brute ; déclinaisons préparées par le pool de store.jobs
     setattr(product, f'image{slot}', image)
     product.save()
+    job, = renditions.enqueue(product, [f'image{slot}'], user=request.user)
     
     return JsonResponse({
         'success': True,
         'image_url': getattr(product, f'image{slot}').url,
+        'job_id': job.pk,
+        'status_url': reverse('store:image_job_status', args=[job.pk]),
         'message': 'Image uploadée avec succès'
     })
 
@@ -713,6 +793,7 @@ def delete_product_image(request, product_id):
             # Supprimer le fichier
             image = getattr(product, image_field)
             if image:
+                renditions.delete(image)
                 image.delete()
             
             # Vider le champ
@@ -746,9 +827,7 @@ def stock_management(request):
         products = products.filter(stock__gt=5)
     
     # Pagination
-    paginator = Paginator(products, 25)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = CursorPaginator(products, 25, ['stock']).get_page(request.GET.get('cursor'))
     
     # Statistiques
     stats = {
@@ -762,6 +841,7 @@ def stock_management(request):
     
     context = {
         'page_obj': page_obj,
+        'filter_query': urlencode({'filter': stock_filter}) if stock_filter else '',
         'stats': stats,
         'stock_filter': stock_filter,
     }
@@ -787,11 +867,12 @@ def update_stock(request, product_id):
         
         # Notification si stock faible
         if new_stock <= product.low_stock_threshold and old_stock > product.low_stock_threshold:
-            Notification.objects.create(
-                user=request.user,
-                type='stock_low',
+            notifications.notify(
+                [request.user],
+                f"Le stock de '{product.name}' est faible ({new_stock} restant)",
+                notification_type='stock_low',
                 title="Stock faible",
-                message=f"Le stock de '{product.name}' est faible ({new_stock} restant)",
+                related_object_id=product.pk,
                 action_url=reverse('vendor:product_edit', kwargs={'pk': product.pk}),
                 action_text="Gérer le stock"
             )
@@ -806,6 +887,147 @@ def update_stock(request, product_id):
     except (ValueError, TypeError):
         return JsonResponse({'error': 'Stock invalide'}, status=400)
 
+# === PANIER ===
+
+def cart(request):
+    """Panier : lignes en base pour un utilisateur connecté, cookie signé sinon (store.carts)"""
+    summary = carts.for_request(request)
+    renditions.prefetch([line.image for line in summary.lines])
+    return render(request, 'store/cart.html', {
+        'cart_items': summary.lines,
+        'subtotal': summary.subtotal,
+        'shipping_cost': Decimal('0.00'),
+        'total': summary.subtotal,
+        # Renvoyée avec le formulaire de commande : un double clic ne crée qu'une commande
+        'idempotency_key': uuid.uuid4().hex,
+    })
+
+def _cart_quantity(request, product_id, variant_id):
+    if request.user.is_authenticated:
+        return CartItem.objects.filter(
+            cart__user=request.user, product_id=product_id, variant_id=variant_id
+        ).values_list('quantity', flat=True).first() or 0
+    return carts.session_cart(request).quantity(product_id, variant_id)
+
+def _cart_available(request, product_id, variant_id):
+    """Unités que ce panier peut prendre : stock disponible plus celles qu'il retient déjà"""
+    available = carts.available_stock([(product_id, variant_id)])
+    if (product_id, variant_id) not in available:
+        return 0
+    if request.user.is_authenticated:
+        return available[(product_id, variant_id)] + reservations.held(product_id, request.user, variant=variant_id)
+    return available[(product_id, variant_id)]
+
+def _set_cart_quantity(request, product_id, variant_id, quantity):
+    """Quantité d'un article du panier ; 0 le retire. Renvoie False si le panier anonyme est plein.
+
+    Connecté, la ligne est doublée d'une réservation limitée dans le temps
+    (store.reservations), confirmée par la commande ; lève OutOfStock sinon.
+    """
+    if not request.user.is_authenticated:
+        return carts.session_cart(request).set(product_id, quantity, variant_id)
+    with transaction.atomic():
+        reservations.hold(product_id, quantity, user=request.user, variant=variant_id)
+        if quantity <= 0:
+            CartItem.objects.filter(cart__user=request.user, product_id=product_id, variant_id=variant_id).delete()
+            return True
+        user_cart, _ = Cart.objects.get_or_create(user=request.user)
+        CartItem.objects.update_or_create(
+            cart=user_cart, product_id=product_id, variant_id=variant_id, defaults={'quantity': quantity}
+        )
+    return True
+
+@require_POST
+def add_to_cart(request, product_id):
+    """Ajouter un produit au panier (AJAX) ; un visiteur anonyme n'écrit rien en base"""
+    product = get_object_or_404(Product, id=product_id, is_active=True, status='active')
+    try:
+        quantity = int(request.POST.get('quantity', 1))
+        variant_id = int(request.POST['variant']) if request.POST.get('variant') else None
+    except (ValueError, TypeError):
+        return JsonResponse({'error': 'Quantité invalide'}, status=400)
+    if quantity < 1:
+        return JsonResponse({'error': 'Quantité invalide'}, status=400)
+    if variant_id and not product.variants.filter(id=variant_id, is_active=True).exists():
+        return JsonResponse({'error': 'Variante introuvable'}, status=404)
+
+    available = _cart_available(request, product.id, variant_id)
+    wanted = _cart_quantity(request, product.id, variant_id) + quantity
+    if wanted > available:
+        return JsonResponse({'error': f"Stock insuffisant ({available} disponible(s))"}, status=400)
+    try:
+        stored = _set_cart_quantity(request, product.id, variant_id, wanted)
+    except reservations.OutOfStock:
+        # Un autre panier a réservé les dernières unités entre la lecture et la réservation
+        return JsonResponse({'error': "Stock insuffisant"}, status=400)
+    if not stored:
+        return JsonResponse({'error': f"Panier plein ({carts.MAX_LINES} articles différents au maximum)"}, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'cart_count': carts.item_count(request),
+        'message': f"'{product.name}' ajouté au panier",
+    })
+
+def _cart_line(request, key):
+    """(product_id, variant_id) d'une ligne : id de CartItem si connecté, clé du cookie sinon"""
+    try:
+        if request.user.is_authenticated:
+            item = get_object_or_404(CartItem, id=int(key), cart__user=request.user)
+            return item.product_id, item.variant_id
+        return carts.parse_key(key)
+    except ValueError:
+        raise Http404("Article introuvable")
+
+@require_POST
+def update_cart(request, key):
+    """Modifier la quantité d'une ligne du panier (plafonnée au stock disponible)"""
+    product_id, variant_id = _cart_line(request, key)
+    try:
+        quantity = max(int(request.POST.get('quantity', 1)), 0)
+    except (ValueError, TypeError):
+        messages.error(request, "Quantité invalide.")
+        return redirect('store:cart')
+    available = _cart_available(request, product_id, variant_id)
+    if quantity > available:
+        quantity = available
+        messages.warning(request, f"Quantité ramenée au stock disponible ({available}).")
+    try:
+        _set_cart_quantity(request, product_id, variant_id, quantity)
+    except reservations.OutOfStock:
+        messages.error(request, "Stock insuffisant, la quantité n'a pas été modifiée.")
+    return redirect('store:cart')
+
+@require_POST
+def remove_from_cart(request, key):
+    """Retirer une ligne du panier"""
+    product_id, variant_id = _cart_line(request, key)
+    _set_cart_quantity(request, product_id, variant_id, 0)
+    messages.success(request, "Article retiré du panier.")
+    return redirect('store:cart')
+
+# === COMMANDE ===
+
+@login_required
+@require_POST
+def checkout(request):
+    """Commande du panier (paiement à la livraison), idempotente par clé de formulaire"""
+    try:
+        order, created = orders.place_order(request.user, request.POST.get('idempotency_key', ''))
+    except orders.EmptyCart:
+        messages.info(request, "Votre panier est vide.")
+        return redirect('store:cart')
+    except orders.OutOfStock as exc:
+        name = Product.objects.filter(pk=exc.product_id).values_list('name', flat=True).first() or "Un article"
+        messages.error(request, f"{name} n'est plus disponible dans la quantité demandée.")
+        return redirect('store:cart')
+    except orders.ReservationExpired as exc:
+        messages.error(request, str(exc))
+        return redirect('store:cart')
+    if created:
+        messages.success(request, f"Commande {order.order_number} enregistrée.")
+    return redirect('dashboard:orders')
+
 # === ERREURS ===
 
 def custom_404(request, exception):